@@ -69,11 +69,24 @@ class Argument(object):
             "--cov",
             action="store",
             default=config["coverage"]["default_coverage"],
-            type=int,
-            help="set the number of electric buses in the coverage area (default: %(metavar)s = %(default)s)",
+            type=float,
+            help=("set the limit of the coverage area, in number of electric buses by default "
+                  "(default: %(metavar)s = %(default)s)"),
             metavar="BUS"
         )
 
+        gen_group.add_argument(
+            "-y",
+            "--covtype",
+            action="store",
+            default=config["coverage"]["default_coverage_type"],
+            choices=["bus", "hop", "length"],
+            type=str,
+            help=("set the unit of the coverage area limit: number of buses, number of branches from the central bus "
+                  "or length in meters from the central bus (default: %(metavar)s = %(default)s)"),
+            metavar="TYPE"
+        )
+
         gen_group.add_argument(
             "-m",
             "--limit",
@@ -92,6 +105,85 @@ class Argument(object):
             help="use transmission line equivalents"
         )
 
+        gen_group.add_argument(
+            "-u",
+            "--template",
+            action="store_true",
+            help="use transmission line templates, with one line constants execution for each line construction "
+                 "(and length, for the JMarti model) instead of one for each line"
+        )
+
+        gen_group.add_argument(
+            "-C",
+            "--constant",
+            action="store_true",
+            help="use the constant parameters LINE CONSTANTS model instead of the frequency-dependent JMarti model for "
+                 "the transmission lines (with --template, lines of any length share the per-unit template)"
+        )
+
+        gen_group.add_argument(
+            "-V",
+            "--verify",
+            action="store_true",
+            help="compare one line of each transmission line template with its own line constants execution"
+        )
+
+        gen_group.add_argument(
+            "-n",
+            "--nocache",
+            action="store_true",
+            help="disable the persistent cache of transmission line constants"
+        )
+
+        gen_group.add_argument(
+            "-I",
+            "--incremental",
+            action="store_true",
+            help="reuse the transmission line files, .atp files and results of the previous run in the output "
+                 "directory that were not affected by changes in the input"
+        )
+
+        gen_group.add_argument(
+            "-w",
+            "--sweep",
+            action="store_true",
+            help="generate one surge case for each bus of the coverage area and each combination of surge amplitude, "
+                 "front time and tail time"
+        )
+
+        gen_group.add_argument(
+            "-a",
+            "--amp",
+            action="store",
+            default=[float(amp) for amp in config["sweep"]["default_amp"].split()],
+            nargs="+",
+            type=float,
+            help="set the surge amplitudes in amperes of the sweep (default: %(metavar)s = %(default)s)",
+            metavar="AMP"
+        )
+
+        gen_group.add_argument(
+            "-f",
+            "--tfront",
+            action="store",
+            default=[float(tfront) for tfront in config["sweep"]["default_tfront"].split()],
+            nargs="+",
+            type=float,
+            help="set the surge front times in seconds of the sweep (default: %(metavar)s = %(default)s)",
+            metavar="TFRONT"
+        )
+
+        gen_group.add_argument(
+            "-k",
+            "--tau",
+            action="store",
+            default=[float(tau) for tau in config["sweep"]["default_tau"].split()],
+            nargs="+",
+            type=float,
+            help="set the surge tail times in seconds of the sweep (default: %(metavar)s = %(default)s)",
+            metavar="TAU"
+        )
+
         gen_group.add_argument(
             "-g",
             "--graph",
@@ -109,6 +201,51 @@ class Argument(object):
             action="store_true",
             help="execute generated .atp file"
         )
+        exec_group.add_argument(
+            "-j",
+            "--jobs",
+            action="store",
+            default=config["atp"]["default_jobs"],
+            type=int,
+            help="set the number of simultaneous ATP executions of the transmission line constants routine and of "
+                 "the surge sweep cases (default: %(metavar)s = %(default)s)",
+            metavar="JOBS"
+        )
+        exec_group.add_argument(
+            "-T",
+            "--timeout",
+            action="store",
+            default=config["atp"]["default_timeout"],
+            type=float,
+            help="set the time limit in seconds of each ATP execution, 0 for no limit "
+                 "(default: %(metavar)s = %(default)s)",
+            metavar="SEC"
+        )
+        exec_group.add_argument(
+            "-r",
+            "--retries",
+            action="store",
+            default=config["atp"]["default_retries"],
+            type=int,
+            help="set the number of new attempts of each failed ATP execution (default: %(metavar)s = %(default)s)",
+            metavar="RETRY"
+        )
+        exec_group.add_argument(
+            "-x",
+            "--export",
+            action="store",
+            default=config["export"]["default_format"],
+            choices=["npz", "parquet", "pckl"],
+            type=str,
+            help="set the format of the exported simulation results (default: %(metavar)s = %(default)s)",
+            metavar="FORMAT"
+        )
+        exec_group.add_argument(
+            "-z",
+            "--compress",
+            action="store_true",
+            help="compress the exported simulation results"
+        )
         exec_group.add_argument(
             "-s",
             "--step",
@@ -7,20 +7,113 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
     Classe responsavel pela estruturacao e criacao de cartoes Atp.
     A separacao dos metodos desta classe foi baseada na separacao dos tipos de cartoes presentes no Guia Resumido do Atp nas paginas 7 e 8.
     """
+    marcadores = {
+        "surge_arrester": "C INSERIR PARA RAIOS AQUI" + "\n",
+        "surge": "C INSERIR RAIOS AQUI" + "\n"
+    }
 
     def __init__(self):
         """
         Metodo Construtor da Classe
+        As secoes sao mantidas em memoria como uma lista de fragmentos, e o texto completo e obtido por cartao.
         """
-        self.cartao = ""
+        self.fragmentos = []
+        self.posicoes = []
+        self.modelo = None
         self.gerar_models = False
 
+    @property
+    def cartao(self):
+        """
+        Texto completo do cartao, montado a partir dos fragmentos. Os fragmentos sao unidos apenas entre as marcacoes,
+        de modo que o cartao ainda possa receber novos trechos e gerar cartoes derivados.
+        """
+        if len(self.fragmentos) > 2 * len(self.posicoes) + 1:
+            (trechos, regioes) = self.template()
+            self.fragmentos = [trechos[0]]
+            self.posicoes = []
+            for (slot, trecho) in zip(regioes, trechos[1:]):
+                self.posicoes.append((slot, len(self.fragmentos)))
+                self.fragmentos.append(ATPCard.marcadores[slot])
+                self.fragmentos.append(trecho)
+        return "".join(self.fragmentos)
+
+    @cartao.setter
+    def cartao(self, cartao):
+        self.fragmentos = [cartao]
+        self.posicoes = []
+        self.modelo = None
+
+    def write(self, texto):
+        """
+        Metodo para a adicao de um trecho ao final do cartao.
+        """
+        self.fragmentos.append(texto)
+        self.modelo = None
+
+    def write_file(self, arquivo):
+        """
+        Metodo para a escrita dos fragmentos do cartao em um arquivo aberto, sem a montagem do texto completo.
+        """
+        arquivo.writelines(self.fragmentos)
+
+    def mark_slot(self, slot):
+        """
+        Metodo que posiciona a marcacao de uma regiao do cartao a ser preenchida nos cartoes derivados.
+        :param slot: Nome da regiao ("surge_arrester" ou "surge")
+        :type slot: basestring
+        """
+        self.posicoes.append((slot, len(self.fragmentos)))
+        self.write(ATPCard.marcadores[slot])
+
+    def template(self):
+        """
+        Metodo que divide o cartao nas suas marcacoes, uma unica vez enquanto o cartao nao for alterado.
+        :return: Tupla (trechos, regioes), com um trecho antes da primeira marcacao, um entre cada par de marcacoes e um
+        apos a ultima marcacao
+        :rtype: tuple
+        """
+        if self.modelo is None:
+            trechos = []
+            regioes = []
+            inicio = 0
+            for (slot, posicao) in self.posicoes:
+                trechos.append("".join(self.fragmentos[inicio:posicao]))
+                regioes.append(slot)
+                inicio = posicao + 1
+            trechos.append("".join(self.fragmentos[inicio:]))
+            self.modelo = (trechos, regioes)
+        return self.modelo
+
+    def derive(self, **slots):
+        """
+        Metodo para a criacao de um cartao derivado, com o conteudo das regioes marcadas substituido, sem copia do
+        cartao: o cartao derivado e composto apenas pelos trechos do cartao base e pelo conteudo das regioes.
+        Exemplo:
+        >> cartao_surto = cartao.derive(surge=fontes_surto)
+        :param slots: Conteudo de cada regiao (As regioes nao informadas mantem a marcacao)
+        :type slots: basestring
+        :rtype: ATPCard
+        """
+        (trechos, regioes) = self.template()
+        card = ATPCard()
+        card.gerar_models = self.gerar_models
+        card.fragmentos.append(trechos[0])
+        for (slot, trecho) in zip(regioes, trechos[1:]):
+            if slot in slots:
+                card.fragmentos.append(slots[slot])
+            else:
+                card.posicoes.append((slot, len(card.fragmentos)))
+                card.fragmentos.append(ATPCard.marcadores[slot])
+            card.fragmentos.append(trecho)
+        return card
+
     def generate_card(self):
         """
         Metodo para inicializacao do cartao Atp.
         :return: Nao retorna valor, mas atualiza a variavel da instancia cartao
         """
-        self.cartao += "BEGIN NEW DATA CASE" + "\n"  # Retirado do Topico 5.1 do Guia Resumido do Atp
+        self.write("BEGIN NEW DATA CASE" + "\n")  # Retirado do Topico 5.1 do Guia Resumido do Atp
 
     def end_card(self):
         """
@@ -28,26 +121,26 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         :return: Nao retorna valor, mas atualiza a variavel da instancia cartao
         """
         if self.gerar_models:
-            self.cartao += "BLANK MODELS" + "\n"
-        self.cartao += "BLANK BRANCH" + "\n"
-        self.cartao += "BLANK SWITCH" + "\n"
-        self.cartao += "BLANK SOURCE" + "\n"
-        self.cartao += "BLANK OUTPUT" + "\n"
-        self.cartao += "BLANK PLOT" + "\n"
-        self.cartao += "BEGIN NEW DATA CASE" + "\n"
-        self.cartao += "BLANK"
+            self.write("BLANK MODELS" + "\n")
+        self.write("BLANK BRANCH" + "\n")
+        self.write("BLANK SWITCH" + "\n")
+        self.write("BLANK SOURCE" + "\n")
+        self.write("BLANK OUTPUT" + "\n")
+        self.write("BLANK PLOT" + "\n")
+        self.write("BEGIN NEW DATA CASE" + "\n")
+        self.write("BLANK")
 
     def mark_surge_arrester_position(self):
         """
         Classe que posiciona um comentario na regiao do cartao onde os para-raios devem ser inseridos.
         """
-        self.cartao += "C INSERIR PARA RAIOS AQUI" + "\n"
+        self.mark_slot(slot="surge_arrester")
 
     def mark_surge_position(self):
         """
         Classe que posiciona um comentario na regiao do cartao onde os raios devem ser inseridos.
         """
-        self.cartao += "C INSERIR RAIOS AQUI" + "\n"
+        self.mark_slot(slot="surge")
 
     def generate_header(self):
         """
@@ -61,7 +154,7 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         cabecalho += "C CEAMAZON" + "\n"
         cabecalho += "C 2018-2019" + "\n"
         cabecalho += "C --------------------------------------------------------" + "\n"
-        self.cartao += cabecalho
+        self.write(cabecalho)
 
     def generate_miscellaneous_float(self, deltat, tmax, xopt, copt, epsiln):
         """
@@ -75,13 +168,11 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         :return: Nao retorna valor, mas atualiza a variavel da instancia cartao
         """
         miscfloat = "C  dT  >< Tmax >< Xopt >< Copt ><Epsiln>" + "\n"  # Retirado do Topico 5.2 do Guia Resumido do Atp
-        linha = Formatter.insertFloat(number=deltat, leng_max=8, start_position=0, final_position=8)
-        linha += Formatter.insertFloat(number=tmax, leng_max=8, start_position=len(linha), final_position=16)
-        linha += Formatter.insertFloat(number=xopt, leng_max=8, start_position=len(linha), final_position=24)
-        linha += Formatter.insertFloat(number=copt, leng_max=8, start_position=len(linha), final_position=32)
-        linha += Formatter.insertFloat(number=epsiln, leng_max=8, start_position=len(linha), final_position=40)
+        linha = Formatter.insertFloatRow(
+            numbers=[deltat, tmax, xopt, copt, epsiln], leng_max=8, final_positions=[8, 16, 24, 32, 40]
+        )
         miscfloat += linha + "\n"
-        self.cartao += miscfloat
+        self.write(miscfloat)
 
     def generate_miscellaneous_int(self, iout, iplot, idoubl, kssout, maxout, ipun, mensav, icat, nenerg, iprsup):
         """
@@ -113,7 +204,7 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         miscint = linha + "\n"
         miscint += "C        1         2         3         4         5         6         7         8" + "\n"  # Linha para auxiliar a visualizacao das colunas, visto que os dados precisam estar em colunas especificas do cartao Atp
         miscint += "C 345678901234567890123456789012345678901234567890123456789012345678901234567890" + "\n"
-        self.cartao += miscint
+        self.write(miscint)
 
     def generate_models(self, elements=[]):
         """
@@ -130,7 +221,7 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         self.gerar_models = False
         models_elements = []
         for e in elements:
-            if e.models != {"header": {"input": "", "output": "", "input_nodes": ""}, "model": {"nome": "", "texto": ""}, "use": {"input": "", "data": "", "output": ""}}:
+            if e.has_models:
                 self.gerar_models = True
                 models_elements.append(e)
 
@@ -193,7 +284,7 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
 
             models += "ENDMODELS" + "\n"
 
-            self.cartao += models
+            self.write(models)
 
     def generate_branch(self, elements=[]):
         """
@@ -208,21 +299,19 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         :type elements: list
         :return: Nao retorna valor, mas atualiza a variavel da instancia cartao
         """
-        branch = "/BRANCH" + "\n"
-        branch += "C < n1 >< n2 ><ref1><ref2>< R  >< L  >< C  >" + "\n"
-        branch += "C < n1 >< n2 ><ref1><ref2>< R  >< A  >< B  ><Leng><><>0" + "\n"
+        self.write("/BRANCH" + "\n")
+        self.write("C < n1 >< n2 ><ref1><ref2>< R  >< L  >< C  >" + "\n")
+        self.write("C < n1 >< n2 ><ref1><ref2>< R  >< A  >< B  ><Leng><><>0" + "\n")
         for e in elements:
             if e.branch != "":
-                branch += e.branch + "\n"
-        self.cartao += branch
+                self.write(e.branch + "\n")
 
     def generate_equivalent(self, equivalent=[]):
-        branch = "C EQUIVALENTES\n"
+        self.write("C EQUIVALENTES\n")
         for e in equivalent:
             if e.branch != "":
-                branch += e.branch + "\n"
-        branch += "C /EQUIVALENTES\n"
-        self.cartao += branch
+                self.write(e.branch + "\n")
+        self.write("C /EQUIVALENTES\n")
 
     def generate_switch(self, elements=[]):
         """
@@ -236,12 +325,11 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         :type elements: list
         :return: Nao retorna valor, mas atualiza a variavel da instancia cartao
         """
-        switch = "/SWITCH" + "\n"
-        switch += "C < n 1>< n 2>< Tclose ><Top/Tde ><   Ie   ><Vf/CLOP ><  type  >" + "\n"
+        self.write("/SWITCH" + "\n")
+        self.write("C < n 1>< n 2>< Tclose ><Top/Tde ><   Ie   ><Vf/CLOP ><  type  >" + "\n")
         for e in elements:
             if e.switch != "":
-                switch += e.switch + "\n"
-        self.cartao += switch
+                self.write(e.switch + "\n")
 
     def generate_source(self, elements=[]):
         """
@@ -256,12 +344,11 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         :type elements: list
         :return: Nao retorna valor, mas atualiza a variavel da instancia cartao
         """
-        source = "/SOURCE" + "\n"
-        source += "C < n 1><>< Ampl.  >< Freq.  ><Phase/T0><   A1   ><   T1   >< TSTART >< TSTOP  >" + "\n"
+        self.write("/SOURCE" + "\n")
+        self.write("C < n 1><>< Ampl.  >< Freq.  ><Phase/T0><   A1   ><   T1   >< TSTART >< TSTOP  >" + "\n")
         for e in elements:
             if e.source != "":
-                source += e.source + "\n"
-        self.cartao += source
+                self.write(e.source + "\n")
 
     def generate_output(self, elements=[]):
         """
@@ -274,7 +361,7 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         :type elements: list
         :return: Nao retorna valor, mas atualiza a variavel da instancia cartao
         """
-        output = "/OUTPUT" + "\n"
+        self.write("/OUTPUT" + "\n")
         output_list = []
         for e in elements:
             if e.output != "":
@@ -283,7 +370,6 @@ class ATPCard(object): #Verificar linhas relacionadas a Models, caso continuem n
         for position in range(0, len(output_list), 13):
             output_separate_lists.append(output_list[position:position+13])
         for (n, output_row) in enumerate(output_separate_lists):
-            output += "  " + "".join(output_row)
+            self.write("  " + "".join(output_row))
             if not n == len(output_separate_lists):
-                output += "\n"
-        self.cartao += output
\ No newline at end of file
+                self.write("\n")
\ No newline at end of file
@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+
+from os.path import isfile, join
+
+
+class CaseFingerprint(object):
+    """
+    Classe responsavel pela regeneracao incremental dos casos.
+    Armazena, no diretorio de saida, o hash de cada item de cada secao do dicionario de entrada, das opcoes de geracao,
+    do texto do arquivo .dat de cada linha e do texto de cada cartao gerado. Em uma nova execucao, as linhas cujo
+    arquivo .dat nao foi alterado reutilizam o arquivo .lib existente, e os cartoes e resultados inalterados nao sao
+    reescritos nem reexecutados. Os resultados tambem sao refeitos quando as opcoes de exportacao mudam.
+    Exemplo:
+    >> fingerprint = CaseFingerprint(simulation_path="output")
+    >> fingerprint.fingerprint_input(feeder_dict=feeder_dict, options={"deltat": 1e-8})
+    >> fingerprint.changed_sections()
+    """
+    filename = "fingerprints.json"
+
+    def __init__(self, simulation_path):
+        """
+        Metodo Construtor da Classe.
+        :param simulation_path: Diretorio de saida onde os hashes sao armazenados
+        :type simulation_path: basestring
+        """
+        self.path = join(simulation_path, CaseFingerprint.filename)
+        try:
+            with open(self.path, "r") as fingerprint_file:
+                self.previous = json.load(fingerprint_file)
+        except (FileNotFoundError, ValueError):
+            self.previous = {}
+        self.current = {
+            "sections": {}, "options": {}, "lines": {}, "cards": {}, "results": {},
+            "result_options": CaseFingerprint.digest({})
+        }
+        self.changed_cards = set()
+
+    @staticmethod
+    def digest(obj):
+        """
+        :return: Hash SHA-256 da representacao JSON (com chaves ordenadas) de obj, ou do proprio texto se obj for str
+        :rtype: basestring
+        """
+        if not isinstance(obj, str):
+            obj = json.dumps(obj, sort_keys=True, default=str)
+        return hashlib.sha256(obj.encode("utf-8")).hexdigest()
+
+    def previous_value(self, group, key):
+        return self.previous.get(group, {}).get(key, None)
+
+    def fingerprint_input(self, feeder_dict, options=None, result_options=None):
+        """
+        Calcula os hashes de cada item das secoes do dicionario de entrada e das opcoes de geracao.
+        :param feeder_dict: Dicionario de entrada do alimentador
+        :type feeder_dict: dict
+        :param options: Opcoes que alteram os casos gerados (passo, tempo maximo, area de cobertura, ...)
+        :type options: dict
+        :param result_options: Opcoes que alteram apenas os resultados exportados (formato, compressao, ...)
+        :type result_options: dict
+        """
+        for (section, items) in feeder_dict.items():
+            self.current["sections"][section] = {
+                str(code): CaseFingerprint.digest(item) for (code, item) in items.items()
+            }
+        all_options = dict(options or {})
+        all_options.update(result_options or {})
+        self.current["options"] = {
+            key: CaseFingerprint.digest(value) for (key, value) in all_options.items()
+        }
+        self.current["result_options"] = CaseFingerprint.digest(result_options or {})
+
+    def changed_sections(self):
+        """
+        :return: Secoes do dicionario de entrada com itens adicionados, removidos ou alterados desde a execucao anterior
+        :rtype: list
+        """
+        previous_sections = self.previous.get("sections", {})
+        sections = set(previous_sections.keys()) | set(self.current["sections"].keys())
+        return sorted(
+            section for section in sections
+            if previous_sections.get(section, None) != self.current["sections"].get(section, None)
+        )
+
+    def changed_options(self):
+        previous_options = self.previous.get("options", {})
+        options = set(previous_options.keys()) | set(self.current["options"].keys())
+        return sorted(
+            option for option in options
+            if previous_options.get(option, None) != self.current["options"].get(option, None)
+        )
+
+    def line_unchanged(self, dat_name, dat_linhas):
+        """
+        Registra o hash do arquivo .dat de uma linha e verifica se ele e igual ao da execucao anterior.
+        :rtype: bool
+        """
+        line_digest = CaseFingerprint.digest(dat_linhas)
+        self.current["lines"][dat_name] = line_digest
+        return self.previous_value(group="lines", key=dat_name) == line_digest
+
+    def card_unchanged(self, card_name, cartao, complete_filename, includes=""):
+        """
+        Registra o hash de um cartao e verifica se ele e igual ao da execucao anterior e se o arquivo ainda existe.
+        :param includes: Texto dos arquivos incluidos pelo cartao (.lib), que tambem altera os resultados
+        :type includes: basestring
+        :rtype: bool
+        """
+        card_digest = CaseFingerprint.digest(cartao + includes)
+        self.current["cards"][card_name] = card_digest
+        if self.previous_value(group="cards", key=card_name) == card_digest and isfile(complete_filename):
+            result_digest = self.result_digest(card_name=card_name)
+            if self.previous_value(group="results", key=card_name) == result_digest:
+                self.current["results"][card_name] = result_digest
+            return True
+        self.changed_cards.add(card_name)
+        return False
+
+    def result_digest(self, card_name):
+        """
+        :return: Hash dos resultados de um cartao, que depende do cartao e das opcoes de exportacao
+        :rtype: basestring
+        """
+        card_digest = self.current["cards"].get(card_name, None)
+        if card_digest is None:
+            return None
+        return CaseFingerprint.digest(card_digest + self.current["result_options"])
+
+    def result_unchanged(self, card_name, result_filename):
+        """
+        Verifica se os resultados exportados de um cartao foram gerados a partir do mesmo cartao e com as mesmas opcoes
+        de exportacao na execucao anterior.
+        :rtype: bool
+        """
+        result_digest = self.result_digest(card_name=card_name)
+        if result_digest is not None and self.previous_value(group="results", key=card_name) == result_digest \
+                and isfile(result_filename):
+            self.current["results"][card_name] = result_digest
+            return True
+        return False
+
+    def record_result(self, card_name):
+        self.current["results"][card_name] = self.result_digest(card_name=card_name)
+
+    def save(self):
+        temp_path = self.path + ".{0}.tmp".format(os.getpid())
+        with open(temp_path, "w") as fingerprint_file:
+            json.dump(obj=self.current, fp=fingerprint_file, indent=4, sort_keys=True)
+        os.replace(temp_path, self.path)
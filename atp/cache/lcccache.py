@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+
+from pathlib import Path
+from os.path import abspath, isdir, isfile, join
+
+
+class LCCCache(object):
+    """
+    Classe responsavel pelo cache persistente dos resultados da rotina LINE CONSTANTS/JMARTI SETUP do ATP.
+    Cada entrada e identificada pelo hash do texto exato do arquivo .dat e armazena as linhas do arquivo .pch e o
+    corpo do arquivo .lib gerado, permitindo reutilizar os resultados entre execucoes e diretorios de saida.
+    """
+    def __init__(self, cache_path=None, max_size=200 * 1024 ** 2):
+        """
+        Metodo Construtor da Classe.
+        :param cache_path: Diretorio do cache (Se None, utiliza o diretorio padrao na pasta do usuario)
+        :type cache_path: basestring
+        :param max_size: Tamanho maximo do cache em bytes, acima do qual as entradas menos usadas sao removidas
+        :type max_size: int
+        """
+        if not cache_path:
+            cache_path = join(str(Path.home()), ".atpcasesgenerator", "lcc_cache")
+        self.cache_path = abspath(cache_path)
+        self.max_size = int(max_size)
+        self.hits = 0
+        self.misses = 0
+
+        if not isdir(self.cache_path):
+            os.makedirs(self.cache_path)
+
+    @staticmethod
+    def generate_key(dat_linhas, dat_name):
+        """
+        Gera a chave do cache a partir do texto do arquivo .dat.
+        O nome do arquivo .pch na linha $PUNCH e removido, pois depende apenas dos nos da linha e nao altera o
+        resultado da rotina.
+        :param dat_linhas: Texto completo do arquivo .dat
+        :type dat_linhas: basestring
+        :param dat_name: Nome do arquivo .dat
+        :type dat_name: basestring
+        :return: Hash SHA-256 do texto normalizado
+        :rtype: basestring
+        """
+        dat_text = dat_linhas.replace("$PUNCH, " + dat_name + ".pch\n", "$PUNCH\n")
+        return hashlib.sha256(dat_text.encode("utf-8")).hexdigest()
+
+    def entry_path(self, key):
+        return join(self.cache_path, key + ".json")
+
+    def get(self, key):
+        """
+        Busca uma entrada no cache, atualizando o contador de acertos ou falhas.
+        :param key: Chave gerada por generate_key
+        :type key: basestring
+        :return: Dicionario com as chaves "pch" e "lib" ou None caso a entrada nao exista
+        :rtype: dict
+        """
+        entry_path = self.entry_path(key=key)
+        try:
+            with open(entry_path, "r") as entry_file:
+                entry = json.load(entry_file)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(entry_path)  # Marca a entrada como usada recentemente para a politica de remocao
+        self.hits += 1
+        return entry
+
+    def put(self, key, pch_linhas, lib_linhas):
+        """
+        Armazena uma entrada no cache e remove as entradas mais antigas caso o tamanho maximo seja excedido.
+        :param key: Chave gerada por generate_key
+        :type key: basestring
+        :param pch_linhas: Linhas selecionadas do arquivo .pch
+        :type pch_linhas: list
+        :param lib_linhas: Corpo do arquivo .lib
+        :type lib_linhas: basestring
+        """
+        entry_path = self.entry_path(key=key)
+        temp_path = entry_path + ".{0}.tmp".format(os.getpid())
+        with open(temp_path, "w") as entry_file:
+            json.dump(obj={"pch": pch_linhas, "lib": lib_linhas}, fp=entry_file)
+        os.replace(temp_path, entry_path)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove as entradas usadas ha mais tempo ate que o tamanho do cache seja inferior ao tamanho maximo.
+        """
+        entries = []
+        total_size = 0
+        for entry_name in os.listdir(self.cache_path):
+            entry_path = join(self.cache_path, entry_name)
+            if entry_name.endswith(".json") and isfile(entry_path):
+                entry_stat = os.stat(entry_path)
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+                total_size += entry_stat.st_size
+
+        for (mtime, size, entry_path) in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        for entry_name in os.listdir(self.cache_path):
+            if entry_name.endswith(".json"):
+                os.remove(join(self.cache_path, entry_name))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
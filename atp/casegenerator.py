@@ -4,9 +4,9 @@ import os
 
 from os.path import abspath, join, dirname
 
-from copy import deepcopy as copy
-
 from atp.node.node import Node
+from atp.node.busregistry import BusRegistry
+from atp.node.nodenumbering import NodeNumbering
 from atp.element.source.voltageac_3ph import VoltageAC_3ph
 from atp.element.source.voltageac import VoltageAC
 from atp.element.source.currentheidler import CurrentHEIDLER
@@ -17,22 +17,31 @@ from atp.element.branch.surgearresterieee import SurgeArresterIEEE
 from atp.element.branch.ground import Ground
 from atp.element.output.voltageprobe import VoltageProbe
 from atp.atpcard.card import ATPCard
+from atp.executor import ATPExecutor
+from exceptions.exceptions import LineTemplateError
 
 
 def create_atp_file(atp_card, folder_path, atp_filename):
     if not atp_filename[-4:] == ".atp":
         atp_filename += ".atp"
     atp_file = open(os.path.join(folder_path, atp_filename), 'w+')
-    atp_file.write(atp_card)
+    if isinstance(atp_card, ATPCard):
+        atp_card.write_file(atp_file)
+    else:
+        atp_file.write(atp_card)
     atp_file.close()
 
 
 class CaseGenerator(object):
-    def __init__(self, feeder):
+    def __init__(self, feeder, lcc_cache=None, fingerprint=None, numbering=None):
         self.feeder = feeder
+        self.lcc_cache = lcc_cache
+        self.fingerprint = fingerprint
+        # Cada caso numera os seus nos a partir de zero, independente de outros casos gerados no mesmo processo
+        self.numbering = numbering if numbering is not None else NodeNumbering()
         self.atp_card_base = ATPCard()
         self.atp_card_mod_surge = None
-        self.bus = []
+        self.bus = BusRegistry()
         self.line = []
         self.source = []
         self.load = []
@@ -45,7 +54,8 @@ class CaseGenerator(object):
         self.surge_arrester_ground = []
 
     def generate_card(self, simulation_path, execution_cmd, create_file=True, overwrite_line=True, deltat=1e-8,
-                      tmax=0.01):
+                      tmax=0.01, jobs=1, per_unit_template=False, jmarti=True, check_template=False, timeout=None,
+                      retries=2):
         self.generate_bus()
 
         self.generate_elements()
@@ -53,7 +63,13 @@ class CaseGenerator(object):
         self.generate_line(
             simulation_path=simulation_path,
             execution_cmd=execution_cmd,
-            overwrite=overwrite_line
+            overwrite=overwrite_line,
+            jobs=jobs,
+            per_unit_template=per_unit_template,
+            jmarti=jmarti,
+            check_template=check_template,
+            timeout=timeout,
+            retries=retries
         )
 
         self.generate_output(
@@ -105,8 +121,8 @@ class CaseGenerator(object):
         self.atp_card_base.generate_output(elements=self.elements)
         self.atp_card_base.end_card()
         if create_file:
-            create_atp_file(
-                atp_card=self.atp_card_base.cartao,
+            self.write_card(
+                atp_card=self.atp_card_base,
                 folder_path=simulation_path,
                 atp_filename="base_feeder"
             )
@@ -114,12 +130,25 @@ class CaseGenerator(object):
         self.generate_surge()
 
         if create_file:
-            create_atp_file(
-                atp_card=self.atp_card_mod_surge.cartao,
+            self.write_card(
+                atp_card=self.atp_card_mod_surge,
                 folder_path=simulation_path,
                 atp_filename="surge_feeder"
             )
 
+    def write_card(self, atp_card, folder_path, atp_filename, card_name=None):
+        # Na regeneracao incremental, os cartoes inalterados desde a execucao anterior nao sao reescritos
+        if self.fingerprint is not None:
+            unchanged = self.fingerprint.card_unchanged(
+                card_name=card_name if card_name is not None else atp_filename,
+                cartao=atp_card.cartao if isinstance(atp_card, ATPCard) else atp_card,
+                complete_filename=join(folder_path, atp_filename + ".atp"),
+                includes="".join(line.lib_linhas for line in self.line if isinstance(line, LCC))
+            )
+            if unchanged:
+                return
+        create_atp_file(atp_card=atp_card, folder_path=folder_path, atp_filename=atp_filename)
+
     def generate_bus(self):
         for bus_name in sorted(self.feeder.graph.nodes()):
             bus = self.feeder.graph.nodes[bus_name]
@@ -128,7 +157,8 @@ class CaseGenerator(object):
                     Node(
                         name=bus_name,
                         type="Poste",
-                        sequence=bus["phase"]
+                        sequence=bus["phase"],
+                        numbering=self.numbering
                     )
                 )
 
@@ -138,12 +168,7 @@ class CaseGenerator(object):
             if "source" in bus:
                 for (code, source) in bus["source"].items():
                     if bus["area"]:
-                        bus_obj_source = list(
-                            filter(
-                                lambda b: b.name == bus_name,
-                                self.bus
-                            )
-                        )[0]
+                        bus_obj_source = self.bus.by_name(bus_name)
 
                         phases = []
                         for ph in bus["phase"]:
@@ -199,27 +224,18 @@ class CaseGenerator(object):
                         bus_frontier_name = self.feeder.bus_frontier[eq_bus_pos]
                         z_eq = self.feeder.equivalent_values[eq_bus_pos]
 
-                        bus_obj_frontier = list(
-                            filter(
-                                lambda b: b.name == bus_frontier_name,
-                                self.bus
-                            )
-                        )[0]
+                        bus_obj_frontier = self.bus.by_name(bus_frontier_name)
 
                         self.bus.append(
                             Node(
                                 name="sourcebus_" + code,
                                 type="Outro",
-                                sequence=bus_obj_frontier.sequence
+                                sequence=bus_obj_frontier.sequence,
+                                numbering=self.numbering
                             )
                         )
 
-                        bus_obj_source = list(
-                            filter(
-                                lambda b: b.name == "sourcebus_" + code,
-                                self.bus
-                            )
-                        )[0]
+                        bus_obj_source = self.bus.by_name("sourcebus_" + code)
 
                         phases = []
                         for ph in bus_obj_source.sequence:
@@ -282,12 +298,7 @@ class CaseGenerator(object):
                 dump_resistance = 0.001
                 for (code, capacitor) in bus["capacitor"].items():
                     if bus["area"]:
-                        bus_obj = list(
-                            filter(
-                                lambda b: b.name == bus_name,
-                                self.bus
-                            )
-                        )[0]
+                        bus_obj = self.bus.by_name(bus_name)
 
                         if bus_obj.sequence == "ABC":
                             self.capacitor.append(
@@ -340,12 +351,7 @@ class CaseGenerator(object):
             if "load" in bus:
                 for (code, load) in bus["load"].items():
                     if bus["area"]:
-                        bus_obj = list(
-                            filter(
-                                lambda b: b.name == bus_name,
-                                self.bus
-                            )
-                        )[0]
+                        bus_obj = self.bus.by_name(bus_name)
 
                         if bus_obj.sequence == "ABC":
                             self.load.append(
@@ -394,22 +400,17 @@ class CaseGenerator(object):
                                     )
                                 )
 
-    def generate_line(self, simulation_path, execution_cmd, overwrite=False, min_lim_km=0.01):
+    def generate_line(self, simulation_path, execution_cmd, overwrite=False, min_lim_km=0.01, jobs=1,
+                      per_unit_template=False, jmarti=True, check_template=False, unit_length_km=1.0, timeout=None,
+                      retries=2):
+        # With more than one job, the ATP runs are deferred and executed by a pool after all lines are collected
+        execute = jobs <= 1
+        line_specs = []
         for (edge_from, edge_to) in self.feeder.graph.edges():
             branch = self.feeder.graph[edge_from][edge_to]
             if branch["area"]:
-                bus_neg = list(
-                    filter(
-                        lambda b: b.name == edge_from,
-                        self.bus
-                    )
-                )[0]
-                bus_pos = list(
-                    filter(
-                        lambda b: b.name == edge_to,
-                        self.bus
-                    )
-                )[0]
+                bus_neg = self.bus.by_name(edge_from)
+                bus_pos = self.bus.by_name(edge_to)
 
                 length_line = float(branch["length"] / 1e3)
 
@@ -447,18 +448,114 @@ class CaseGenerator(object):
                         "fase": phase
                     }
                     cond.append(cond_phase)
-                lcc = LCC(
-                    cond=cond,
-                    dist=length_line,
-                    bus_pos=bus_pos,
-                    bus_neg=bus_neg,
-                    dat_name=bus_neg.node.lower() + "_" + bus_pos.node.lower(),
-                    rho=branch["rho"],
-                    simulation_path=simulation_path,
-                    run_cmd=execution_cmd,
-                    overwrite=overwrite
+
+                # JMARTI models depend on the line length, so only lines with the same length can share a template
+                construction = (cond_type, struct_type, sequence, branch["rho"], jmarti)
+                if jmarti:
+                    construction += (length_line,)
+
+                line_specs.append(
+                    {
+                        "cond": cond,
+                        "dist": length_line,
+                        "bus_pos": bus_pos,
+                        "bus_neg": bus_neg,
+                        "rho": branch["rho"],
+                        "construction": construction
+                    }
+                )
+
+        # Template names depend only on the order of the constructions, so their .pch files are always regenerated
+        templates = {}
+        if per_unit_template:
+            for spec in line_specs:
+                if spec["construction"] not in templates:
+                    templates[spec["construction"]] = LCC(
+                        cond=spec["cond"],
+                        dist=spec["dist"] if jmarti else float(unit_length_km),
+                        bus_pos=spec["bus_pos"],
+                        bus_neg=spec["bus_neg"],
+                        dat_name="template_{0:04d}".format(len(templates)),
+                        rho=spec["rho"],
+                        simulation_path=simulation_path,
+                        run_cmd=execution_cmd,
+                        jmarti=jmarti,
+                        overwrite=True,
+                        cache=self.lcc_cache,
+                        execute=execute,
+                        timeout=timeout,
+                        retries=retries,
+                        fingerprint=self.fingerprint
+                    )
+
+            if not execute:
+                ATPExecutor.execute_lcc_pool(lcc_list=list(templates.values()), jobs=jobs)
+
+        lcc_list = []
+        for spec in line_specs:
+            lcc = LCC(
+                cond=spec["cond"],
+                dist=spec["dist"],
+                bus_pos=spec["bus_pos"],
+                bus_neg=spec["bus_neg"],
+                dat_name=spec["bus_neg"].node.lower() + "_" + spec["bus_pos"].node.lower(),
+                rho=spec["rho"],
+                simulation_path=simulation_path,
+                run_cmd=execution_cmd,
+                jmarti=jmarti,
+                overwrite=overwrite,
+                cache=self.lcc_cache,
+                execute=execute,
+                template=templates.get(spec["construction"], None),
+                timeout=timeout,
+                retries=retries,
+                fingerprint=self.fingerprint
+            )
+            lcc_list.append(lcc)
+
+        if not execute:
+            ATPExecutor.execute_lcc_pool(lcc_list=lcc_list, jobs=jobs)
+
+        if per_unit_template and check_template:
+            checked = []
+            for (spec, lcc) in zip(line_specs, lcc_list):
+                if spec["construction"] not in checked:
+                    checked.append(spec["construction"])
+                    self.check_line_template(
+                        lcc=lcc,
+                        simulation_path=simulation_path,
+                        execution_cmd=execution_cmd,
+                        timeout=timeout,
+                        retries=retries
+                    )
+
+        self.line.extend(lcc_list)
+
+    def check_line_template(self, lcc, simulation_path, execution_cmd, rel_tol=1e-2, timeout=None, retries=2):
+        # Runs the per-branch line constants for a line built from a template and compares both .lib files
+        reference = LCC(
+            cond=lcc.cond,
+            dist=lcc.dist,
+            bus_pos=lcc.bus_pos,
+            bus_neg=lcc.bus_neg,
+            dat_name=lcc.dat_name + "_check",
+            rho=lcc.rho,
+            simulation_path=simulation_path,
+            run_cmd=execution_cmd,
+            jmarti=lcc.jmarti,
+            overwrite=True,
+            cache=self.lcc_cache,
+            timeout=timeout,
+            retries=retries
+        )
+        if not LCC.compare_lib(lib_a=lcc.lib_linhas, lib_b=reference.lib_linhas, rel_tol=rel_tol):
+            raise LineTemplateError(
+                message="Line template does not match the per-branch line constants",
+                errors="The line '{0}' generated from a template differs from '{1}'.".format(
+                    lcc.complete_lib,
+                    reference.complete_lib
                 )
-                self.line.append(lcc)
+            )
 
     def generate_output(self, list_bus_obj):
         for bus in list_bus_obj:
@@ -469,12 +566,7 @@ class CaseGenerator(object):
                 zip(self.feeder.bus_frontier, self.feeder.equivalent_graphs, self.feeder.equivalent_values)
         ):
             if self.feeder.main_source_bus not in graph.nodes():
-                bus = list(
-                    filter(
-                        lambda b: b.name == bus_frontier,
-                        self.bus
-                    )
-                )[0]
+                bus = self.bus.by_name(bus_frontier)
                 if z["A"] is not None and bus.phaseA is not None:
                     self.equivalent.append(
                         RLC(
@@ -547,14 +639,14 @@ class CaseGenerator(object):
             if "surge_arrester" in bus:
                 for (code, surge_arrester) in bus["surge_arrester"].items():
                     if bus["area"]:
-                        bus_obj = list(
-                            filter(
-                                lambda b: b.name == bus_name,
-                                self.bus
-                            )
-                        )[0]
+                        bus_obj = self.bus.by_name(bus_name)
 
-                        bus_obj_ground = Node(name="Terra " + bus_obj.name, type="Terra", sequence=bus_obj.sequence)
+                        bus_obj_ground = Node(
+                            name="Terra " + bus_obj.name,
+                            type="Terra",
+                            sequence=bus_obj.sequence,
+                            numbering=self.numbering
+                        )
 
                         if "A" in surge_arrester_phases and bus_obj.phaseA is not None:
                             surge_arrester_number += 1
@@ -569,7 +661,8 @@ class CaseGenerator(object):
                                     phase_neg="A",
                                     d=surge_arrester_type["height"],
                                     n=surge_arrester_type["columns"],
-                                    prnumber=surge_arrester_number
+                                    prnumber=surge_arrester_number,
+                                    numbering=self.numbering
                                 )
                             )
                             self.surge_arrester_ground.append(
@@ -579,7 +672,8 @@ class CaseGenerator(object):
                                     l=surge_arrester["length"],
                                     ro=surge_arrester["ro"],
                                     phase_pos="A",
-                                    gndnumber=int(ground_number)
+                                    gndnumber=int(ground_number),
+                                    numbering=self.numbering
                                 )
                             )
 
@@ -596,7 +690,8 @@ class CaseGenerator(object):
                                     phase_neg="B",
                                     d=surge_arrester_type["height"],
                                     n=surge_arrester_type["columns"],
-                                    prnumber=surge_arrester_number
+                                    prnumber=surge_arrester_number,
+                                    numbering=self.numbering
                                 )
                             )
                             self.surge_arrester_ground.append(
@@ -606,7 +701,8 @@ class CaseGenerator(object):
                                     l=surge_arrester["length"],
                                     ro=surge_arrester["ro"],
                                     phase_pos="B",
-                                    gndnumber=int(ground_number)
+                                    gndnumber=int(ground_number),
+                                    numbering=self.numbering
                                 )
                             )
 
@@ -623,7 +719,8 @@ class CaseGenerator(object):
                                     phase_neg="C",
                                     d=surge_arrester_type["height"],
                                     n=surge_arrester_type["columns"],
-                                    prnumber=surge_arrester_number
+                                    prnumber=surge_arrester_number,
+                                    numbering=self.numbering
                                 )
                             )
                             self.surge_arrester_ground.append(
@@ -633,7 +730,8 @@ class CaseGenerator(object):
                                     l=surge_arrester["length"],
                                     ro=surge_arrester["ro"],
                                     phase_pos="C",
-                                    gndnumber=int(ground_number)
+                                    gndnumber=int(ground_number),
+                                    numbering=self.numbering
                                 )
                             )
 
@@ -643,45 +741,107 @@ class CaseGenerator(object):
             if "surge" in bus:
                 for (code, surge) in bus["surge"].items():
                     if bus["area"]:
-                        bus_obj_surge = list(
-                            filter(
-                                lambda b: b.name == bus_name,
-                                self.bus
-                            )
-                        )[0]
-                        if "A" in surge_phases and bus_obj_surge.phaseA is not None:
-                            self.surge.append(
-                                CurrentHEIDLER(
-                                    bus_pos=bus_obj_surge,
-                                    phase_pos="A",
-                                    amp=surge["amp"],
-                                    tfront=surge["tfront"],
-                                    tau=surge["tau"]
-                                )
-                            )
-                        if "B" in surge_phases and bus_obj_surge.phaseB is not None:
-                            self.surge.append(
-                                CurrentHEIDLER(
-                                    bus_pos=bus_obj_surge,
-                                    phase_pos="B",
-                                    amp=surge["amp"],
-                                    tfront=surge["tfront"],
-                                    tau=surge["tau"]
-                                )
-                            )
-                        if "C" in surge_phases and bus_obj_surge.phaseC is not None:
-                            self.surge.append(
-                                CurrentHEIDLER(
-                                    bus_pos=bus_obj_surge,
-                                    phase_pos="C",
-                                    amp=surge["amp"],
-                                    tfront=surge["tfront"],
-                                    tau=surge["tau"]
-                                )
-                            )
+                        bus_obj_surge = self.bus.by_name(bus_name)
+                        self.surge += self.generate_surge_sources(
+                            bus_obj=bus_obj_surge,
+                            amp=surge["amp"],
+                            tfront=surge["tfront"],
+                            tau=surge["tau"],
+                            surge_phases=surge_phases
+                        )
         surge_sources = ""
         for surge in self.surge:
             if surge.source != "":
                 surge_sources += surge.source + "\n"
-        self.atp_card_mod_surge = copy(self.atp_card_base)
-        self.atp_card_mod_surge.cartao = self.atp_card_mod_surge.cartao.replace("C INSERIR RAIOS AQUI\n", surge_sources)
+        self.atp_card_mod_surge = self.atp_card_base.derive(surge=surge_sources)
+
+    @staticmethod
+    def generate_surge_sources(bus_obj, amp, tfront, tau, surge_phases="ABC"):
+        surge_sources = []
+        for phase in "ABC":
+            if phase in surge_phases and getattr(bus_obj, "phase" + phase) is not None:
+                surge_sources.append(
+                    CurrentHEIDLER(
+                        bus_pos=bus_obj,
+                        phase_pos=phase,
+                        amp=amp,
+                        tfront=tfront,
+                        tau=tau
+                    )
+                )
+        return surge_sources
+
+    def generate_sweep(self, simulation_path, buses=None, amps=(10000.0,), tfronts=(1.2e-6,), taus=(5e-5,),
+                       surge_phases="ABC", sweep_dirname="sweep"):
+        """
+        Gera um caso de surto para cada combinacao de barra, amplitude, tempo de frente e tempo de cauda.
+        O cartao base (gerado por generate_card) e dividido uma unica vez na marcacao dos raios, de forma que cada caso
+        e composto apenas pelos trechos do cartao base e pelas fontes de surto.
+        Cada caso e escrito em um diretorio numerado (sweep/00001/surge_feeder.atp, ...), e os parametros de cada
+        caso sao registrados no arquivo sweep/manifest.json.
+        :param simulation_path: Diretorio da simulacao
+        :type simulation_path: basestring
+        :param buses: Lista das barras atingidas (Se None, todas as barras da area de cobertura)
+        :type buses: list
+        :param amps: Amplitudes das fontes de surto em A
+        :type amps: list
+        :param tfronts: Tempos de frente das fontes de surto em s
+        :type tfronts: list
+        :param taus: Tempos de cauda das fontes de surto em s
+        :type taus: list
+        :param surge_phases: Fases atingidas em cada barra
+        :type surge_phases: basestring
+        :param sweep_dirname: Nome do diretorio dos casos
+        :type sweep_dirname: basestring
+        :return: Lista com os parametros de cada caso gerado, conforme o arquivo manifest.json
+        :rtype: list
+        """
+        if buses is None:
+            buses = [
+                bus_name for bus_name in sorted(self.feeder.graph.nodes()) if self.feeder.graph.nodes[bus_name]["area"]
+            ]
+
+        sweep_path = join(simulation_path, sweep_dirname)
+        os.makedirs(sweep_path, exist_ok=True)
+
+        manifest = []
+        for bus_name in buses:
+            bus_obj = self.bus.by_name(bus_name)
+            for amp in amps:
+                for tfront in tfronts:
+                    for tau in taus:
+                        surge_sources = ""
+                        for surge in self.generate_surge_sources(
+                                bus_obj=bus_obj,
+                                amp=amp,
+                                tfront=tfront,
+                                tau=tau,
+                                surge_phases=surge_phases
+                        ):
+                            if surge.source != "":
+                                surge_sources += surge.source + "\n"
+
+                        case_dirname = "{0:05d}".format(len(manifest) + 1)
+                        case_path = join(sweep_path, case_dirname)
+                        os.makedirs(case_path, exist_ok=True)
+                        self.write_card(
+                            atp_card=self.atp_card_base.derive(surge=surge_sources),
+                            folder_path=case_path,
+                            atp_filename="surge_feeder",
+                            card_name=sweep_dirname + "/" + case_dirname + "/surge_feeder"
+                        )
+                        manifest.append(
+                            {
+                                "case": case_dirname,
+                                "bus": bus_name,
+                                "phases": surge_phases,
+                                "amp": amp,
+                                "tfront": tfront,
+                                "tau": tau
+                            }
+                        )
+
+        with open(join(sweep_path, "manifest.json"), "w") as manifest_file:
+            json.dump(obj=manifest, fp=manifest_file, indent=4)
+
+        return manifest
@@ -8,8 +8,9 @@ class Ground(Element):
     """
     Classe responsavel pela adicao do modelo de sistema de aterramento para altas frequencias.
     """
+    __slots__ = ("bus_pos", "phase_pos", "gndnumber", "hide_c", "R", "L", "C", "r", "c", "l")
 
-    def __init__(self, bus_pos, r, l, ro, phase_pos="A", gndnumber=1, hide_c=False):
+    def __init__(self, bus_pos, r, l, ro, phase_pos="A", gndnumber=1, hide_c=False, numbering=None):
         """
         Metodo Construtor da Classe.
         Baseado no modelo de Aterramento repassado pela equipe de modelagem.
@@ -25,6 +26,8 @@ class Ground(Element):
         :type ro: float
         :param gndnumber: Numero de identificacao do aterramento
         :type gndnumber: int
+        :param numbering: Contexto de numeracao do no interno do aterramento (Se None, a numeracao compartilhada)
+        :type numbering: NodeNumbering
         """
 
         super().__init__()
@@ -39,7 +42,7 @@ class Ground(Element):
         self.L = (m0 * l) / (2 * math.pi) * (math.log(4 * l / r) - 1)
         self.C = (2 * math.pi * e0 * l) * (math.log(4 * l / r) - 1)
 
-        gr_bus = Node("G" + str(self.gndnumber), "Terra", self.phase_pos)
+        gr_bus = Node("G" + str(self.gndnumber), "Terra", self.phase_pos, numbering=numbering)
         self.r = RLC(R=self.R, L=0, C=0, bus_pos=gr_bus, phase_pos=self.phase_pos, hide_c=True)
         self.c = RLC(R=0, L=0, C=self.C, bus_pos=gr_bus, phase_pos=self.phase_pos, hide_c=True)
         self.l = RLC(R=0, L=self.L, C=0, bus_pos=self.bus_pos, phase_pos=self.phase_pos, bus_neg=gr_bus, phase_neg=self.phase_pos, hide_c=True)
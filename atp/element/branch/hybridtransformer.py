@@ -10,6 +10,11 @@ class HybridTransformer(Element):
     """
     Classe responsavel pela adicao de Transformadores Hibridos.
     """
+    __slots__ = ("bus_core", "phase_core", "bus_ref_core", "bus_pos", "phase_pos", "bus_ref_pos", "bus_neg",
+                 "phase_neg", "bus_ref_neg", "flux", "curr", "flux2", "curr2", "Io", "listr", "listL", "listc",
+                 "listcurrentflux", "couplingp", "couplings", "databased", "n7", "n8", "r0", "r1", "r2", "r3", "r4",
+                 "r5", "l", "c", "c2", "zeroseq", "rdamp", "n0", "n1", "n2", "n3", "n4", "n5", "n6")
+
     def __init__(self, flux, curr, flux2, curr2, Io, rdamp, bus_core, bus_ref_core, bus_pos, bus_ref_pos, bus_neg, bus_ref_neg,
                  phase_core="A", phase_pos="A", phase_neg="A", zeroseq=0, omit=False, basefinal=False,
                  typecore="3leg_staked", databased="Typicalvalues", couplingp="Y", couplings="Y", listr=[], listL=[], listc=[], listcurrentflux=[[],[],[],[],[]]):
@@ -1,9 +1,13 @@
-import subprocess
 import os
+import re
 
 from atp.formatter.formatter import Formatter
+from atp.formatter.cardlayout import CardLayout
 from atp.element.element import Element
 from atp.node.node import Node
+from atp.cache.lcccache import LCCCache
+from atp.runner import ATPJob, ATPRunner
+from exceptions.exceptions import ATPExecutionError
 from os.path import isfile as file_exist
 
 
@@ -12,10 +16,35 @@ class LCC(Element):
     Classe responsavel pela adicao de linhas de transmissao usando a rotina LINE CONSTANTS, assim como a execucao do
     ATP para a criacao do arquivo .lib necessario para a inclusao de elementos desse tipo.
     """
+    __slots__ = ("cond", "dist", "dat_name", "bus_pos", "bus_neg", "run_cmd", "rho", "freq", "fcar", "icpr", "icap",
+                 "izpr", "modal", "itrnsf", "metric", "single", "hidden_icpr_izpr", "simulation_path", "jmarti",
+                 "freq_matrix", "freq_ss", "decades", "points_decades", "hide_c", "overwrite", "timeout", "retries",
+                 "pending", "dat_linhas", "complete_dat", "complete_pch", "complete_lib", "template", "cache",
+                 "cache_key", "lib_linhas")
+
+    layout_single = CardLayout(fields=[
+        ("ip", "int", 3, 3),
+        ("skin", "float", 5, 8),
+        ("resis", "float", 8, 16),
+        ("ix", "int", 2, 18),
+        ("react", "float", 8, 26),
+        ("diam", "float", 8, 34),
+        ("horiz", "float", 8, 42),
+        ("vtower", "float", 8, 50),
+        ("vmid", "float", 8, 58)
+    ])
+
+    layout_bundle = CardLayout(fields=list(layout_single.fields) + [
+        ("separ", "float", 8, 66),
+        ("alpha", "float", 6, 72),
+        ("nb", "int", 2, 80)
+    ])
+
     def __init__(self, cond, dist, dat_name, bus_pos, bus_neg, run_cmd, rho=80, freq=60, fcar=0, icpr=100000,
                  icap=0, izpr=100000, modal=1, itrnsf=-9, metric=True, single=True, hidden_icpr_izpr=True,
                  simulation_path="", jmarti=True, freq_matrix=60000, freq_ss=60, decades=8, points_decade=10,
-                 hide_c=False, overwrite=False):
+                 hide_c=False, overwrite=False, cache=None, execute=True, template=None, timeout=None, retries=2,
+                 fingerprint=None):
         """
         Metodo Construtor da Classe.
         Baseado no modelo encontrado no tópico 6 do Guia Resumido do Atp e na secao RB-210 do Atp RuleBook.
@@ -76,6 +105,24 @@ class LCC(Element):
         :type points_decade: int
         :param hide_c: Definicao da visibilidade da linha inicial e final com comentario (Se True, a linha e omitida)
         :type hide_c: bool
+        :param overwrite: Flag para a reexecucao do ATP mesmo que o arquivo .pch ja exista
+        :type overwrite: bool
+        :param cache: Cache persistente de resultados (Se None, o ATP e sempre executado)
+        :type cache: LCCCache
+        :param execute: Flag para a execucao imediata do ATP (Se False, a linha fica pendente ate a chamada de
+        complete_line, permitindo a execucao em paralelo pelo ATPExecutor)
+        :type execute: bool
+        :param template: Linha ja calculada com a mesma construcao, usada no lugar da execucao do ATP (No modelo LINE
+        CONSTANTS o comprimento e ajustado nos ramos do arquivo .lib; no modelo JMARTI o arquivo .lib e compartilhado e
+        a linha modelo deve ter o mesmo comprimento)
+        :type template: LCC
+        :param timeout: Tempo limite em segundos de cada execucao do ATP (Se None, sem limite)
+        :type timeout: float
+        :param retries: Numero de novas tentativas caso a execucao do ATP falhe ou nao gere o arquivo .pch
+        :type retries: int
+        :param fingerprint: Hashes da execucao anterior (Se o arquivo .dat nao foi alterado, o arquivo .lib existente e
+        reutilizado)
+        :type fingerprint: CaseFingerprint
         """
         super().__init__()
         self.cond = cond
@@ -102,6 +149,10 @@ class LCC(Element):
         self.decades = decades
         self.points_decades = points_decade
         self.hide_c = hide_c
+        self.overwrite = overwrite
+        self.timeout = timeout
+        self.retries = retries
+        self.pending = False
 
         self.dat_linhas = "BEGIN NEW DATA CASE\n"
 
@@ -117,33 +168,9 @@ class LCC(Element):
         if self.jmarti:
             self.dat_linhas += "LINE CONSTANTS\n"
         self.dat_linhas += "METRIC\n" if self.metric else "ENGLISH\n"
-        if self.single: # Caso de condutores solidos
-            for c in self.cond:
-                linha = Formatter.insertInteger(number=c['ip'], leng_max=3, start_position=0, final_position=3)
-                linha += Formatter.insertFloat(number=c['skin'], leng_max=5, start_position=len(linha), final_position=8)
-                linha += Formatter.insertFloat(number=c['resis'], leng_max=8, start_position=len(linha), final_position=16)
-                linha += Formatter.insertInteger(number=c['ix'], leng_max=2, start_position=len(linha), final_position=18)
-                linha += Formatter.insertFloat(number=c['react'], leng_max=8, start_position=len(linha), final_position=26)
-                linha += Formatter.insertFloat(number=c['diam'], leng_max=8, start_position=len(linha), final_position=34)
-                linha += Formatter.insertFloat(number=c['horiz'], leng_max=8, start_position=len(linha), final_position=42)
-                linha += Formatter.insertFloat(number=c['vtower'], leng_max=8, start_position=len(linha), final_position=50)
-                linha += Formatter.insertFloat(number=c['vmid'], leng_max=8, start_position=len(linha), final_position=58)
-                self.dat_linhas += linha + "\n"
-        else: # Caso de condutores multiplos
-            for c in self.cond:
-                linha = Formatter.insertInteger(number=c['ip'], leng_max=3, start_position=0, final_position=3)
-                linha += Formatter.insertFloat(number=c['skin'], leng_max=5, start_position=len(linha), final_position=8)
-                linha += Formatter.insertFloat(number=c['resis'], leng_max=8, start_position=len(linha), final_position=16)
-                linha += Formatter.insertInteger(number=c['ix'], leng_max=2, start_position=len(linha), final_position=18)
-                linha += Formatter.insertFloat(number=c['react'], leng_max=8, start_position=len(linha), final_position=26)
-                linha += Formatter.insertFloat(number=c['diam'], leng_max=8, start_position=len(linha), final_position=34)
-                linha += Formatter.insertFloat(number=c['horiz'], leng_max=8, start_position=len(linha), final_position=42)
-                linha += Formatter.insertFloat(number=c['vtower'], leng_max=8, start_position=len(linha), final_position=50)
-                linha += Formatter.insertFloat(number=c['vmid'], leng_max=8, start_position=len(linha), final_position=58)
-                linha += Formatter.insertFloat(number=c['separ'], leng_max=8, start_position=len(linha), final_position=66)
-                linha += Formatter.insertFloat(number=c['alpha'], leng_max=6, start_position=len(linha), final_position=72)
-                linha += Formatter.insertInteger(number=c['nb'], leng_max=2, start_position=len(linha), final_position=80)
-                self.dat_linhas += linha + "\n"
+        layout = LCC.layout_single if self.single else LCC.layout_bundle # Condutores solidos ou multiplos
+        for linha in layout.render_rows(self.cond):
+            self.dat_linhas += linha + "\n"
         self.dat_linhas += "BLANK CARD ENDING CONDUCTOR CARDS" + "\n"
         if self.jmarti:
             linha = Formatter.insertFloat(number=self.rho, leng_max=8, start_position=0, final_position=8)
@@ -199,44 +226,88 @@ class LCC(Element):
         self.dat_linhas += "BEGIN NEW DATA CASE\n"
         self.dat_linhas += "BLANK CARD\n"
 
-        complete_dat = os.path.join(self.simulation_path, self.dat_name + ".dat")
+        self.complete_dat = os.path.join(self.simulation_path, self.dat_name + ".dat")
+        self.complete_pch = os.path.join(self.simulation_path, self.dat_name + ".pch")
+        self.complete_lib = os.path.join(self.simulation_path, self.dat_name + ".lib")
+
+        self.template = template
+        self.cache = cache
+        self.cache_key = None
+        self.lib_linhas = None
+
+        if self.template is not None:
+            if self.jmarti:
+                self.complete_lib = self.template.complete_lib
+                self.lib_linhas = self.template.lib_linhas
+                self.generate_branch()
+                return
+            self.lib_linhas = self.template.scale_lib(dist=self.dist)
+
+        # Reutilizacao do arquivo .lib da execucao anterior caso o arquivo .dat nao tenha sido alterado
+        if self.lib_linhas is None and fingerprint is not None:
+            if fingerprint.line_unchanged(dat_name=self.dat_name, dat_linhas=self.dat_linhas) \
+                    and file_exist(self.complete_lib):
+                with open(self.complete_lib, "r") as arquivo_lib:
+                    self.lib_linhas = arquivo_lib.read()
+
+        # Consulta ao cache de resultados, evitando a execucao do ATP para arquivos .dat ja processados
+        if self.lib_linhas is None and self.cache is not None:
+            self.cache_key = LCCCache.generate_key(dat_linhas=self.dat_linhas, dat_name=self.dat_name)
+            cache_entry = self.cache.get(key=self.cache_key)
+            if cache_entry is not None:
+                self.lib_linhas = cache_entry["lib"]
+
+        if self.lib_linhas is None:
+            self.write_dat()
+            if not execute:
+                self.pending = True
+                return
+            self.execute_dat(overwrite=self.overwrite)
 
+        self.complete_line()
+
+    def complete_line(self):
+        """
+        Metodo para a finalizacao da linha apos a execucao do ATP, lendo o arquivo .pch e gerando o arquivo .lib e o
+        ramo do cartao.
+        """
+        if self.lib_linhas is None:
+            (linhas_sel, linha_cond) = self.read_pch()
+            self.lib_linhas = self.generate_lib(linhas_sel=linhas_sel, linha_cond=linha_cond)
+            if self.cache is not None:
+                self.cache.put(key=self.cache_key, pch_linhas=linhas_sel, lib_linhas=self.lib_linhas)
+
+        self.pending = False
+        self.write_lib()
+        self.generate_branch()
+
+    def write_dat(self):
         try:
-            arquivo_dat = open(complete_dat, 'r+')
+            arquivo_dat = open(self.complete_dat, 'r+')
             arquivo_dat.close()
-            arquivo_dat = open(complete_dat, 'w+')
+            arquivo_dat = open(self.complete_dat, 'w+')
         except FileNotFoundError:
-            arquivo_dat = open(complete_dat, 'w+')
+            arquivo_dat = open(self.complete_dat, 'w+')
 
         arquivo_dat.write(self.dat_linhas)
         arquivo_dat.close()
 
+    def execute_dat(self, overwrite=False):
         # Execucao do arquivo .dat no ATP para a criacao do arquivo .pch, usado na geracao do arquivo .lib
-        try:
-            arquivo_pch = open(os.path.join(self.simulation_path, self.dat_name + ".pch"), 'r+')
-            arquivo_pch.close()
-            if overwrite:
-                work = False
-                while work is not True:
-                    complete_command = [
-                        self.run_cmd,
-                        os.path.join(self.simulation_path, self.dat_name + ".dat"),
-                        ">nul"
-                    ]
-                    subprocess.call(complete_command, shell=True)
-                    work = file_exist(os.path.join(self.simulation_path,self.dat_name+".pch"))
-        except FileNotFoundError:
-            work = False
-            while work is not True:
-                complete_command = [
-                    self.run_cmd,
-                    os.path.join(self.simulation_path, self.dat_name + ".dat"),
-                    ">nul"
-                ]
-                subprocess.call(complete_command, shell=True)
-                work = file_exist(os.path.join(self.simulation_path, self.dat_name + ".pch"))
-
-        arquivo_pch = open(os.path.join(self.simulation_path, self.dat_name + ".pch"), 'r+')
+        if file_exist(self.complete_pch) and not overwrite:
+            return
+        runner = ATPRunner(execution_cmd=self.run_cmd, timeout=self.timeout, retries=self.retries)
+        job = runner.run_job(job=ATPJob(filename=self.complete_dat, outputs=[self.complete_pch], name=self.dat_name))
+        if not job.done:
+            raise ATPExecutionError(
+                message="LINE CONSTANTS execution failed",
+                errors="The execution of '{0}' ended as '{1}' after {2} attempt(s).".format(
+                    job.filename, job.status, job.attempts
+                )
+            )
+
+    def read_pch(self):
+        arquivo_pch = open(self.complete_pch, 'r+')
         pch_linhas = arquivo_pch.readlines()
         linhas_sel = []
         linha_cond = []
@@ -248,16 +319,9 @@ class LCC(Element):
                 if l[0] == "-":
                     linha_cond.append(str(n + 1))
         arquivo_pch.close()
+        return (linhas_sel, linha_cond)
 
-        complete_lib = os.path.join(self.simulation_path, self.dat_name + ".lib")  # Criacao do arquivo .lib
-
-        try:
-            arquivo_lib = open(complete_lib, 'r+')
-            arquivo_lib.close()
-            arquivo_lib = open(complete_lib, 'w+')
-        except FileNotFoundError:
-            arquivo_lib = open(complete_lib, 'w+')
-
+    def generate_lib(self, linhas_sel, linha_cond):
         if self.jmarti:
             if len(self.cond) == 1:
                 linha = "KARD"
@@ -369,16 +433,76 @@ class LCC(Element):
             else:
                 linha += name + ", "
 
-        arquivo_lib.write(linha)
+        return linha
+
+    def scale_lib(self, dist):
+        """
+        Gera o corpo do arquivo .lib desta linha para outro comprimento.
+        Valido apenas para o modelo LINE CONSTANTS, cujos ramos de parametros distribuidos possuem parametros por
+        unidade de comprimento e o comprimento da linha como quarto campo numerico apos os nomes dos nos.
+        :param dist: Novo comprimento da linha (na mesma unidade de dist)
+        :type dist: float
+        :return: Corpo do arquivo .lib com o comprimento ajustado
+        :rtype: basestring
+        """
+        if self.jmarti:
+            raise ValueError("JMARTI lines can't be scaled to other lengths")
+
+        linhas = self.lib_linhas.split("\n")
+        vintage = False
+        for (n, l) in enumerate(linhas):
+            if "$VINTAGE, 1" in l:
+                vintage = True
+            elif "$VINTAGE, 0" in l:
+                vintage = False
+            elif vintage and l[0:1] == "-":
+                fields = list(re.finditer(r"\S+", l[26:]))
+                start = 26 + fields[2].end() + 1
+                end = 26 + fields[3].end()
+                linha = Formatter.formatFloat(number=dist, leng_max=end - start, blank=False)
+                linhas[n] = l[:start] + Formatter.insertString(string=linha, start_position=start, final_position=end)
+                linhas[n] += l[end:]
+        return "\n".join(linhas)
+
+    @staticmethod
+    def compare_lib(lib_a, lib_b, rel_tol=1e-2):
+        """
+        Compara dois arquivos .lib, considerando iguais os valores numericos dentro da tolerancia relativa.
+        """
+        tokens_a = lib_a.replace(",", " ").split()
+        tokens_b = lib_b.replace(",", " ").split()
+        if len(tokens_a) != len(tokens_b):
+            return False
+        for (a, b) in zip(tokens_a, tokens_b):
+            try:
+                (a, b) = (float(a), float(b))
+            except ValueError:
+                if a != b:
+                    return False
+                continue
+            if abs(a - b) > rel_tol * max(abs(a), abs(b)):
+                return False
+        return True
+
+    def write_lib(self):
+        try:
+            arquivo_lib = open(self.complete_lib, 'r+')
+            arquivo_lib.close()
+            arquivo_lib = open(self.complete_lib, 'w+')
+        except FileNotFoundError:
+            arquivo_lib = open(self.complete_lib, 'w+')
+
+        arquivo_lib.write(self.lib_linhas)
         arquivo_lib.close()
 
+    def generate_branch(self):
         if not self.hide_c:
             if self.bus_neg is None:
                 self.branch = "C LCC - POS: " + self.bus_pos.name + "\n"
             else:
                 self.branch = "C LCC - POS: " + self.bus_pos.name + " - NEG: " + self.bus_neg.name + "\n"
 
-        linha = "$INCLUDE, " + complete_lib
+        linha = "$INCLUDE, " + self.complete_lib
         for cond in self.cond:
             if len(linha + ", " + cond['bus_in'] + cond["fase"]) <= 77:
                 linha += ", " + cond['bus_in'] + cond["fase"]
@@ -5,6 +5,8 @@ class LinePi(Element):
     """
     Classe responsavel pela adicao de linhas de transmissao usando o modelo pi a parametros concentrados.
     """
+    __slots__ = ("R", "L", "C", "bus_pos", "phase_pos", "bus_neg", "phase_neg", "hide_c")
+
     def __init__(self, R, L, C, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", hide_c=False):
         """
         Metodo Construtor da Classe.
@@ -5,6 +5,8 @@ class LinePi_2ph(Element): #Verificar ph1 e ph2
     """
     Classe responsavel pela adicao de linhas de transmissao bifasicas usando o modelo pi a parametros concentrados.
     """
+    __slots__ = ("R", "L", "C", "bus_pos", "phase_pos", "bus_neg", "phase_neg", "hide_c")
+
     def __init__(self, R, L, C,  bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", hide_c=False):
         """
         Metodo Construtor da Classe.
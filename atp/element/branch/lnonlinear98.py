@@ -5,6 +5,9 @@ class LNonLinear98(Element):
     """
     Classe responsavel pela adicao do indutor nao linear tipo 98 modificado.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "flux", "curr", "zeroseq", "rdamp", "currentflux",
+                 "hide_c")
+
     def __init__(self, flux, curr, zeroseq, rdamp, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", currentflux=[], hide_c=False):
         """
         Metodo Construtor da Classe.
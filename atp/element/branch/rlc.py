@@ -1,4 +1,4 @@
-from atp.formatter.formatter import Formatter
+from atp.formatter.cardlayout import CardLayout
 from atp.element.element import Element
 from atp.node.node import Node
 
@@ -7,6 +7,33 @@ class RLC(Element):
     """
     Classe responsavel pela adicao de componentes RLC, ramos lineares e linhas de transmissão simples.
     """
+    __slots__ = ("R", "L", "C", "bus_pos", "phase_pos", "bus_neg", "phase_neg", "bus_ref_pos", "phase_ref_pos",
+                 "bus_ref_neg", "phase_ref_neg", "type", "vintage", "printvintage", "output_value", "hide_c")
+
+    layout = CardLayout(fields=[
+        ("type", "int", 2, 2),
+        ("pos", "str", 6, 8),
+        ("neg", "str", 6, 14),
+        ("ref_pos", "str", 6, 20),
+        ("ref_neg", "str", 6, 26),
+        ("R", "float", 6, 32),
+        ("L", "float", 6, 38),
+        ("C", "float", 6, 44),
+        ("output", "int", 1, 80)
+    ])
+
+    layout_vintage = CardLayout(fields=[
+        ("type", "int", 2, 2),
+        ("pos", "str", 6, 8),
+        ("neg", "str", 6, 14),
+        ("ref_pos", "str", 6, 20),
+        ("ref_neg", "str", 6, 26),
+        ("R", "float", 16, 42),
+        ("L", "float", 16, 58),
+        ("C", "float", 16, 74),
+        ("output", "int", 1, 80)
+    ])
+
     def __init__(self, R, L, C, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", bus_ref_pos=None, phase_ref_pos="A",
                  bus_ref_neg=None, phase_ref_neg="A", type=0, output_value=None, vintage=0, printvintage="cabecalhorodape", hide_c=False):
         """
@@ -78,57 +105,19 @@ class RLC(Element):
             else:
                 self.branch = "C RLC MONOFASICO - POS:" + self.bus_pos.name + " - NEG: " + self.bus_neg.name + "\n"
 
+        terminais = {
+            "pos": RLC.terminal(bus=self.bus_pos, phase=self.phase_pos),
+            "neg": RLC.terminal(bus=self.bus_neg, phase=self.phase_neg),
+            "ref_pos": RLC.terminal(bus=self.bus_ref_pos, phase=self.phase_ref_pos),
+            "ref_neg": RLC.terminal(bus=self.bus_ref_neg, phase=self.phase_ref_neg)
+        }
+        valores = dict(terminais, type=self.type, R=self.R, L=self.L, C=self.C, output=self.output_value)
+
         if vintage == 1: # Modo de Alta Precisao
             if printvintage == "cabecalhorodape" or "cabecalho":
                 self.branch += "$VINTAGE,1" + "\n"
 
-            linha = Formatter.insertInteger(number=self.type, leng_max=2, start_position=0, final_position=2)
-
-            if self.phase_pos == "A":
-                linha += Formatter.insertString(string=self.bus_pos.phaseA, start_position=len(linha), final_position=8)
-            elif self.phase_pos == "B":
-                linha += Formatter.insertString(string=self.bus_pos.phaseB, start_position=len(linha), final_position=8)
-            elif self.phase_pos == "C":
-                linha += Formatter.insertString(string=self.bus_pos.phaseC, start_position=len(linha), final_position=8)
-            elif self.phase_pos == "N":
-                linha += Formatter.insertString(string=self.bus_pos.phaseN, start_position=len(linha), final_position=8)
-
-            if self.bus_neg is not None:
-                if self.phase_neg == "A":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseA, start_position=len(linha), final_position=14)
-                elif self.phase_neg == "B":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseB, start_position=len(linha), final_position=14)
-                elif self.phase_neg == "C":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseC, start_position=len(linha), final_position=14)
-                elif self.phase_neg == "N":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseN, start_position=len(linha), final_position=14)
-
-            if self.bus_ref_pos is not None:
-                if self.phase_ref_pos == "A":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseA, start_position=len(linha), final_position=20)
-                elif self.phase_ref_pos == "B":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseB, start_position=len(linha), final_position=20)
-                elif self.phase_ref_pos == "C":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseC, start_position=len(linha), final_position=20)
-                elif self.phase_ref_pos == "N":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseN, start_position=len(linha), final_position=20)
-
-            if self.bus_ref_neg is not None:
-                if self.phase_ref_neg == "A":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseA, start_position=len(linha), final_position=26)
-                elif self.phase_ref_neg == "B":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseB, start_position=len(linha), final_position=26)
-                elif self.phase_ref_neg == "C":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseC, start_position=len(linha), final_position=26)
-                elif self.phase_ref_neg == "N":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseN, start_position=len(linha), final_position=26)
-
-            linha += Formatter.insertFloat(number=self.R, leng_max=16, start_position=len(linha), final_position=42)
-            linha += Formatter.insertFloat(number=self.L, leng_max=16, start_position=len(linha), final_position=58)
-            linha += Formatter.insertFloat(number=self.C, leng_max=16, start_position=len(linha), final_position=74)
-            linha += Formatter.insertInteger(number=self.output_value, leng_max=1, start_position=len(linha), final_position=80)
-
-            self.branch += linha
+            self.branch += RLC.layout_vintage.render(valores)
             if printvintage == "cabecalhorodape" or "rodape":
                 self.branch += "\n" + "$VINTAGE,0"
 
@@ -136,53 +125,17 @@ class RLC(Element):
                 self.branch += "\nC /RLC MONOFASICO"
 
         else: # Modo de Precisao Padrao
-            linha = Formatter.insertInteger(number=self.type, leng_max=2, start_position=0, final_position=2)
-
-            if self.phase_pos == "A":
-                linha += Formatter.insertString(string=self.bus_pos.phaseA, start_position=len(linha), final_position=8)
-            elif self.phase_pos == "B":
-                linha += Formatter.insertString(string=self.bus_pos.phaseB, start_position=len(linha), final_position=8)
-            elif self.phase_pos == "C":
-                linha += Formatter.insertString(string=self.bus_pos.phaseC, start_position=len(linha), final_position=8)
-            elif self.phase_pos == "N":
-                linha += Formatter.insertString(string=self.bus_pos.phaseN, start_position=len(linha), final_position=8)
-
-            if self.bus_neg is not None:
-                if self.phase_neg == "A":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseA, start_position=len(linha), final_position=14)
-                elif self.phase_neg == "B":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseB, start_position=len(linha), final_position=14)
-                elif self.phase_neg == "C":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseC, start_position=len(linha), final_position=14)
-                elif self.phase_neg == "N":
-                    linha += Formatter.insertString(string=self.bus_neg.phaseN, start_position=len(linha), final_position=14)
-
-            if self.bus_ref_pos is not None:
-                if self.phase_ref_pos == "A":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseA, start_position=len(linha), final_position=20)
-                elif self.phase_ref_pos == "B":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseB, start_position=len(linha), final_position=20)
-                elif self.phase_ref_pos == "C":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseC, start_position=len(linha), final_position=20)
-                elif self.phase_ref_pos == "N":
-                    linha += Formatter.insertString(string=self.bus_ref_pos.phaseN, start_position=len(linha), final_position=20)
-
-            if self.bus_ref_neg is not None:
-                if self.phase_ref_neg == "A":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseA, start_position=len(linha), final_position=26)
-                elif self.phase_ref_neg == "B":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseB, start_position=len(linha), final_position=26)
-                elif self.phase_ref_neg == "C":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseC, start_position=len(linha), final_position=26)
-                elif self.phase_ref_neg == "N":
-                    linha += Formatter.insertString(string=self.bus_ref_neg.phaseN, start_position=len(linha), final_position=26)
-
-            linha += Formatter.insertFloat(number=self.R, leng_max=6, start_position=len(linha), final_position=32)
-            linha += Formatter.insertFloat(number=self.L, leng_max=6, start_position=len(linha), final_position=38)
-            linha += Formatter.insertFloat(number=self.C, leng_max=6, start_position=len(linha), final_position=44)
-            linha += Formatter.insertInteger(number=self.output_value, leng_max=1, start_position=len(linha), final_position=80)
-
-            self.branch += linha
+            self.branch += RLC.layout.render(valores)
 
             if not self.hide_c:
-                self.branch += "\nC /RLC MONOFASICO"
\ No newline at end of file
+                self.branch += "\nC /RLC MONOFASICO"
+
+    @staticmethod
+    def terminal(bus, phase):
+        """
+        :return: Nome do no da fase phase da barra bus, ou None se a barra nao for informada
+        :rtype: basestring
+        """
+        if bus is None:
+            return None
+        return {"A": bus.phaseA, "B": bus.phaseB, "C": bus.phaseC, "N": bus.phaseN}.get(phase, None)
@@ -6,6 +6,9 @@ class RLC_3ph_D(Element): #Verificar necessidade de bus_ref_pos e bus_ref_neg
     """
     Classe responsavel pela adicao de componentes RLC Trifasicos ligados em Delta, equivalentes_ramos lineares e linhas de transmissão simples.
     """
+    __slots__ = ("R1", "L1", "C1", "R2", "L2", "C2", "R3", "L3", "C3", "bus_pos", "phase_pos", "bus_ref_pos",
+                 "bus_ref_neg", "hide_c", "rlca", "rlcb", "rlcc", "output_value")
+
     def __init__(self, R1, L1, C1, bus_pos, phase_pos="A", R2=None, L2=None, C2=None, R3=None, L3=None, C3=None,
                  bus_ref_pos=None, bus_ref_neg=None, output_value=0, hide_c=False):
         """
@@ -7,6 +7,9 @@ class RLC_3ph_Y(Element):
     """
     Classe responsavel pela adicao de componentes RLC Trifasicos ligados em Y, equivalentes_ramos lineares e linhas de transmissão simples.
     """
+    __slots__ = ("R1", "L1", "C1", "R2", "L2", "C2", "R3", "L3", "C3", "bus_pos", "bus_neg", "bus_ref_pos",
+                 "bus_ref_neg", "hide_c", "vintage", "rlca", "rlcb", "rlcc", "output_value")
+
     def __init__(self, R1, L1, C1,  bus_pos, R2=None, L2=None, C2=None, R3=None, L3=None, C3=None,
                  bus_neg=None, bus_ref_pos=None, bus_ref_neg=None, output_value=None, vintage=0, hide_c=False):
         """
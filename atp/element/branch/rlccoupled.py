@@ -6,6 +6,9 @@ class RLC_Coupled(Element):
     """
     Classe responsavel pela adicao de componentes RLC pseudo acoplado.
     """
+    __slots__ = ("R", "L", "C", "bus_pos", "phase_pos", "bus_neg", "phase_neg", "bus_ref_pos", "phase_ref_pos",
+                 "bus_ref_neg", "phase_ref_neg", "type", "vintage", "printvintage", "hide_c")
+
     def __init__(self, R, L, C,  bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", bus_ref_pos=None, phase_ref_pos="A",
                  bus_ref_neg=None, phase_ref_neg="A", type=0, vintage=0, printvintage=None, precision=False, hide_c= False):
         """
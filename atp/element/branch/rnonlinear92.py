@@ -6,6 +6,9 @@ class RNonLinear92(Element):
     """
     Classe responsavel pela adicao do resistor não linear do tipo 92.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "bus_ref_pos", "phase_ref_pos", "bus_ref_neg",
+                 "phase_ref_neg", "nflash", "rlin", "vflash", "vzero", "currentvoltage", "hide_c", "output_value")
+
     def __init__(self, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", bus_ref_pos=None, phase_ref_pos="A", bus_ref_neg=None,
                  phase_ref_neg="A", nflash=0, rlin=0, vflash=-1, vzero=0, currentvoltage=[], output_value=None, hide_c=False):
         """
@@ -7,6 +7,10 @@ class SaturableTransformer(Element):
     """
     Classe responsavel pela adicao de Transformadores com Saturacao.
     """
+    __slots__ = ("bus_ref", "phase_ref", "bus_pos", "phase_pos", "bus_neg", "phase_neg", "Rp", "Lp", "Vp",
+                 "bus_ref_pos", "phase_ref_pos", "bus_ref_neg", "phase_ref_neg", "Rs", "Ls", "Vs", "rmag", "Io", "Fo",
+                 "currentflux", "magoutput", "output_value", "hide_c")
+
     def __init__(self, bus_ref,  bus_pos, bus_ref_pos, Rp, Lp, Vp, bus_neg, bus_ref_neg, Rs, Ls, Vs, rmag, phase_ref="A", phase_pos="A",
                  phase_ref_pos="A", phase_neg="A", phase_ref_neg="A", Io=0, Fo=0, currentflux=[], magoutput=0, output_value=0, hide_c=False):
         """
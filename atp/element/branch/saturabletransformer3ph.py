@@ -7,6 +7,10 @@ class SaturableTransformer3ph(Element): #Verificar necessidade de phase_pos, pha
     """
     Classe responsavel pela adicao de Transformadores Trifasicos com Saturacao.
     """
+    __slots__ = ("bus_ref", "phase_ref", "bus_pos", "phase_pos", "Rp", "Lp", "Vp", "bus_neg", "phase_neg", "Rs", "Ls",
+                 "Vs", "rmag", "bus_ref_pos", "phase_ref_pos", "bus_ref_neg", "phase_ref_neg", "Io", "Fo",
+                 "currentflux", "magoutput", "output_value", "couplingp", "couplings", "hide_c")
+
     def __init__(self, bus_ref,  bus_pos, bus_neg, Rp=1, Lp=1, Vp=1, Rs=1, Ls=1, Vs=1, bus_ref_pos=0, bus_ref_neg=0,
                  phase_ref="A", phase_pos="A", phase_ref_pos="A", phase_neg="A", phase_ref_neg="A", rmag=1000000, Io=0,
                  Fo=0, currentflux=[], magoutput=0, output_value=0, couplingp="Y", couplings="Y", hide_c=False):
@@ -8,7 +8,10 @@ class SurgeArresterIEEE(Element):
     """
     Classe responsavel pela adicao de para-raios do modelo IEEE.
     """
-    def __init__(self, bus_pos, currentvoltageA0, currentvoltageA1, phase_pos="A", bus_neg=None, phase_neg="A", d=1, n=1, prnumber=1, hide_c=False):
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "d", "n", "prnumber", "hide_c", "currentvoltageA0",
+                 "currentvoltageA1", "R0", "L0", "R1", "L1", "C", "r0", "l0", "r1", "l1", "c", "a0", "a1")
+
+    def __init__(self, bus_pos, currentvoltageA0, currentvoltageA1, phase_pos="A", bus_neg=None, phase_neg="A", d=1, n=1, prnumber=1, hide_c=False, numbering=None):
         """
         Metodo Construtor da Classe.
         Baseado no modelo IEEE de Para-Raio repassado pela equipe de modelagem.
@@ -34,6 +37,8 @@ class SurgeArresterIEEE(Element):
         :type currentvoltageA1: list
         Exemplo:
         >> currentvoltageA1 = [ [0.1, 1.23], [1, 1.36], [2, 1.43], [4, 1.48], [6, 1.5], [8, 1.53], [10, 1.55], [12, 1.56], [14, 1.58], [16, 1.59], [18, 1.6], [20, 1.61]]
+        :param numbering: Contexto de numeracao dos nos internos do para-raio (Se None, a numeracao compartilhada)
+        :type numbering: NodeNumbering
         """
 
         super().__init__()
@@ -50,8 +55,8 @@ class SurgeArresterIEEE(Element):
         self.currentvoltageA0 = currentvoltageA0
         self.currentvoltageA1 = currentvoltageA1
 
-        pr_bus_1 = Node("P" + str(self.prnumber) + "1", "Para-Raio", self.phase_pos)
-        pr_bus_2 = Node("P" + str(self.prnumber) + "2", "Para-Raio", self.phase_pos)
+        pr_bus_1 = Node("P" + str(self.prnumber) + "1", "Para-Raio", self.phase_pos, numbering=numbering)
+        pr_bus_2 = Node("P" + str(self.prnumber) + "2", "Para-Raio", self.phase_pos, numbering=numbering)
 
         self.R0 = 100 * (self.d / self.n)
         self.L0 = 0.2 * (self.d / self.n) * (1e-3)
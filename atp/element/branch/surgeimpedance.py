@@ -8,6 +8,7 @@ class SurgeImpedance(Element):
     """
     Classe responsavel pela adicao de Impedancia de Surto da Torre a parametros concentrados.
     """
+    __slots__ = ("length", "Rl", "tau", "bus_pos", "phase_pos", "bus_neg", "phase_neg", "hide_c", "Z")
 
     def __init__(self, R, h, r, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A",h1=0, h2=0, r1=0, r2=0, r3=0, form="cilindrica", hide_c=False):
         """
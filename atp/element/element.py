@@ -1,7 +1,10 @@
 class Element(object):
     """
     Classe basica de todos os cartoes ATP, contendo as variaveis comuns e necessarias para o tratamento igual desses elementos frente a Classe Cartao.
+    O dicionario models so e alocado quando acessado, pois apenas elementos com MODELS (como o Isolador) o utilizam.
     """
+    __slots__ = ("branch", "switch", "source", "output", "tacs", "_models")
+
     def __init__(self):
         """
         Construtor da Classe.
@@ -10,5 +13,27 @@ class Element(object):
         self.switch = ""
         self.source = ""
         self.output = ""
-        self.models = {"header": {"input": "", "output": "", "input_nodes": ""}, "model": {"nome": "", "texto": ""}, "use": {"input": "", "data": "", "output": ""}}
-        self.tacs = ""
\ No newline at end of file
+        self._models = None
+        self.tacs = ""
+
+    @staticmethod
+    def empty_models():
+        return {"header": {"input": "", "output": "", "input_nodes": ""}, "model": {"nome": "", "texto": ""}, "use": {"input": "", "data": "", "output": ""}}
+
+    @property
+    def models(self):
+        if self._models is None:
+            self._models = Element.empty_models()
+        return self._models
+
+    @models.setter
+    def models(self, models):
+        self._models = models
+
+    @property
+    def has_models(self):
+        """
+        :return: True se o elemento possui dados para a area MODELS do cartao, sem alocar o dicionario models
+        :rtype: bool
+        """
+        return self._models is not None and self._models != Element.empty_models()
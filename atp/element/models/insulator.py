@@ -5,11 +5,11 @@ from atp.node.node import Node
 
 
 class Insulator(Element):
-
-    isol_number = 0
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "tipo", "L", "CFO", "freq", "vi", "ti",
+                 "model_output", "isol_number", "hide_c", "tacs_switch")
 
     def __init__(self, bus_pos, bus_neg, tipo, L, CFO, phase_pos="A", phase_neg="A", freq=60, vi=[0 for n in range(25)], ti=[0 for n in range(25)],
-                 model_output=False, hide_c=False):
+                 model_output=False, hide_c=False, numbering=None):
 
         super().__init__()
 
@@ -24,11 +24,10 @@ class Insulator(Element):
         self.vi = vi
         self.ti = ti
         self.model_output = model_output
-        self.isol_number = Insulator.isol_number
+        numbering = numbering if numbering is not None else Node.numbering
+        self.isol_number = numbering.allocate("Modelo Isolador")
         self.hide_c = hide_c
 
-        Insulator.isol_number += 1
-
         if not self.hide_c:
             if self.bus_neg is None:
                 self.switch = "C ISOLADOR - POS:" + self.bus_pos.name + "\n"
@@ -59,7 +58,7 @@ class Insulator(Element):
             models_header_input += self.bus_neg.phaseN + ")"
         self.models["header"]["input"].append(models_header_input)
 
-        isol_node = Node(self.isol_number, "Isolador", self.phase_pos)
+        isol_node = Node(self.isol_number, "Isolador", self.phase_pos, numbering=numbering)
 
         if phase_pos == "A":
             self.models["header"]["output"] = [isol_node.phaseA]
@@ -6,6 +6,8 @@ class VoltageProbe(Element):
     """
     Classe responsavel pela adição de probes de tensão.
     """
+    __slots__ = ("bus",)
+
     def __init__(self, bus):
         """
         Metodo Construtor da Classe.
@@ -7,6 +7,8 @@ class CurrentAC_3ph(Element):
     """
     Classe responavel pela adicao de Fontes de Corrente AC Trifasicas.
     """
+    __slots__ = ("bus_pos", "bus_neg", "amp", "freq", "tstart", "tstop", "hide_c", "ia", "ib", "ic")
+
     def __init__(self, bus_pos, amp, freq=60, tstart=-1, tstop=100, bus_neg=None, hide_c=False):
         """
         Construtor da Classe.
@@ -7,6 +7,9 @@ class CurrentAC(Element):
     """
     Classe responavel pela adicao de Fontes de Corrente AC.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "amp", "freq", "phase", "phase_type", "tstart",
+                 "tstop", "hide_c")
+
     def __init__(self, bus_pos, amp, freq=60, phase=0, phase_type=True, tstart=-1, tstop=100, phase_pos="A",
                  bus_neg=None, phase_neg="A", hide_c=False):
         """
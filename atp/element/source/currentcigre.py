@@ -7,6 +7,8 @@ class CurrentCIGRE(Element):
     """
     Classe responavel pela adicao de Fontes de Corrente CIGRE.
     """
+    __slots__ = ("bus_pos", "phase_pos", "amp", "tfront", "ttail", "smax", "risefactor", "tstart", "tstop", "hide_c")
+
     def __init__(self, bus_pos, amp, tfront=3e-6, ttail=7.5e-5, smax=26e9, risefactor=-8888, tstart=-1, tstop=100,
                  phase_pos="A", hide_c=False):
         """
@@ -1,4 +1,4 @@
-from atp.formatter.formatter import Formatter
+from atp.formatter.cardlayout import CardLayout
 from atp.element.element import Element
 from atp.node.node import Node
 
@@ -7,6 +7,20 @@ class CurrentHEIDLER(Element):
     """
     Classe responavel pela adicao de Fontes de Corrente HEIDLER.
     """
+    __slots__ = ("bus_pos", "phase_pos", "amp", "tfront", "tau", "n", "tstart", "tstop", "hide_c")
+
+    layout = CardLayout(fields=[
+        ("itype", "int", 2, 2),
+        ("pos", "str", 6, 8),
+        ("st", "int", 2, 10),
+        ("amp", "float", 10, 20),
+        ("tfront", "float", 10, 30),
+        ("tau", "float", 10, 40),
+        ("n", "float", 10, 50),
+        ("tstart", "float", 10, 70),
+        ("tstop", "float", 10, 80)
+    ])
+
     def __init__(self, bus_pos, amp, tfront=1.2e-6, tau=5e-5, n=2, tstart=-1, tstop=100, phase_pos="A",
                  hide_c=False):
         """
@@ -45,32 +59,18 @@ class CurrentHEIDLER(Element):
         if not self.hide_c:
             self.source = "C FONTE DE CORRENTE HEIDLER - POS:" + self.bus_pos.name + "\n"
 
-        linha = Formatter.insertInteger(number=15, leng_max=2, start_position=0, final_position=2) # Variavel ITYPE
-        # do Guia Resumido do ATP e do Arquivo rb-070-lec do ATP Rulebook
-
-        if self.phase_pos == "A":
-            linha += Formatter.insertString(string=self.bus_pos.phaseA, start_position=len(linha), final_position=8)
-        elif self.phase_pos == "B":
-            linha += Formatter.insertString(string=self.bus_pos.phaseB, start_position=len(linha), final_position=8)
-        elif self.phase_pos == "C":
-            linha += Formatter.insertString(string=self.bus_pos.phaseC, start_position=len(linha), final_position=8)
-        elif self.phase_pos == "N":
-            linha += Formatter.insertString(string=self.bus_pos.phaseN, start_position=len(linha), final_position=8)
-
-        linha += Formatter.insertInteger(number=-1, leng_max=2, start_position=len(linha), final_position=10)
-        # Variavel ST do Guia Resumido do ATP
-
-        linha += Formatter.insertFloat(number=self.amp, leng_max=10, start_position=len(linha), final_position=20)
-
-        linha += Formatter.insertFloat(number=self.tfront, leng_max=10, start_position=len(linha), final_position=30)
-
-        linha += Formatter.insertFloat(number=self.tau, leng_max=10, start_position=len(linha), final_position=40)
-
-        linha += Formatter.insertFloat(number=self.n, leng_max=10, start_position=len(linha), final_position=50)
-
-        linha += Formatter.insertFloat(number=self.tstart, leng_max=10, start_position=len(linha), final_position=70)
-
-        linha += Formatter.insertFloat(number=self.tstop, leng_max=10, start_position=len(linha), final_position=80)
+        linha = CurrentHEIDLER.layout.render({
+            "itype": 15,  # Variavel ITYPE do Guia Resumido do ATP e do Arquivo rb-070-lec do ATP Rulebook
+            "pos": {"A": self.bus_pos.phaseA, "B": self.bus_pos.phaseB, "C": self.bus_pos.phaseC,
+                    "N": self.bus_pos.phaseN}.get(self.phase_pos, None),
+            "st": -1,  # Variavel ST do Guia Resumido do ATP
+            "amp": self.amp,
+            "tfront": self.tfront,
+            "tau": self.tau,
+            "n": self.n,
+            "tstart": self.tstart,
+            "tstop": self.tstop
+        })
 
         self.source += linha
 
@@ -7,6 +7,8 @@ class VoltageCIGRE(Element):
     """
     Classe responavel pela adicao de Fontes de Tensao CIGRE.
     """
+    __slots__ = ("bus_pos", "phase_pos", "amp", "tfront", "ttail", "smax", "risefactor", "tstart", "tstop", "hide_c")
+
     def __init__(self, bus_pos, amp, tfront=3e-6, ttail=7.5e-5, smax=26e9, risefactor=-8888, tstart=-1, tstop=100,
                  phase_pos="A", hide_c=False):
         """
@@ -63,19 +65,12 @@ class VoltageCIGRE(Element):
         linha += Formatter.insertInteger(number=0, leng_max=2, start_position=len(linha), final_position=10)
         # Variavel ST do Guia Resumido do ATP
 
-        linha += Formatter.insertFloat(number=self.amp, leng_max=10, start_position=len(linha), final_position=20)
-
-        linha += Formatter.insertFloat(number=self.tfront, leng_max=10, start_position=len(linha), final_position=30)
-
-        linha += Formatter.insertFloat(number=self.ttail, leng_max=10, start_position=len(linha), final_position=40)
-
-        linha += Formatter.insertFloat(number=self.risefactor, leng_max=10, start_position=len(linha), final_position=50)
-
-        linha += Formatter.insertFloat(number=self.smax, leng_max=10, start_position=len(linha), final_position=60)
-
-        linha += Formatter.insertFloat(number=self.tstart, leng_max=10, start_position=len(linha), final_position=70)
-
-        linha += Formatter.insertFloat(number=self.tstop, leng_max=10, start_position=len(linha), final_position=80)
+        linha += Formatter.insertFloatRow(
+            numbers=[self.amp, self.tfront, self.ttail, self.risefactor, self.smax, self.tstart, self.tstop],
+            leng_max=10,
+            final_positions=[20, 30, 40, 50, 60, 70, 80],
+            start_position=len(linha)
+        )
 
         self.source += linha
 
@@ -7,6 +7,8 @@ class VoltageAC_3ph(Element):
     """
     Classe responavel pela adicao de Fontes de Tensao AC Trifasicas.
     """
+    __slots__ = ("bus_pos", "bus_neg", "amp", "freq", "tstart", "tstop", "hide_c", "va", "vb", "vc")
+
     def __init__(self, bus_pos, amp, freq=60, tstart=-1, tstop=100, bus_neg=None, hide_c=False):
         """
         Construtor da Classe.
@@ -7,6 +7,8 @@ class VoltageDC(Element):
     """
     Classe responavel pela adicao de Fontes de Tensao DC.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "amp", "tstart", "tstop", "hide_c")
+
     def __init__(self, bus_pos, amp, tstart=-1, tstop=100, phase_pos="A", bus_neg=None, phase_neg="A", hide_c=False):
         """
         Construtor da Classe.
@@ -7,6 +7,8 @@ class VoltageHEIDLER(Element):
     """
     Classe responavel pela adicao de Fontes de Tensao HEIDLER.
     """
+    __slots__ = ("bus_pos", "phase_pos", "amp", "tfront", "tau", "n", "tstart", "tstop", "hide_c")
+
     def __init__(self, bus_pos, amp, tfront=1.2e-6, tau=5e-5, n=2, tstart=-1, tstop=100, phase_pos="A",
                  hide_c=False):
         """
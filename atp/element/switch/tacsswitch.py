@@ -6,6 +6,8 @@ class TACSSwitch(Element):
     """
     Classe responsavel pelo chaveamento do circuito controlado por TACS.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "bus_tacs", "phase_tacs", "output_value", "hide_c")
+
     def __init__(self, bus_tacs, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", phase_tacs="A", output_value=0, hide_c=False):
         """
         Metodo Construtor da Classe.
@@ -6,6 +6,8 @@ class TimeControlled(Element):
     """
     Classe responsavel pelo chaveamento do circuito controlado por tempo.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "tclose", "topen", "Ie", "hide_c", "output_value")
+
     def __init__(self, bus_pos, tclose, topen, phase_pos="A", bus_neg=None, phase_neg="A", Ie=0, output_value=None, hide_c=False):
         """
         Metodo Construtor da Classe.
@@ -6,6 +6,9 @@ class TimeControlled_3ph(Element):
     """
     Classe responsavel pela adicao de componentes STC Trifasicos entre dois nos eletricos trifasicos.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "tclose_1", "topen_1", "tclose_2", "topen_2",
+                 "tclose_3", "topen_3", "Ie", "hide_c", "tca", "tcb", "tcc", "output_value")
+
     def __init__(self, tclose_1, topen_1, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", tclose_2=None, topen_2=None, tclose_3=None, topen_3=None, Ie=0, output_value=None, hide_c=False):
         """
         Metodo Construtor da Classe.
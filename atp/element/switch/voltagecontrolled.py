@@ -6,6 +6,9 @@ class VoltageControlled(Element):
     """
     Classe responsavel pelo chaveamento do circuito controlado por tensão.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "vflash", "tclose", "tdelay", "Ie", "type", "hide_c",
+                 "output_value")
+
     def __init__(self, vflash, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", tclose=0, tdelay= 0.001, Ie=0, type=0, output_value=None, hide_c=False):
         """
         Metodo Construtor da Classe.
@@ -6,6 +6,10 @@ class VoltageControlled_3ph(Element):
     """
     Classe responsavel pelo pela adição de componentes VoltageControlled Trifasicos entre dois nós eletricos trifasicos.
     """
+    __slots__ = ("bus_pos", "phase_pos", "bus_neg", "phase_neg", "vflash_1", "tclose_1", "tdelay_1", "vflash_2",
+                 "tclose_2", "tdelay_2", "vflash_3", "tclose_3", "tdelay_3", "Ie", "type", "output_value", "hide_c",
+                 "vca", "vcb", "vcc")
+
     def __init__(self, vflash_1, bus_pos, phase_pos="A", bus_neg=None, phase_neg="A", tclose_1=0, tdelay_1= 0.001, vflash_2=None, tclose_2=None, tdelay_2= None, vflash_3=None, tclose_3=None, tdelay_3= None, Ie=0, type=0, output_value=None, hide_c=False):
         """
         Metodo Construtor da Classe.
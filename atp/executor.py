@@ -1,27 +1,38 @@
 import os
-import mmap
+import shutil
 import struct
-import subprocess
-import winreg
+import tempfile
 
-import pandas
 import numpy
 
-from copy import deepcopy as copy
-from os.path import abspath
+from concurrent.futures import ThreadPoolExecutor
+from os.path import abspath, basename, isfile, join, splitext
 
-from exceptions.exceptions import ATPNotFoundError
+from atp.result.pl4result import PL4Result
+from atp.runner import ATPJob, ATPRunner
+from exceptions.exceptions import ATPNotFoundError, ATPExecutionError
 
 
 class ATPExecutor(object):
     """
     Classe responsavel pelas execucoes do ATP, leitura das saidas e execucao de programas correlatos.
     """
+    pl4_header_dtype = numpy.dtype([("pad", "S3"), ("type", "S1"), ("from", "S6"), ("to", "S6")])
+
+    pl4_types = {
+        b"4": "v_node",
+        b"7": "e_bran",
+        b"8": "v_bran",
+        b"9": "i_bran"
+    }
+
     def __init__(self):
         pass
 
     @staticmethod
     def find_atp():
+        import winreg
+
         try:
             key = winreg.OpenKey(
                 winreg.HKEY_LOCAL_MACHINE,
@@ -37,15 +48,96 @@ class ATPExecutor(object):
             )
 
     @staticmethod
-    def execute_atp(folder_path, atp_filename, execution_cmd):
+    def atp_job(folder_path, atp_filename, name=None):
         if not atp_filename[-4:] == ".atp":
             atp_filename += ".atp"
-        complete_filename = os.path.join(folder_path, atp_filename)
-        complete_command = [execution_cmd, complete_filename, ">nul"]
-        subprocess.call(complete_command, shell=True)
+        complete_filename = join(folder_path, atp_filename)
+        return ATPJob(
+            filename=complete_filename,
+            outputs=[splitext(complete_filename)[0] + ".pl4"],
+            cwd=folder_path,
+            name=name
+        )
 
     @staticmethod
-    def read_pl4(pl4_file):
+    def execute_atp(folder_path, atp_filename, execution_cmd, timeout=None, retries=2):
+        """
+        Executa um arquivo .atp, considerando a execucao bem sucedida apenas se o arquivo .pl4 for gerado.
+        :raises ATPExecutionError: Caso todas as tentativas de execucao falhem
+        :rtype: ATPJob
+        """
+        job = ATPExecutor.atp_job(folder_path=folder_path, atp_filename=atp_filename)
+        ATPRunner(execution_cmd=execution_cmd, timeout=timeout, retries=retries).run_job(job=job)
+        if not job.done:
+            raise ATPExecutionError(
+                message="ATP execution failed",
+                errors="The execution of '{0}' ended as '{1}' after {2} attempt(s).".format(
+                    job.filename, job.status, job.attempts
+                )
+            )
+        return job
+
+    @staticmethod
+    def execute_atp_pool(job_list, execution_cmd, jobs=1, timeout=None, retries=2):
+        """
+        Executa uma lista de casos (criados por atp_job) com ate jobs execucoes simultaneas do ATP.
+        As falhas nao interrompem as demais execucoes e sao registradas no estado de cada caso.
+        :rtype: list
+        """
+        runner = ATPRunner(execution_cmd=execution_cmd, jobs=jobs, timeout=timeout, retries=retries)
+        return runner.run(job_list=job_list)
+
+    @staticmethod
+    def execute_lcc(lcc):
+        # Cada execucao ocorre em um diretorio temporario proprio, evitando conflitos entre os arquivos auxiliares
+        # criados pelo ATP em execucoes simultaneas
+        scratch_path = tempfile.mkdtemp(prefix=lcc.dat_name + "_", dir=lcc.simulation_path or None)
+        try:
+            scratch_dat = join(scratch_path, basename(lcc.complete_dat))
+            shutil.copyfile(lcc.complete_dat, scratch_dat)
+            scratch_pch = splitext(scratch_dat)[0] + ".pch"
+            job = ATPJob(filename=scratch_dat, outputs=[scratch_pch], cwd=scratch_path, name=lcc.dat_name)
+            ATPRunner(execution_cmd=lcc.run_cmd, timeout=lcc.timeout, retries=lcc.retries).run_job(job=job)
+            if job.done:
+                shutil.move(scratch_pch, lcc.complete_pch)
+        finally:
+            shutil.rmtree(scratch_path, ignore_errors=True)
+        return job
+
+    @staticmethod
+    def execute_lcc_pool(lcc_list, jobs=1):
+        """
+        Executa as rotinas LINE CONSTANTS de uma lista de linhas pendentes (criadas com execute=False) com ate jobs
+        execucoes simultaneas do ATP e finaliza as linhas na ordem da lista.
+        :raises ATPExecutionError: Caso alguma execucao falhe apos todas as tentativas
+        """
+        lcc_run = []
+        for lcc in lcc_list:
+            if lcc.pending and (lcc.overwrite or not isfile(lcc.complete_pch)):
+                lcc_run.append(lcc)
+
+        with ThreadPoolExecutor(max_workers=max(1, int(jobs))) as pool:
+            job_list = list(pool.map(ATPExecutor.execute_lcc, lcc_run))
+
+        failed = [job for job in job_list if not job.done]
+        if failed:
+            raise ATPExecutionError(
+                message="LINE CONSTANTS execution failed",
+                errors="The execution of {0} ended without .pch file: {1}.".format(
+                    len(failed), ", ".join("{0} ({1})".format(job.name, job.status) for job in failed)
+                )
+            )
+
+        for lcc in lcc_list:
+            if lcc.pending:
+                lcc.complete_line()
+
+    @staticmethod
+    def read_pl4_header(pl4_file):
+        """
+        Le o cabecalho de um arquivo .pl4, retornando os dados miscelaneos, o cabecalho das variaveis como um array
+        estruturado (campos "type", "from" e "to") e a posicao em bytes do inicio dos dados.
+        """
         misc_data = {
             "deltat": 0.0,
             "n_var": 0,
@@ -54,9 +146,8 @@ class ATPExecutor(object):
             "tmax": 0.0
         }
 
-        # Open binary file for reading
         with open(pl4_file, "rb") as f:
-            pl4 = mmap.mmap(fileno=f.fileno(), length=0, access=mmap.ACCESS_READ)
+            pl4 = f.read(5 * 16)
 
             # Read DELTAT
             misc_data["deltat"] = struct.unpack("<f", pl4[40:44])[0]
@@ -75,54 +166,72 @@ class ATPExecutor(object):
             # Calculate tmax from steps and deltat
             misc_data["tmax"] = (misc_data["steps"] - 1) * misc_data["deltat"]
 
-            # Generate pandas dataframe	to store the header
-            header_df = pandas.DataFrame()
-            header_df["type"] = ""
-            header_df["from"] = ""
-            header_df["to"] = ""
-
-            for i in range(0, misc_data["n_var"]):
-                pos = 5 * 16 + i * 16
-                h = struct.unpack("3x1c6s6s", pl4[pos:pos + 16])
-                header_df = header_df.append({"type": int(h[0]), "from": h[1], "to": h[2]}, ignore_index=True)
-
-            # Check for unexpected rows of zeroes
-            exp_size = (5 + misc_data["n_var"]) * 16 + misc_data["steps"] * (misc_data["n_var"] + 1) * 4
-            null_bytes = 0
-            if misc_data["pl4_size"] > exp_size:
-                null_bytes = misc_data["pl4_size"] - exp_size
-
-            # read and store actual data, map it to a numpy read only array
-            data = numpy.memmap(
-                filename=pl4_file,
-                dtype=numpy.float32,
-                mode="r",
-                shape=(misc_data["steps"], misc_data["n_var"] + 1),
-                offset=(5 + misc_data["n_var"]) * 16 + null_bytes
+            # Decode all the variable headers at once, each one with 16 bytes
+            header = numpy.frombuffer(
+                f.read(misc_data["n_var"] * 16),
+                dtype=ATPExecutor.pl4_header_dtype,
+                count=misc_data["n_var"]
             )
 
-            header_df["type"] = header_df["type"].apply(lambda x: "V-node" if x == 4 else x)
-            header_df["type"] = header_df["type"].apply(lambda x: "E-bran" if x == 7 else x)
-            header_df["type"] = header_df["type"].apply(lambda x: "V-bran" if x == 8 else x)
-            header_df["type"] = header_df["type"].apply(lambda x: "I-bran" if x == 9 else x)
-
-            output = {
-                "misc": misc_data,
-                "time": data[:, 0],
-                "v_node": {},
-                "e_bran": {},
-                "v_bran": {},
-                "i_bran": {}
-            }
-            for index, row in header_df.iterrows():
-                key_tuple = (row["from"].decode().strip(), row["to"].decode().strip())
-                if row["type"] == "V-node":
-                    output["v_node"][key_tuple] = data[:, index + 1]
-                elif row["type"] == "E-bran":
-                    output["e_bran"][key_tuple] = data[:, index + 1]
-                elif row["type"] == "V-bran":
-                    output["v_bran"][key_tuple] = data[:, index + 1]
-                elif row["type"] == "I-bran":
-                    output["i_bran"][key_tuple] = data[:, index + 1]
-
-            return copy(output)
+        # Check for unexpected rows of zeroes
+        exp_size = (5 + misc_data["n_var"]) * 16 + misc_data["steps"] * (misc_data["n_var"] + 1) * 4
+        null_bytes = 0
+        if misc_data["pl4_size"] > exp_size:
+            null_bytes = misc_data["pl4_size"] - exp_size
+
+        data_offset = (5 + misc_data["n_var"]) * 16 + null_bytes
+
+        return misc_data, header, data_offset
+
+    @staticmethod
+    def pl4_channel_index(header):
+        """
+        Gera o indice das colunas dos dados de um arquivo .pl4 para cada tipo de variavel, no formato
+        {"v_node": {(from, to): coluna}, "e_bran": {...}, "v_bran": {...}, "i_bran": {...}}.
+        """
+        index = {
+            "v_node": {},
+            "e_bran": {},
+            "v_bran": {},
+            "i_bran": {}
+        }
+        var_from = numpy.char.strip(numpy.char.decode(header["from"]))
+        var_to = numpy.char.strip(numpy.char.decode(header["to"]))
+        for (n, var_type) in enumerate(header["type"]):
+            if var_type in ATPExecutor.pl4_types:
+                index[ATPExecutor.pl4_types[var_type]][(str(var_from[n]), str(var_to[n]))] = n + 1
+        return index
+
+    @staticmethod
+    def read_pl4(pl4_file, lazy=False):
+        (misc_data, header, data_offset) = ATPExecutor.read_pl4_header(pl4_file=pl4_file)
+
+        # read and store actual data, map it to a numpy read only array
+        data = numpy.memmap(
+            filename=pl4_file,
+            dtype=numpy.float32,
+            mode="r",
+            shape=(misc_data["steps"], misc_data["n_var"] + 1),
+            offset=data_offset
+        )
+
+        index = ATPExecutor.pl4_channel_index(header=header)
+
+        if lazy:
+            return PL4Result(pl4_file=pl4_file, misc=misc_data, index=index, data=data)
+
+        output = {
+            "misc": misc_data,
+            "time": data[:, 0],
+            "v_node": {},
+            "e_bran": {},
+            "v_bran": {},
+            "i_bran": {}
+        }
+
+        # Every channel is a view on the same memmap, so no data is read until it is used
+        for (var_type, channels) in index.items():
+            for (key_tuple, column) in channels.items():
+                output[var_type][key_tuple] = data[:, column]
+
+        return output
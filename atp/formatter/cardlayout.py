@@ -0,0 +1,98 @@
+from atp.formatter.formatter import Formatter
+
+
+class CardLayout(object):
+    """
+    Classe responsavel pela descricao declarativa das colunas de uma linha de cartao ATP e pela montagem dessas linhas.
+    Cada campo e declarado uma unica vez como uma tupla (nome, tipo, leng_max, final_position), sendo o tipo "float",
+    "int" ou "str" (para strings, leng_max e ignorado). A linha e montada em uma unica passagem, com o mesmo
+    posicionamento obtido pelo encadeamento de Formatter.insertFloat, insertInteger e insertString. Campos com valor
+    None sao omitidos, como os terminais nao conectados de um ramo.
+    Exemplo:
+    >> layout = CardLayout(fields=[("type", "int", 2, 2), ("pos", "str", 6, 8), ("R", "float", 6, 32)])
+    >> layout.render({"type": 0, "pos": "B0000A", "R": 10.0})
+    >> layout.render_rows([{"type": 0, "pos": "B0000A", "R": 10.0}, {"type": 0, "pos": "B0001A", "R": 20.0}])
+    """
+    def __init__(self, fields, blank=True):
+        """
+        Metodo Construtor da Classe.
+        :param fields: Lista de campos (nome, tipo, leng_max, final_position), em ordem crescente de final_position
+        :type fields: list
+        :param blank: Valor booleano que indica se o valor 0 sera representado por um espaco em branco
+        :type blank: bool
+        """
+        self.fields = tuple(fields)
+        self.names = tuple(field[0] for field in self.fields)
+        self.blank = blank
+        self.formatters = tuple(self.field_formatter(kind=field[1], leng_max=field[2]) for field in self.fields)
+        self.final_positions = tuple(field[3] for field in self.fields)
+
+        final_position = 0
+        for (name, kind, leng_max, position) in self.fields:
+            if kind not in ("float", "int", "str"):
+                raise ValueError("Incorrect field type '{0}' for field '{1}'".format(kind, name))
+            if position < final_position:
+                raise ValueError("Field '{0}' ends before the previous field".format(name))
+            final_position = position
+
+    def field_formatter(self, kind, leng_max):
+        blank = self.blank
+        if kind == "float":
+            return lambda value: Formatter.formatFloat(number=value, leng_max=leng_max, blank=blank)
+        elif kind == "int":
+            return lambda value: Formatter.formatInteger(number=value, leng_max=leng_max, blank=blank)
+        else:
+            return str
+
+    def values(self, row):
+        if isinstance(row, dict):
+            return [row.get(name, None) for name in self.names]
+        return row
+
+    def render(self, row, start_position=0):
+        """
+        Monta uma linha do cartao.
+        :param row: Valores dos campos, em um dicionario indexado pelo nome do campo ou em uma sequencia na ordem dos
+        campos
+        :type row: dict ou list
+        :param start_position: Ultima posicao ja ocupada na linha onde os campos serao posicionados
+        :type start_position: int
+        :return: Linha com os campos posicionados
+        :rtype: basestring
+        """
+        return self.assemble(
+            strings=[
+                None if value is None else formatter(value)
+                for (formatter, value) in zip(self.formatters, self.values(row))
+            ],
+            start_position=start_position
+        )
+
+    def render_rows(self, rows, start_position=0):
+        """
+        Monta varias linhas com o mesmo layout, formatando os valores coluna a coluna.
+        :param rows: Lista de linhas, cada uma no formato aceito por render
+        :type rows: list
+        :return: Lista de linhas com os campos posicionados
+        :rtype: list
+        """
+        columns = zip(*[self.values(row) for row in rows])
+        strings = [
+            [None if value is None else formatter(value) for value in column]
+            for (formatter, column) in zip(self.formatters, columns)
+        ]
+        return [self.assemble(strings=row_strings, start_position=start_position) for row_strings in zip(*strings)]
+
+    def assemble(self, strings, start_position=0):
+        partes = []
+        position = start_position
+        for (string, final_position) in zip(strings, self.final_positions):
+            if string is None:
+                continue
+            espacos = final_position - len(string) - position
+            if espacos > 0:
+                partes.append(" " * espacos)
+                position += espacos
+            partes.append(string)
+            position += len(string)
+        return "".join(partes)
@@ -1,3 +1,6 @@
+import functools
+
+
 class Formatter(object):
     """
     Classe responsavel pela formatacao numerica de acordo com o Guia de Formatacao FORTRAN.
@@ -15,59 +18,91 @@ class Formatter(object):
         :return: String padronizada FORTRAN para numeros inteiros
         :rtype: basestring
         """
+        if number == 0 and blank:
+            return ""
+        number = float(number)
+        if number == 0:  # 0.0 e -0.0 sao chaves iguais no cache, mas possuem representacoes diferentes
+            return Formatter.computeFloat.__wrapped__(number, leng_max)
+        return Formatter.computeFloat(number, leng_max)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def computeFloat(number, leng_max):
+        """
+        Calcula as representacoes F e E de um numero float com no maximo leng_max caracteres e retorna a de menor erro.
+        Os resultados sao armazenados em cache, pois os mesmos valores se repetem em muitas linhas dos cartoes.
+        """
         strdec = ""
         strexp = ""
         erro_dec = 0
         erro_exp = 0
-        if number == 0 and blank:
-            return ""
-        else:
-            number = float(number)
-            force_dec = False
-            force_expo = False
-
-            try:
-                (integ, dec) = str(number).replace("-", "").split(".")
-                strdec = str(round(number, len(dec) - (len(str(integ + "." + dec)) - leng_max)))
-                float_dec = float(strdec)
-                erro_dec = abs(float_dec - number)
-            except:
-                force_expo = True
-
-            try:
-                number_expo = "{:E}".format(number).replace("E+0", "E").replace("E-0", "E-").replace("E+", "E")
-                coef_expo = number_expo.split("E")[0]
-                (integ_expo, dec_expo) = coef_expo.replace("-", "").split(".")
-                strexp = (str(round(float(coef_expo), len(dec_expo) - (len(number_expo) - leng_max))) + number_expo[number_expo.find("E"):]).replace(".0E", ".E")
-                float_exp = float(strexp)
-                erro_exp = abs(float_exp - number)
-            except:
-                force_dec = True
-
-            if force_dec:
-                if len(strdec) <= leng_max:
-                    return strdec
-                else:
-                    raise ValueError("Number exceeds maximum length")
 
-            if force_expo:
-                if len(strexp) <= leng_max:
-                    return strexp
-                else:
-                    raise ValueError("Number exceeds maximum length")
+        # Representacao F, indisponivel quando str(number) nao possui ponto decimal (1e-05, inf, nan)
+        partes = str(number).replace("-", "").split(".")
+        force_expo = len(partes) != 2
+        if not force_expo:
+            (integ, dec) = partes
+            strdec = str(round(number, len(dec) - (len(integ) + 1 + len(dec) - leng_max)))
+            erro_dec = abs(float(strdec) - number)
 
-            if len(strdec) <= leng_max and len(strexp) <= leng_max:
-                if erro_dec <= erro_exp:
-                    return strdec
-                else:
-                    return strexp
-            elif len(strdec) <= leng_max:
+        # Representacao E, indisponivel quando o coeficiente nao possui ponto decimal (inf, nan)
+        number_expo = "{:E}".format(number).replace("E+0", "E").replace("E-0", "E-").replace("E+", "E")
+        posicao_expo = number_expo.find("E")
+        coef_expo = number_expo[:posicao_expo] if posicao_expo >= 0 else number_expo
+        partes_expo = coef_expo.replace("-", "").split(".")
+        force_dec = len(partes_expo) != 2
+        if not force_dec:
+            dec_expo = partes_expo[1]
+            strexp = (
+                str(round(float(coef_expo), len(dec_expo) - (len(number_expo) - leng_max)))
+                + number_expo[posicao_expo:]
+            ).replace(".0E", ".E")
+            erro_exp = abs(float(strexp) - number)
+
+        if force_dec:
+            if len(strdec) <= leng_max:
                 return strdec
-            elif len(strexp) <= leng_max:
+            else:
+                raise ValueError("Number exceeds maximum length")
+
+        if force_expo:
+            if len(strexp) <= leng_max:
                 return strexp
             else:
                 raise ValueError("Number exceeds maximum length")
 
+        if len(strdec) <= leng_max and len(strexp) <= leng_max:
+            if erro_dec <= erro_exp:
+                return strdec
+            else:
+                return strexp
+        elif len(strdec) <= leng_max:
+            return strdec
+        elif len(strexp) <= leng_max:
+            return strexp
+        else:
+            raise ValueError("Number exceeds maximum length")
+
+    @staticmethod
+    def formatFloatRow(numbers, leng_max, blank=True):
+        """
+        Converte uma linha de numeros do tipo float, conforme formatFloat.
+        :param numbers: Numeros a serem convertidos
+        :type numbers: list
+        :param leng_max: Comprimento maximo de cada string (um valor para todos os campos ou uma lista)
+        :type leng_max: int ou list
+        :param blank: Valor booleano que indica se o valor 0 sera representado por um espaco em branco
+        :type blank: bool
+        :return: Lista de strings padronizadas FORTRAN
+        :rtype: list
+        """
+        if isinstance(leng_max, int):
+            leng_max = [leng_max] * len(numbers)
+        return [
+            Formatter.formatFloat(number=number, leng_max=leng, blank=blank)
+            for (number, leng) in zip(numbers, leng_max)
+        ]
+
     @staticmethod
     def formatInteger(number, leng_max, blank=True):
         """
@@ -159,6 +194,24 @@ class Formatter(object):
         string = Formatter.calcSpace(string=string, start_position=start_position, final_position=final_position) + string
         return string
 
+    @staticmethod
+    def insertFloatRow(numbers, leng_max, final_positions, start_position=0, blank=True):
+        """
+        Posiciona uma linha de numeros do tipo float nas colunas finais final_positions, conforme insertFloat.
+        Exemplo:
+        >> Formatter.insertFloatRow(numbers=[1e-8, 0.01], leng_max=8, final_positions=[8, 16])
+        :return: Linha com os campos posicionados
+        :rtype: basestring
+        """
+        linha = ""
+        for (string, final_position) in zip(
+                Formatter.formatFloatRow(numbers=numbers, leng_max=leng_max, blank=blank), final_positions
+        ):
+            linha += Formatter.calcSpace(
+                string=string, start_position=start_position + len(linha), final_position=final_position
+            ) + string
+        return linha
+
     @staticmethod
     def insertInteger(number, leng_max, start_position, final_position, blank=True):
         string = Formatter.formatInteger(number=number, leng_max=leng_max, blank=blank)
@@ -184,10 +237,7 @@ class Formatter(object):
         :rtype: basestring
         """
         tam = final_position - len(string) - start_position
-        esp = ""
-        for i in range(0, tam):
-            esp = esp + " "
-        return esp
+        return " " * max(tam, 0)
 
     @staticmethod
     def isInt(number):
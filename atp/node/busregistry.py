@@ -0,0 +1,54 @@
+class BusRegistry(object):
+    """
+    Classe responsavel pelo registro dos nos eletricos de um caso, com busca pelo nome da barra e pelo codigo do no
+    no ATP em tempo constante e iteracao na ordem de insercao.
+    Exemplo:
+    >> registry = BusRegistry()
+    >> registry.append(Node(name="800", type="Poste", sequence="ABCN"))
+    >> registry.by_name("800").phaseA
+    >> registry.by_node("B0000").name
+    """
+    def __init__(self, nodes=()):
+        self.names = {}
+        self.nodes = {}
+        for node in nodes:
+            self.append(node)
+
+    def append(self, node):
+        """
+        Adiciona um no ao registro.
+        :type node: Node
+        :raises ValueError: Caso ja exista um no com o mesmo nome ou o mesmo codigo
+        """
+        if node.name in self.names:
+            raise ValueError("Bus '{0}' is already registered".format(node.name))
+        if node.node in self.nodes:
+            raise ValueError("Node '{0}' is already registered".format(node.node))
+        self.names[node.name] = node
+        self.nodes[node.node] = node
+        return node
+
+    def by_name(self, name):
+        """
+        :param name: Nome da barra
+        :type name: basestring
+        :rtype: Node
+        """
+        return self.names[name]
+
+    def by_node(self, node):
+        """
+        :param node: Codigo do no no ATP (por exemplo, "B0000")
+        :type node: basestring
+        :rtype: Node
+        """
+        return self.nodes[node]
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __iter__(self):
+        return iter(self.names.values())
+
+    def __len__(self):
+        return len(self.names)
@@ -1,16 +1,15 @@
 from atp.formatter.formatter import Formatter
+from atp.node.nodenumbering import NodeNumbering
 
 
 class Node(object):
+    """
+    Classe responsavel pelos nos eletricos do cartao ATP, cujo nome e formado pela letra do tipo do no, por um numero
+    sequencial por tipo, alocado por um NodeNumbering, e pela fase.
+    """
+    __slots__ = ("name", "type", "sequence", "prefix", "radical", "number", "phaseA", "phaseB", "phaseC", "phaseN", "node")
 
-    n_bus = 0
-    n_other = 0
-    n_surgearrester = 0
-    n_trafosat = 0
-    n_ground = 0
-    n_hybridtrafo = 0
-    n_surgeimpedance = 0
-    n_insulator = 0
+    numbering = NodeNumbering()  # Numeracao usada pelos nos criados sem um contexto de numeracao proprio
 
     type_letter = \
         (
@@ -24,58 +23,48 @@ class Node(object):
             ("Isolador", "S")
         )
 
-    def __init__(self, name, type, sequence="ABCN"):
+    prefixes = dict(type_letter)
+
+    def __init__(self, name, type, sequence="ABCN", numbering=None):
+        """
+        Metodo Construtor da Classe.
+        :param name: Nome da barra
+        :type name: basestring
+        :param type: Tipo do no (ver type_letter)
+        :type type: basestring
+        :param sequence: Fases presentes no no
+        :type sequence: basestring
+        :param numbering: Contexto de numeracao dos nos (Se None, a numeracao compartilhada Node.numbering)
+        :type numbering: NodeNumbering
+        """
         self.name = name
         self.type = type
         self.sequence = sequence
 
-        self.prefix = list(filter(lambda t: t[0]==type, Node.type_letter))[0][1]
-
-        if self.type == "Poste":
-            self.number = int(Node.n_bus)
-            Node.n_bus += 1
-        elif self.type == "Outro":
-            self.number = int(Node.n_other)
-            Node.n_other += 1
-        elif self.type == "Para-Raio":
-            self.number = int(Node.n_surgearrester)
-            Node.n_surgearrester += 1
-        elif self.type == "Transformador Saturavel":
-            self.number = int(Node.n_trafosat)
-            Node.n_trafosat += 1
-        elif self.type == "Terra":
-            self.number = int(Node.n_ground)
-            Node.n_ground += 1
-        elif self.type == "Transformador Hibrido":
-            self.number = int(Node.n_hybridtrafo)
-            Node.n_hybridtrafo += 1
-        elif self.type == "Impedancia de Surto":
-            self.number = int(Node.n_surgeimpedance)
-            Node.n_surgeimpedance += 1
-        elif self.type == "Isolador":
-            self.number = int(Node.n_insulator)
-            Node.n_insulator += 1
-        else:
+        if self.type not in Node.prefixes:
             raise ValueError("Incorrect type")
+        # O radical e o numero de 4 digitos do nome; apos 65536 nos do mesmo tipo, o prefixo muda (ver NodeNumbering)
+        numbering = numbering if numbering is not None else Node.numbering
+        (self.prefix, self.radical, self.number) = numbering.allocate_node(type=self.type, prefix=Node.prefixes[self.type])
 
         if "A" in self.sequence:
-            self.phaseA = Formatter.formatString(prefix=self.prefix, radical=self.number, suffix="A")
+            self.phaseA = Formatter.formatString(prefix=self.prefix, radical=self.radical, suffix="A")
         else:
             self.phaseA = None
 
         if "B" in self.sequence:
-            self.phaseB = Formatter.formatString(prefix=self.prefix, radical=self.number, suffix="B")
+            self.phaseB = Formatter.formatString(prefix=self.prefix, radical=self.radical, suffix="B")
         else:
             self.phaseB = None
 
         if "C" in self.sequence:
-            self.phaseC = Formatter.formatString(prefix=self.prefix, radical=self.number, suffix="C")
+            self.phaseC = Formatter.formatString(prefix=self.prefix, radical=self.radical, suffix="C")
         else:
             self.phaseC = None
 
         if "N" in self.sequence:
-            self.phaseN = Formatter.formatString(prefix=self.prefix, radical=self.number, suffix="N")
+            self.phaseN = Formatter.formatString(prefix=self.prefix, radical=self.radical, suffix="N")
         else:
             self.phaseN = None
 
-        self.node = Formatter.formatString(prefix=self.prefix, radical=self.number, suffix="0")[0:-1]
\ No newline at end of file
+        self.node = Formatter.formatString(prefix=self.prefix, radical=self.radical, suffix="0")[0:-1]
\ No newline at end of file
@@ -0,0 +1,111 @@
+import threading
+
+from exceptions.exceptions import NodeCapacityError
+
+
+class NodeNumbering(object):
+    """
+    Classe responsavel pela numeracao dos nos eletricos de um caso, com um contador para cada tipo de no.
+    A alocacao e atomica, permitindo a geracao de casos em threads concorrentes, e os contadores podem ser zerados ou
+    salvos e restaurados, de modo que a mesma sequencia de nos gere sempre os mesmos nomes.
+    O nome de um no possui apenas 4 digitos hexadecimais para o numero, limitando cada letra de prefixo a 65536 nos.
+    Quando um tipo esgota o seu prefixo, ele passa a usar a proxima letra livre de overflow_prefixes, que pertence a um
+    unico tipo, de modo que nenhum nome alocado e repetido. Esgotadas todas as letras, NodeCapacityError e lancada.
+    A unicidade vale apenas para os nomes alocados por este contexto (todos os nos criados por Node). Nomes fixos criados
+    fora dele, como os identificadores "I" da area MODELS, nao sao registrados e devem usar letras fora de
+    overflow_prefixes.
+    Exemplo:
+    >> numbering = NodeNumbering()
+    >> Node(name="800", type="Poste", numbering=numbering).phaseA
+    >> estado = numbering.snapshot()
+    >> numbering.restore(estado)
+    """
+    capacity = 0x10000  # Numeros por letra de prefixo (4 digitos hexadecimais)
+
+    # Letras nao usadas por nenhum tipo de no nem pelos nos da area MODELS
+    overflow_prefixes = "DEFJKLMOQRUVWY"
+
+    def __init__(self):
+        """
+        Metodo Construtor da Classe.
+        """
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.prefixes = {}  # Letras de overflow reservadas por cada tipo, na ordem de esgotamento
+
+    def allocate(self, type):
+        """
+        :param type: Identificador do contador
+        :type type: basestring
+        :return: Proximo numero livre do contador type
+        :rtype: int
+        """
+        with self.lock:
+            number = self.counters.get(type, 0)
+            self.counters[type] = number + 1
+        return number
+
+    def allocate_node(self, type, prefix):
+        """
+        Aloca o codigo de um no (prefixo e numero de 4 digitos hexadecimais).
+        :param type: Tipo do no ("Poste", "Outro", "Para-Raio", ...)
+        :type type: basestring
+        :param prefix: Letra do tipo do no, usada enquanto houver numeros livres
+        :type prefix: basestring
+        :return: Tupla (prefixo, radical, numero sequencial do no no seu tipo)
+        :rtype: tuple
+        :raises NodeCapacityError: Caso todos os prefixos estejam esgotados ou prefix seja uma letra de overflow
+        """
+        if prefix in NodeNumbering.overflow_prefixes:
+            raise NodeCapacityError(
+                message="Invalid node prefix",
+                errors="The prefix '{0}' of the node type '{1}' is reserved for overflow node names.".format(
+                    prefix, type
+                )
+            )
+        with self.lock:
+            number = self.counters.get(type, 0)
+            (block, radical) = divmod(number, NodeNumbering.capacity)
+            if block > 0:
+                extra = self.prefixes.setdefault(type, [])
+                while len(extra) < block:
+                    extra.append(self.next_prefix(type=type))
+                code_prefix = extra[block - 1]
+            else:
+                code_prefix = prefix
+            self.counters[type] = number + 1
+        return (code_prefix, radical, number)
+
+    def next_prefix(self, type):
+        reservados = set(prefix for extra in self.prefixes.values() for prefix in extra)
+        for prefix in NodeNumbering.overflow_prefixes:
+            if prefix not in reservados:
+                return prefix
+        raise NodeCapacityError(
+            message="Node names exhausted",
+            errors="The node type '{0}' ran out of names after all {1} overflow prefixes, each one with {2} nodes. "
+                   "The ATP card is too large; reduce the coverage area.".format(
+                       type, len(NodeNumbering.overflow_prefixes), NodeNumbering.capacity
+                   )
+        )
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.prefixes = {}
+
+    def snapshot(self):
+        """
+        :return: Copia do estado da numeracao, aceita por restore
+        :rtype: dict
+        """
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "prefixes": {type: list(extra) for (type, extra) in self.prefixes.items()}
+            }
+
+    def restore(self, state):
+        with self.lock:
+            self.counters = dict(state["counters"])
+            self.prefixes = {type: list(extra) for (type, extra) in state["prefixes"].items()}
@@ -0,0 +1,143 @@
+import json
+import pickle
+
+import numpy
+
+from os.path import splitext
+
+
+class ResultExporter(object):
+    """
+    Classe responsavel pela exportacao dos resultados lidos de arquivos .pl4 em formato colunar, com uma coluna para
+    cada canal (tipo, from, to) alem da coluna de tempo, e os dados miscelaneos como metadados.
+    Os formatos disponiveis sao .npz (NumPy), .parquet (Apache Arrow, requer o pacote pyarrow) e .pckl (Pickle).
+    """
+    extensions = {
+        "npz": ".npz",
+        "parquet": ".parquet",
+        "pckl": ".pckl"
+    }
+
+    var_types = ("v_node", "e_bran", "v_bran", "i_bran")
+
+    separator = "|"
+
+    @staticmethod
+    def column_name(var_type, var_from, var_to):
+        return ResultExporter.separator.join([var_type, var_from, var_to])
+
+    @staticmethod
+    def column_key(column_name):
+        return tuple(column_name.split(ResultExporter.separator))
+
+    @staticmethod
+    def export(output, path, export_format="npz", compress=False):
+        """
+        Exporta os resultados de um arquivo .pl4.
+        :param output: Resultados retornados por ATPExecutor.read_pl4 (dicionario ou PL4Result)
+        :type output: dict
+        :param path: Caminho do arquivo de saida, com ou sem extensao
+        :type path: basestring
+        :param export_format: Formato do arquivo ("npz", "parquet" ou "pckl")
+        :type export_format: basestring
+        :param compress: Flag para a compressao dos dados
+        :type compress: bool
+        :return: Caminho do arquivo gerado
+        :rtype: basestring
+        """
+        if export_format not in ResultExporter.extensions:
+            raise ValueError("Export format must be one of {0}".format(list(ResultExporter.extensions.keys())))
+        if hasattr(output, "to_dict"):
+            output = output.to_dict()
+        if splitext(path)[1].lower() != ResultExporter.extensions[export_format]:
+            path += ResultExporter.extensions[export_format]
+
+        if export_format == "npz":
+            ResultExporter.export_npz(output=output, path=path, compress=compress)
+        elif export_format == "parquet":
+            ResultExporter.export_parquet(output=output, path=path, compress=compress)
+        else:
+            with open(path, "wb") as output_pckl:
+                pickle.dump(output, output_pckl)
+        return path
+
+    @staticmethod
+    def generate_columns(output):
+        columns = {"time": output["time"]}
+        for var_type in ResultExporter.var_types:
+            for ((var_from, var_to), channel) in output[var_type].items():
+                columns[ResultExporter.column_name(var_type, var_from, var_to)] = channel
+        return columns
+
+    @staticmethod
+    def export_npz(output, path, compress=False):
+        columns = ResultExporter.generate_columns(output=output)
+        columns["misc"] = numpy.array(json.dumps(output["misc"]))
+        with open(path, "wb") as output_npz:
+            if compress:
+                numpy.savez_compressed(output_npz, **columns)
+            else:
+                numpy.savez(output_npz, **columns)
+
+    @staticmethod
+    def export_parquet(output, path, compress=False):
+        import pyarrow
+        import pyarrow.parquet
+
+        columns = ResultExporter.generate_columns(output=output)
+        table = pyarrow.table({name: numpy.asarray(channel) for (name, channel) in columns.items()})
+        table = table.replace_schema_metadata({"misc": json.dumps(output["misc"])})
+        pyarrow.parquet.write_table(table, path, compression="zstd" if compress else "none")
+
+    @staticmethod
+    def load(path, channels=None):
+        """
+        Le resultados exportados, retornando o mesmo formato de ATPExecutor.read_pl4.
+        :param path: Caminho do arquivo exportado
+        :type path: basestring
+        :param channels: Lista de canais (tipo, from, to) a serem lidos (Se None, todos os canais sao lidos)
+        :type channels: list
+        :rtype: dict
+        """
+        extension = splitext(path)[1].lower()
+        output = {"misc": {}, "time": None}
+        for var_type in ResultExporter.var_types:
+            output[var_type] = {}
+
+        if channels is not None:
+            channels = [ResultExporter.column_name(*channel) for channel in channels]
+
+        if extension == ".npz":
+            with numpy.load(path) as output_npz:
+                output["misc"] = json.loads(str(output_npz["misc"]))
+                names = [name for name in output_npz.files if name not in ("misc", "time")]
+                output["time"] = output_npz["time"]
+                for name in names:
+                    if channels is None or name in channels:
+                        (var_type, var_from, var_to) = ResultExporter.column_key(column_name=name)
+                        output[var_type][(var_from, var_to)] = output_npz[name]
+        elif extension == ".parquet":
+            import pyarrow.parquet
+
+            metadata = pyarrow.parquet.read_schema(path).metadata
+            output["misc"] = json.loads(metadata[b"misc"])
+            names = pyarrow.parquet.read_schema(path).names
+            if channels is not None:
+                names = ["time"] + [name for name in names if name in channels]
+            table = pyarrow.parquet.read_table(path, columns=names)
+            for name in table.column_names:
+                if name == "time":
+                    output["time"] = table.column(name).to_numpy()
+                else:
+                    (var_type, var_from, var_to) = ResultExporter.column_key(column_name=name)
+                    output[var_type][(var_from, var_to)] = table.column(name).to_numpy()
+        else:
+            with open(path, "rb") as output_pckl:
+                output = pickle.load(output_pckl)
+            if channels is not None:
+                for var_type in ResultExporter.var_types:
+                    output[var_type] = {
+                        key: channel for (key, channel) in output[var_type].items()
+                        if ResultExporter.column_name(var_type, *key) in channels
+                    }
+        return output
@@ -0,0 +1,142 @@
+import math
+import fnmatch
+
+from collections.abc import Mapping
+
+
+class PL4Channels(Mapping):
+    """
+    Classe responsavel pelo acesso sob demanda aos canais de um tipo de variavel de um arquivo .pl4, retornando cada
+    canal como uma visao da coluna correspondente nos dados mapeados em memoria.
+    """
+    def __init__(self, result, index):
+        self.result = result
+        self.index = index
+
+    def __getitem__(self, key):
+        return self.result.data[:, self.index[key]]
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+
+class PL4Result(object):
+    """
+    Classe responsavel pelo acesso preguicoso aos resultados de um arquivo .pl4.
+    O arquivo permanece mapeado em memoria e os canais, janelas de tempo e dizimacoes sao visoes dos dados, de forma
+    que apenas as partes efetivamente utilizadas sao lidas do disco.
+    Exemplo:
+    >> result = ATPExecutor.read_pl4(pl4_file="surge_feeder.pl4", lazy=True)
+    >> v = result.window(t0=0.0, t1=1e-4).v_node[("B0001A", "")]
+    >> peak = abs(v).max()
+    """
+    def __init__(self, pl4_file, misc, index, data, first_step=0, step=1):
+        """
+        Metodo Construtor da Classe.
+        :param pl4_file: Caminho do arquivo .pl4
+        :type pl4_file: basestring
+        :param misc: Dados miscelaneos do arquivo completo, conforme ATPExecutor.read_pl4_header
+        :type misc: dict
+        :param index: Indice das colunas de cada canal, conforme ATPExecutor.pl4_channel_index
+        :type index: dict
+        :param data: Dados mapeados em memoria (ou visao desses dados)
+        :type data: numpy.memmap
+        :param first_step: Passo de simulacao correspondente a primeira linha de data
+        :type first_step: int
+        :param step: Intervalo em passos de simulacao entre as linhas de data
+        :type step: int
+        """
+        self.pl4_file = pl4_file
+        self.index = index
+        self.data = data
+        self.first_step = int(first_step)
+        self.step = int(step)
+
+        self.misc = dict(misc)
+        self.misc["steps"] = int(self.data.shape[0])
+        self.misc["t0"] = self.first_step * misc["deltat"]
+        self.misc["deltat"] = misc["deltat"] * self.step
+        self.misc["tmax"] = self.misc["t0"] + (self.misc["steps"] - 1) * self.misc["deltat"]
+
+        self.v_node = PL4Channels(result=self, index=self.index["v_node"])
+        self.e_bran = PL4Channels(result=self, index=self.index["e_bran"])
+        self.v_bran = PL4Channels(result=self, index=self.index["v_bran"])
+        self.i_bran = PL4Channels(result=self, index=self.index["i_bran"])
+
+    @property
+    def time(self):
+        return self.data[:, 0]
+
+    def window(self, t0=None, t1=None):
+        """
+        Retorna os resultados restritos ao intervalo de tempo [t0, t1], sem copia dos dados.
+        O intervalo e calculado a partir de DELTAT, sem leitura da coluna de tempo.
+        :param t0: Tempo inicial em segundos (Se None, o inicio dos dados)
+        :type t0: float
+        :param t1: Tempo final em segundos (Se None, o fim dos dados)
+        :type t1: float
+        :rtype: PL4Result
+        """
+        steps = self.misc["steps"]
+        deltat = self.misc["deltat"]
+        tolerance = 1e-6
+        start = 0 if t0 is None else math.ceil((t0 - self.misc["t0"]) / deltat - tolerance)
+        stop = steps if t1 is None else math.floor((t1 - self.misc["t0"]) / deltat + tolerance) + 1
+        start = min(max(start, 0), steps)
+        stop = min(max(stop, start), steps)
+        return self.derive(start=start, stop=stop, step=1)
+
+    def decimate(self, k):
+        """
+        Retorna os resultados com apenas uma a cada k amostras, sem copia dos dados.
+        :param k: Fator de dizimacao
+        :type k: int
+        :rtype: PL4Result
+        """
+        if int(k) < 1:
+            raise ValueError("Decimation factor must be a positive integer")
+        return self.derive(start=0, stop=self.misc["steps"], step=int(k))
+
+    def derive(self, start, stop, step):
+        misc = dict(self.misc)
+        misc["deltat"] = self.misc["deltat"] / self.step
+        return PL4Result(
+            pl4_file=self.pl4_file,
+            misc=misc,
+            index=self.index,
+            data=self.data[start:stop:step],
+            first_step=self.first_step + start * self.step,
+            step=self.step * step
+        )
+
+    def channels(self, pattern="*"):
+        """
+        Retorna os canais cujo no de origem ou de destino corresponde ao padrao (no formato do modulo fnmatch).
+        Exemplo:
+        >> result.channels("B000A?")
+        :param pattern: Padrao dos nomes dos nos
+        :type pattern: basestring
+        :return: Dicionario {(tipo, from, to): canal}
+        :rtype: dict
+        """
+        selected = {}
+        for (var_type, index) in self.index.items():
+            for ((var_from, var_to), column) in index.items():
+                if fnmatch.fnmatchcase(var_from, pattern) or fnmatch.fnmatchcase(var_to, pattern):
+                    selected[(var_type, var_from, var_to)] = self.data[:, column]
+        return selected
+
+    def to_dict(self):
+        """
+        Retorna os resultados no mesmo formato do dicionario de ATPExecutor.read_pl4.
+        """
+        output = {
+            "misc": dict(self.misc),
+            "time": self.time
+        }
+        for var_type in self.index.keys():
+            output[var_type] = dict(getattr(self, var_type).items())
+        return output
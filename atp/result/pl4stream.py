@@ -0,0 +1,135 @@
+import numpy
+
+from atp.executor import ATPExecutor
+
+
+def iter_pl4_chunks(path, rows=65536):
+    """
+    Le um arquivo .pl4 em blocos de linhas, sem manter a matriz completa em memoria.
+    :param path: Caminho do arquivo .pl4
+    :type path: basestring
+    :param rows: Numero maximo de passos de simulacao por bloco
+    :type rows: int
+    :return: Gerador de tuplas (time, block), sendo block um array (linhas x variaveis) sem a coluna de tempo
+    :rtype: generator
+    """
+    (misc_data, header, data_offset) = ATPExecutor.read_pl4_header(pl4_file=path)
+    n_col = misc_data["n_var"] + 1
+    remaining = misc_data["steps"]
+    with open(path, "rb") as pl4:
+        pl4.seek(data_offset)
+        while remaining > 0:
+            n_rows = min(int(rows), remaining)
+            chunk = numpy.fromfile(pl4, dtype=numpy.float32, count=n_rows * n_col)
+            n_rows = chunk.size // n_col
+            if n_rows == 0:
+                break
+            chunk = chunk[:n_rows * n_col].reshape(n_rows, n_col)
+            remaining -= n_rows
+            yield chunk[:, 0], chunk[:, 1:]
+
+
+def pl4_channel_labels(path):
+    """
+    Retorna a identificacao (tipo, from, to) de cada coluna dos blocos de iter_pl4_chunks.
+    Colunas de tipos nao suportados sao identificadas por None.
+    """
+    (misc_data, header, data_offset) = ATPExecutor.read_pl4_header(pl4_file=path)
+    labels = [None] * misc_data["n_var"]
+    for (var_type, channels) in ATPExecutor.pl4_channel_index(header=header).items():
+        for ((var_from, var_to), column) in channels.items():
+            labels[column - 1] = (var_type, var_from, var_to)
+    return labels
+
+
+class PL4Reduction(object):
+    """
+    Classe responsavel pelo calculo, em uma unica passagem pelos blocos de um arquivo .pl4, dos valores maximo,
+    minimo e maximo absoluto, do instante do pico, do valor eficaz e da integral do quadrado de cada canal.
+    Exemplo:
+    >> reduction = PL4Reduction()
+    >> for (time, block) in iter_pl4_chunks("surge_feeder.pl4"):
+    >>     reduction.update(time=time, block=block)
+    >> envelope = reduction.result()
+    """
+    def __init__(self):
+        self.n_samples = 0
+        self.max = None
+        self.min = None
+        self.abs_max = None
+        self.t_peak = None
+        self.sum_square = None
+        self.energy = None
+        self.last_time = None
+        self.last_square = None
+
+    def update(self, time, block):
+        if block.shape[0] == 0:
+            return
+        block = block.astype(numpy.float64)
+        time = time.astype(numpy.float64)
+        square = block * block
+        abs_block = numpy.abs(block)
+        peak_row = numpy.argmax(abs_block, axis=0)
+        peak = abs_block[peak_row, numpy.arange(block.shape[1])]
+
+        if self.n_samples == 0:
+            self.max = block.max(axis=0)
+            self.min = block.min(axis=0)
+            self.abs_max = peak
+            self.t_peak = time[peak_row]
+            self.sum_square = numpy.zeros(block.shape[1])
+            self.energy = numpy.zeros(block.shape[1])
+        else:
+            self.max = numpy.maximum(self.max, block.max(axis=0))
+            self.min = numpy.minimum(self.min, block.min(axis=0))
+            new_peak = peak > self.abs_max
+            self.abs_max = numpy.where(new_peak, peak, self.abs_max)
+            self.t_peak = numpy.where(new_peak, time[peak_row], self.t_peak)
+            # Trapezio entre a ultima amostra do bloco anterior e a primeira deste bloco
+            self.energy += (self.last_square + square[0]) / 2 * (time[0] - self.last_time)
+
+        self.energy += numpy.sum((square[1:] + square[:-1]) / 2 * numpy.diff(time)[:, numpy.newaxis], axis=0)
+        self.sum_square += square.sum(axis=0)
+        self.n_samples += block.shape[0]
+        self.last_time = time[-1]
+        self.last_square = square[-1]
+
+    def result(self):
+        """
+        :return: Dicionario com os arrays "max", "min", "abs_max", "t_peak", "rms" e "energy", com um valor por canal
+        :rtype: dict
+        """
+        if self.n_samples == 0:
+            return {}
+        return {
+            "max": self.max,
+            "min": self.min,
+            "abs_max": self.abs_max,
+            "t_peak": self.t_peak,
+            "rms": numpy.sqrt(self.sum_square / self.n_samples),
+            "energy": self.energy
+        }
+
+
+def reduce_pl4(path, rows=65536):
+    """
+    Calcula as reducoes de PL4Reduction para todos os canais de um arquivo .pl4, lendo-o em blocos.
+    :param path: Caminho do arquivo .pl4
+    :type path: basestring
+    :param rows: Numero maximo de passos de simulacao por bloco
+    :type rows: int
+    :return: Dicionario {(tipo, from, to): {"max": ..., "min": ..., "abs_max": ..., "t_peak": ..., "rms": ...,
+    "energy": ...}}
+    :rtype: dict
+    """
+    reduction = PL4Reduction()
+    for (time, block) in iter_pl4_chunks(path=path, rows=rows):
+        reduction.update(time=time, block=block)
+    values = reduction.result()
+
+    output = {}
+    for (column, label) in enumerate(pl4_channel_labels(path=path)):
+        if label is not None and values:
+            output[label] = {name: float(value[column]) for (name, value) in values.items()}
+    return output
@@ -0,0 +1,157 @@
+import os
+import time
+import subprocess
+
+from concurrent.futures import ThreadPoolExecutor
+from os.path import basename, dirname, isfile
+
+
+class ATPJob(object):
+    """
+    Classe responsavel pela descricao e pelo estado de uma execucao do ATP.
+    O estado (status) pode ser "queued", "running", "ok", "failed" ou "timed-out".
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    OK = "ok"
+    FAILED = "failed"
+    TIMED_OUT = "timed-out"
+
+    def __init__(self, filename, outputs=None, cwd=None, name=None):
+        """
+        Metodo Construtor da Classe.
+        :param filename: Caminho do arquivo de entrada do ATP (.atp ou .dat)
+        :type filename: basestring
+        :param outputs: Arquivos que devem existir ao final da execucao para que ela seja considerada bem sucedida
+        :type outputs: list
+        :param cwd: Diretorio de trabalho da execucao (Se None, o diretorio do arquivo de entrada)
+        :type cwd: basestring
+        :param name: Nome da execucao (Se None, o nome do arquivo de entrada)
+        :type name: basestring
+        """
+        self.filename = filename
+        self.outputs = list(outputs) if outputs is not None else []
+        self.cwd = cwd if cwd is not None else dirname(filename) or None
+        self.name = name if name is not None else basename(filename)
+        self.status = ATPJob.QUEUED
+        self.attempts = 0
+        self.returncode = None
+        self.stdout = ""
+        self.stderr = ""
+        self.elapsed = 0.0
+
+    @property
+    def done(self):
+        return self.status == ATPJob.OK
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "filename": self.filename,
+            "status": self.status,
+            "attempts": self.attempts,
+            "returncode": self.returncode,
+            "elapsed": self.elapsed
+        }
+
+
+class ATPRunner(object):
+    """
+    Classe responsavel pela execucao de filas de casos do ATP com ate jobs execucoes simultaneas, tempo limite por
+    execucao e novas tentativas com espera crescente entre elas.
+    O comando do ATP pode ser o caminho de um executavel ou uma lista com o programa e seus argumentos, ao final da qual
+    e adicionado o arquivo de entrada, permitindo o uso de scripts substitutos do ATP.
+    Exemplo:
+    >> runner = ATPRunner(execution_cmd=["python3", "fake_atp.py"], jobs=4, timeout=60, retries=1)
+    >> jobs = runner.run([ATPJob(filename="surge_feeder.atp", outputs=["surge_feeder.pl4"])])
+    """
+    def __init__(self, execution_cmd, jobs=1, timeout=None, retries=0, backoff=1.0):
+        """
+        Metodo Construtor da Classe.
+        :param execution_cmd: Comando do ATP
+        :type execution_cmd: basestring or list
+        :param jobs: Numero maximo de execucoes simultaneas
+        :type jobs: int
+        :param timeout: Tempo limite de cada tentativa em segundos (Se None, sem limite)
+        :type timeout: float
+        :param retries: Numero de novas tentativas apos uma falha
+        :type retries: int
+        :param backoff: Espera em segundos antes da primeira nova tentativa, dobrada a cada tentativa seguinte
+        :type backoff: float
+        """
+        if isinstance(execution_cmd, (list, tuple)):
+            self.execution_cmd = list(execution_cmd)
+        else:
+            self.execution_cmd = [execution_cmd]
+        self.jobs = max(1, int(jobs))
+        self.timeout = timeout if timeout else None
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+
+    def run_job(self, job):
+        """
+        Executa um caso, repetindo a execucao em caso de falha, codigo de saida diferente de zero, tempo limite
+        excedido ou ausencia dos arquivos de saida.
+        :type job: ATPJob
+        :rtype: ATPJob
+        """
+        start_time = time.time()
+        while True:
+            job.status = ATPJob.RUNNING
+            job.attempts += 1
+            for output in job.outputs:  # Evita que saidas de execucoes anteriores sejam tomadas como resultado
+                if isfile(output):
+                    os.remove(output)
+            try:
+                completed = subprocess.run(
+                    self.execution_cmd + [job.filename],
+                    cwd=job.cwd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    timeout=self.timeout
+                )
+                job.returncode = completed.returncode
+                job.stdout = completed.stdout.decode(errors="replace")
+                job.stderr = completed.stderr.decode(errors="replace")
+                if completed.returncode == 0 and all(isfile(output) for output in job.outputs):
+                    job.status = ATPJob.OK
+                else:
+                    job.status = ATPJob.FAILED
+            except subprocess.TimeoutExpired as excep:
+                job.returncode = None
+                job.stdout = (excep.stdout or b"").decode(errors="replace")
+                job.stderr = (excep.stderr or b"").decode(errors="replace")
+                job.status = ATPJob.TIMED_OUT
+            except OSError as excep:
+                job.returncode = None
+                job.stderr = str(excep)
+                job.status = ATPJob.FAILED
+
+            if job.status == ATPJob.OK or job.attempts > self.retries:
+                break
+            time.sleep(self.backoff * 2 ** (job.attempts - 1))
+        job.elapsed = time.time() - start_time
+        return job
+
+    def run(self, job_list):
+        """
+        Executa uma lista de casos com ate jobs execucoes simultaneas.
+        :param job_list: Lista de casos
+        :type job_list: list
+        :return: A mesma lista de casos, com o estado final de cada um
+        :rtype: list
+        """
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            list(pool.map(self.run_job, job_list))
+        return job_list
+
+    @staticmethod
+    def summary(job_list):
+        """
+        :return: Numero de casos em cada estado
+        :rtype: dict
+        """
+        status = {}
+        for job in job_list:
+            status[job.status] = status.get(job.status, 0) + 1
+        return status
@@ -0,0 +1,72 @@
+"""
+Mede a memoria ocupada por N instancias de Node e dos elementos mais frequentes nos cartoes, usando tracemalloc.
+Para comparar com uma versao anterior (sem __slots__), execute o script apontando --path para outra copia do repositorio:
+    git worktree add ../atp-base <revisao>
+    python benchmarks/slots_memory.py
+    python benchmarks/slots_memory.py --path ../atp-base
+"""
+import argparse
+import sys
+import tracemalloc
+from os.path import abspath, dirname, join
+
+
+def measure(factory, count):
+    """
+    Retorna a memoria, em bytes, mantida pelas instancias criadas por factory(i), para i de 0 a count - 1.
+    """
+    tracemalloc.start()
+    objects = [factory(i) for i in range(count)]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory used by Node and Element instances.")
+    parser.add_argument("-p", "--path", default=join(dirname(abspath(__file__)), ".."),
+                        help="root of the repository to be measured (default: this repository)")
+    parser.add_argument("-n", "--count", type=int, default=10000, help="number of instances of each class")
+    args = parser.parse_args()
+
+    sys.path.insert(0, abspath(args.path))
+    from atp.node.node import Node
+    from atp.element.branch.ground import Ground
+    from atp.element.branch.rlc import RLC
+    from atp.element.branch.rlc3phY import RLC_3ph_Y
+    from atp.element.branch.surgearresterieee import SurgeArresterIEEE
+    from atp.element.output.voltageprobe import VoltageProbe
+    from atp.element.source.currentheidler import CurrentHEIDLER
+    from atp.element.source.voltageac_3ph import VoltageAC_3ph
+
+    # Os nos usados pelos elementos sao criados antes da medicao, pois sao compartilhados no cartao
+    pos = Node(name="pos", type="Poste")
+    neg = Node(name="neg", type="Poste")
+    gnd = Node(name="gnd", type="Terra")
+    curve = [[1e3, 1e5], [1e4, 1.5e5]]
+
+    factories = [
+        ("Node", lambda i: Node(name=str(i), type="Poste")),
+        ("RLC", lambda i: RLC(R=1.0 + i, L=0, C=0, bus_pos=pos, bus_neg=neg)),
+        ("RLC_3ph_Y", lambda i: RLC_3ph_Y(R1=1.0 + i, L1=0, C1=1.0, R2=1.0, L2=0, C2=1.0, R3=1.0, L3=0, C3=1.0,
+                                          bus_pos=pos)),
+        ("VoltageAC_3ph", lambda i: VoltageAC_3ph(bus_pos=pos, amp=1e4 + i)),
+        ("CurrentHEIDLER", lambda i: CurrentHEIDLER(bus_pos=pos, amp=1e4 + i)),
+        ("VoltageProbe", lambda i: VoltageProbe(bus=pos)),
+        ("SurgeArresterIEEE", lambda i: SurgeArresterIEEE(bus_pos=pos, bus_neg=gnd, currentvoltageA0=curve,
+                                                          currentvoltageA1=curve, d=1.0, n=1, prnumber=i % 1000)),
+        ("Ground", lambda i: Ground(bus_pos=gnd, r=0.01, l=2.4, ro=100.0, gndnumber=i % 1000)),
+    ]
+
+    print("{0:<20}{1:>14}{2:>14}".format("class", "KiB", "bytes/obj"))
+    total = 0
+    for (name, factory) in factories:
+        memory = measure(factory, args.count)
+        total += memory
+        print("{0:<20}{1:>14.0f}{2:>14.0f}".format(name, memory / 1024, memory / args.count))
+    print("{0:<20}{1:>14.0f}".format("total", total / 1024))
+
+
+if __name__ == "__main__":
+    main()
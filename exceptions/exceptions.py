@@ -50,3 +50,21 @@ class BusNotFoundError(ValueError):
     def __init__(self, message, errors=None):
         super().__init__(message)
         self.errors = errors
+
+
+class LineTemplateError(ValueError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors
+
+
+class ATPExecutionError(RuntimeError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors
+
+
+class NodeCapacityError(ValueError):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors
@@ -1,3 +1,5 @@
+import heapq
+
 import networkx as nx
 
 from copy import deepcopy as copy
@@ -19,6 +21,8 @@ class Feeder(object):
         self.equivalent_graphs = None
         self.equivalent_values = None
         self.electric_diagram = None
+        self.removed_edges = None
+        self.adjacency = None
 
         self.define_main_source_bus()
         self.generate_graph()
@@ -142,121 +146,205 @@ class Feeder(object):
                 }
 
     def remove_cycles(self):
-        is_cyclic = Feeder.is_cyclic(graph=nx.to_undirected(graph=self.graph), root=self.main_source_bus)
-
-        while is_cyclic:
-            changed = True
-            cycle_path = nx.find_cycle(G=self.graph, source=self.main_source_bus, orientation="ignore")
-            print(cycle_path)
-
-            for path in cycle_path:
-                if "switch" in self.graph[path[0]][path[1]]:
-                    print("removed", path)
-                    self.graph.remove_edge(u=path[0], v=path[1])
-                    changed = True
-                    break
-                changed = False
-
-            if not changed:
-                raise CyclicGraphError(
-                    message="Can't organize cyclic feeder.",
-                    errors="The feeder graph is cyclic in paths {0}. "
-                           "No switch can be opened to avoid creating cycles.".format(cycle_path)
-                )
+        """
+        Abre, em uma unica passagem, o menor conjunto de chaves que torna o alimentador radial.
+        As arvores geradoras sao montadas por union-find, considerando primeiro os trechos sem chave e depois os trechos
+        com chave. Cada trecho com chave que fecharia um ciclo e removido, e cada trecho sem chave que fecharia um ciclo
+        indica uma malha que nao pode ser aberta.
+        :return: Lista dos trechos removidos (from, to)
+        :rtype: list
+        :raises CyclicGraphError: Com todas as malhas sem chave, caso existam
+        """
+        parent = {node: node for node in self.graph.nodes()}
+
+        def find(node):
+            root = node
+            while parent[root] != root:
+                root = parent[root]
+            while parent[node] != root:  # Compressao de caminho
+                (parent[node], node) = (root, parent[node])
+            return root
+
+        # Ordenacao estavel: os trechos com chave vao para o fim, mantendo a ordem original dentro de cada grupo
+        edges = sorted(self.graph.edges(), key=lambda edge: "switch" in self.graph[edge[0]][edge[1]])
+
+        tree_edges = []
+        visited_edges = set()
+        cyclic_edges = []
+        self.removed_edges = []
+        for (edge_from, edge_to) in edges:
+            undirected_edge = frozenset((edge_from, edge_to))
+            if undirected_edge in visited_edges:  # Trechos paralelos (u, v) e (v, u) formam um unico trecho
+                continue
+            visited_edges.add(undirected_edge)
+            (root_from, root_to) = (find(edge_from), find(edge_to))
+            if root_from != root_to:
+                parent[root_from] = root_to
+                tree_edges.append((edge_from, edge_to))
+            elif "switch" in self.graph[edge_from][edge_to]:
+                self.removed_edges.append((edge_from, edge_to))
+            else:
+                cyclic_edges.append((edge_from, edge_to))
+
+        if cyclic_edges:
+            tree = nx.Graph(tree_edges)
+            cycle_paths = []
+            for (edge_from, edge_to) in cyclic_edges:
+                path = nx.shortest_path(G=tree, source=edge_to, target=edge_from) if edge_from != edge_to else [edge_to]
+                cycle_paths.append([(edge_from, edge_to)] + list(zip(path, path[1:])))
+            raise CyclicGraphError(
+                message="Can't organize cyclic feeder.",
+                errors="The feeder graph is cyclic in paths {0}. "
+                       "No switch can be opened to avoid creating cycles.".format(cycle_paths)
+            )
 
-            is_cyclic = Feeder.is_cyclic(graph=nx.to_undirected(graph=self.graph), root=self.main_source_bus)
+        self.graph.remove_edges_from(ebunch=self.removed_edges)
+        self.adjacency = None
+        return self.removed_edges
 
     def organize_feeder(self):
-        graph_undirected = nx.to_undirected(graph=self.graph)
-        graph_list = nx.to_dict_of_lists(G=self.graph)
-        out_edge_list = []
-        for bus in graph_list.keys():
+        """
+        Orienta todos os trechos no sentido da fonte principal para as extremidades, com uma unica busca em largura a
+        partir de main_source_bus, mantendo os atributos dos trechos.
+        Cada trecho e reescrito uma unica vez, na ordem da ultima barra extrema a jusante dele, de modo que a ordem das
+        barras a jusante de cada barra seja a mesma obtida orientando os caminhos da fonte ate cada barra extrema.
+        """
+        parent = {self.main_source_bus: None}
+        order = [self.main_source_bus]
+        for bus in order:  # A lista cresce durante a iteracao (busca em largura)
+            for adj in list(self.graph.successors(bus)) + list(self.graph.predecessors(bus)):
+                if adj not in parent:
+                    parent[adj] = bus
+                    order.append(adj)
+
+        leaf_index = {}
+        for bus in self.graph.nodes():
             if self.graph.degree[bus] == 1 and not bus == self.main_source_bus:
-                out_edge_list.append(bus)
-        for node in out_edge_list:
-            path = nx.shortest_path(G=graph_undirected, source=self.main_source_bus, target=node)
-            path_edges = list(zip(path, path[1:]))
-            for (edge_from, edge_to) in path_edges:
-                attrs = graph_undirected[edge_from][edge_to]
-                if self.graph.has_edge(u=edge_from, v=edge_to):
-                    self.graph.remove_edge(u=edge_from, v=edge_to)
-                if self.graph.has_edge(u=edge_to, v=edge_from):
-                    self.graph.remove_edge(u=edge_to, v=edge_from)
-                self.graph.add_edge(u_of_edge=edge_from, v_of_edge=edge_to, **attrs)
+                leaf_index[bus] = len(leaf_index)
+
+        last_leaf = {bus: leaf_index.get(bus, -1) for bus in order}
+        for bus in reversed(order[1:]):
+            if last_leaf[bus] > last_leaf[parent[bus]]:
+                last_leaf[parent[bus]] = last_leaf[bus]
+
+        for bus in sorted(order[1:], key=lambda node: last_leaf[node]):
+            if last_leaf[bus] < 0:  # Nenhuma barra extrema a jusante
+                continue
+            edge_from = parent[bus]
+            if self.graph.has_edge(u=edge_from, v=bus):
+                attrs = self.graph[edge_from][bus]
+            else:
+                attrs = self.graph[bus][edge_from]
+            if self.graph.has_edge(u=edge_from, v=bus):
+                self.graph.remove_edge(u=edge_from, v=bus)
+            if self.graph.has_edge(u=bus, v=edge_from):
+                self.graph.remove_edge(u=bus, v=edge_from)
+            self.graph.add_edge(u_of_edge=edge_from, v_of_edge=bus, **attrs)
 
     def simplify_feeder(self, length_limit=5000):
-        graph_list = nx.to_dict_of_lists(G=self.graph)
-        not_remove_node_list = []
-        for bus in graph_list.keys():
-            if self.graph.degree[bus] == 2:
-                edge_in = list(self.graph.in_edges(bus))[0]
-                edge_in_attr = self.graph[edge_in[0]][edge_in[1]]
-                edge_out = list(self.graph.out_edges(bus))[0]
-                edge_out_attr = self.graph[edge_out[0]][edge_out[1]]
-            if not self.graph.degree[bus] == 2:
-                if not bus == self.main_source_bus:
-                    not_remove_node_list.append(bus)
-            elif "source" in self.graph.nodes[bus]:
-                not_remove_node_list.append(bus)
-            elif "surge" in self.graph.nodes[bus]:
-                not_remove_node_list.append(bus)
-            elif "load" in self.graph.nodes[bus]:
-                not_remove_node_list.append(bus)
-            elif "capacitor" in self.graph.nodes[bus]:
-                not_remove_node_list.append(bus)
-            elif "surge_arrester" in self.graph.nodes[bus]:
-                not_remove_node_list.append(bus)
-            elif not edge_in_attr["phase"] == edge_out_attr["phase"]:
-                not_remove_node_list.append(bus)
-            elif not edge_in_attr["cable"] == edge_out_attr["cable"]:
-                not_remove_node_list.append(bus)
-            elif not edge_in_attr["pole"] == edge_out_attr["pole"]:
-                not_remove_node_list.append(bus)
-            elif not edge_in_attr["rho"] == edge_out_attr["rho"]:
-                not_remove_node_list.append(bus)
-        for node in sorted(self.graph.nodes()):
-            if node not in not_remove_node_list and not node == self.main_source_bus:
-                edge_in = list(self.graph.in_edges(node))[0]
-                edge_in_attr = self.graph[edge_in[0]][edge_in[1]]
-                edge_out = list(self.graph.out_edges(node))[0]
-                edge_out_attr = self.graph[edge_out[0]][edge_out[1]]
-                if edge_in_attr["length"] + edge_out_attr["length"] < length_limit:
-                    new_from = str(edge_in[0])
-                    new_to = str(edge_out[1])
-                    new_attr = {
-                        "code": "{0} + {1}".format(edge_in_attr["code"], edge_out_attr["code"]),
-                        "length": edge_in_attr["length"] + edge_out_attr["length"],
-                        "phase": copy(edge_in_attr["phase"]),
-                        "cable": copy(edge_in_attr["cable"]),
-                        "pole": copy(edge_in_attr["pole"]),
-                        "rho": copy(edge_in_attr["rho"]),
-                    }
-                    self.graph.add_edge(u_of_edge=new_from, v_of_edge=new_to, **new_attr)
-                    self.graph.remove_node(n=node)
-
-    def define_area(self, center_bus, lim=100):
-        if lim > len(list(self.graph)):
-            lim = len(list(self.graph))
+        """
+        Substitui as sequencias de trechos identicos por trechos equivalentes, em uma unica passagem.
+        Cada cadeia maxima de barras intermediarias (ver is_chain_bus) e dividida, a partir da barra a montante, em
+        segmentos com comprimento total menor que length_limit, e cada segmento com mais de um trecho e substituido por
+        um unico trecho. Os atributos phase, cable, pole e rho do novo trecho sao compartilhados com o primeiro trecho
+        do segmento, sem copias.
+        :param length_limit: Comprimento maximo dos trechos equivalentes
+        :type length_limit: float
+        """
+        chain_buses = set(bus for bus in self.graph.nodes() if self.is_chain_bus(bus=bus))
+        for start_bus in list(self.graph.nodes()):
+            if start_bus in chain_buses:
+                continue
+            for first_bus in list(self.graph.successors(start_bus)):
+                if first_bus not in chain_buses:
+                    continue
+                path = [start_bus, first_bus]
+                while path[-1] in chain_buses:
+                    path.append(next(iter(self.graph.successors(path[-1]))))
+
+                segments = [[0]]
+                length = self.graph[path[0]][path[1]]["length"]
+                for position in range(1, len(path) - 1):
+                    edge_length = self.graph[path[position]][path[position + 1]]["length"]
+                    if length + edge_length < length_limit:
+                        segments[-1].append(position)
+                        length += edge_length
+                    else:
+                        segments.append([position])
+                        length = edge_length
+
+                for segment in segments:
+                    if len(segment) > 1:
+                        self.merge_path(path=path[segment[0]:segment[-1] + 2])
+        self.adjacency = None
+
+    def is_chain_bus(self, bus):
+        """
+        :return: True se bus pode ser removida na simplificacao, ou seja, se possui um unico trecho a montante e um
+        unico a jusante, com os mesmos phase, cable, pole e rho e sem chaves, e nao possui fonte, carga, capacitor,
+        surto ou para-raios
+        :rtype: bool
+        """
+        if bus == self.main_source_bus:
+            return False
+        if not (self.graph.in_degree[bus] == 1 and self.graph.out_degree[bus] == 1):
+            return False
+        for element in ("source", "surge", "load", "capacitor", "surge_arrester"):
+            if element in self.graph.nodes[bus]:
+                return False
+        edge_in_attr = self.graph[next(iter(self.graph.predecessors(bus)))][bus]
+        edge_out_attr = self.graph[bus][next(iter(self.graph.successors(bus)))]
+        if "switch" in edge_in_attr or "switch" in edge_out_attr:
+            return False
+        for attribute in ("phase", "cable", "pole", "rho"):
+            if not edge_in_attr[attribute] == edge_out_attr[attribute]:
+                return False
+        return True
+
+    def merge_path(self, path):
+        """
+        Substitui os trechos do caminho path por um unico trecho, removendo as barras intermediarias.
+        :param path: Lista de barras, da barra a montante ate a barra a jusante
+        :type path: list
+        """
+        edges_attr = [self.graph[edge_from][edge_to] for (edge_from, edge_to) in zip(path, path[1:])]
+        new_attr = {
+            "code": " + ".join(str(edge_attr["code"]) for edge_attr in edges_attr),
+            "length": sum(edge_attr["length"] for edge_attr in edges_attr),
+            "phase": edges_attr[0]["phase"],
+            "cable": edges_attr[0]["cable"],
+            "pole": edges_attr[0]["pole"],
+            "rho": edges_attr[0]["rho"],
+        }
+        self.graph.remove_nodes_from(nodes=path[1:-1])
+        self.graph.add_edge(u_of_edge=path[0], v_of_edge=path[-1], **new_attr)
+
+    def define_area(self, center_bus, lim=100, lim_type="bus"):
+        """
+        Define a area de cobertura em torno de center_bus por busca em largura, nivel a nivel e com as barras de cada
+        nivel em ordem alfabetica, e calcula os equivalentes das partes do alimentador fora da area.
+        :param center_bus: Barra central da area de cobertura
+        :type center_bus: basestring
+        :param lim: Limite da area de cobertura, conforme lim_type
+        :type lim: float
+        :param lim_type: "bus" para o numero de barras da area, "hop" para o numero maximo de trechos entre a barra
+        central e as barras da area e "length" para a distancia maxima em metros, ao longo dos trechos, entre a barra
+        central e as barras da area
+        :type lim_type: basestring
+        """
         self.center_bus = center_bus
-        graph_undirected = nx.to_undirected(graph=self.graph)
-        self.bus_area = []
-        self.bus_area.append(self.center_bus)
-        next_adj = sorted(list(dict(graph_undirected[self.center_bus]).keys()))
-        while True:
-            adj = copy(next_adj)
-            next_adj = []
-            for bus in adj:
-                if bus not in self.bus_area and len(self.bus_area) < lim:
-                    self.bus_area.append(bus)
-                    next_adj.extend(list(dict(graph_undirected[bus]).keys()))
-            next_adj = sorted(list(dict.fromkeys(next_adj)))
-            for bus in self.bus_area:
-                if bus in next_adj:
-                    next_adj.remove(bus)
-            if len(self.bus_area) == lim:
-                break
+        if lim_type == "bus":
+            self.bus_area = self.area_by_bus(center_bus=center_bus, lim=max(int(lim), 1))
+        elif lim_type == "hop":
+            self.bus_area = self.area_by_hop(center_bus=center_bus, lim=int(lim))
+        elif lim_type == "length":
+            self.bus_area = self.area_by_length(center_bus=center_bus, lim=lim)
+        else:
+            raise ValueError("Incorrect coverage limit type '{0}'".format(lim_type))
+        bus_area = set(self.bus_area)
+
         for node in self.graph.nodes():
-            if node in self.bus_area:
+            if node in bus_area:
                 self.graph.nodes[node]["area"] = True
             else:
                 self.graph.nodes[node]["area"] = False
@@ -264,13 +352,13 @@ class Feeder(object):
         self.edge_frontier = []
         for edge in self.graph.edges():
             (node_from, node_to) = edge
-            if node_from in self.bus_area and node_to in self.bus_area:
+            if node_from in bus_area and node_to in bus_area:
                 self.graph[node_from][node_to]["area"] = True
-            elif node_from in self.bus_area:
+            elif node_from in bus_area:
                 self.graph[node_from][node_to]["area"] = False
                 self.bus_frontier.append(node_from)
                 self.edge_frontier.append(edge)
-            elif node_to in self.bus_area:
+            elif node_to in bus_area:
                 self.graph[node_from][node_to]["area"] = False
                 self.bus_frontier.append(node_to)
                 self.edge_frontier.append(edge)
@@ -278,17 +366,77 @@ class Feeder(object):
                 self.graph[node_from][node_to]["area"] = False
 
         self.generate_equivalent_graphs()
-        self.grid_equivalent.generate_trees()
         self.grid_equivalent.generate_equivalents()
 
-    def generate_equivalent_graphs(self):
-        equivalent_graph = copy(self.graph)
-        nodes_to_remove = []
-        for node in equivalent_graph:
-            if equivalent_graph.nodes[node]["area"]:
-                nodes_to_remove.append(node)
+    def area_adjacency(self):
+        """
+        :return: Lista de adjacencia nao direcionada do alimentador, {barra: [(barra adjacente, comprimento)]},
+        calculada apenas uma vez
+        :rtype: dict
+        """
+        if self.adjacency is None:
+            self.adjacency = {bus: [] for bus in self.graph.nodes()}
+            for (node_from, node_to, length) in self.graph.edges(data="length"):
+                self.adjacency[node_from].append((node_to, length))
+                self.adjacency[node_to].append((node_from, length))
+        return self.adjacency
+
+    def area_levels(self, center_bus):
+        """
+        Gera os niveis da busca em largura a partir de center_bus, cada um com as barras em ordem alfabetica.
+        :rtype: generator
+        """
+        adjacency = self.area_adjacency()
+        visited = {center_bus}
+        level = [center_bus]
+        while level:
+            yield level
+            next_level = set()
+            for bus in level:
+                for (adj, _) in adjacency[bus]:
+                    if adj not in visited:
+                        next_level.add(adj)
+            level = sorted(next_level)
+            visited.update(level)
+
+    def area_by_bus(self, center_bus, lim):
+        bus_area = []
+        for level in self.area_levels(center_bus=center_bus):
+            bus_area.extend(level[:lim - len(bus_area)])
+            if len(bus_area) >= lim:
+                break
+        return bus_area
 
-        equivalent_graph.remove_nodes_from(nodes=nodes_to_remove)
+    def area_by_hop(self, center_bus, lim):
+        bus_area = []
+        for (hop, level) in enumerate(self.area_levels(center_bus=center_bus)):
+            if hop > lim:
+                break
+            bus_area.extend(level)
+        return bus_area
+
+    def area_by_length(self, center_bus, lim):
+        adjacency = self.area_adjacency()
+        distance = {center_bus: 0.0}
+        bus_area = []
+        heap = [(0.0, center_bus)]
+        while heap:
+            (bus_distance, bus) = heapq.heappop(heap)
+            if bus_distance > distance[bus]:
+                continue
+            bus_area.append(bus)
+            for (adj, length) in adjacency[bus]:
+                adj_distance = bus_distance + length
+                if adj_distance <= lim and adj_distance < distance.get(adj, float("inf")):
+                    distance[adj] = adj_distance
+                    heapq.heappush(heap, (adj_distance, adj))
+        return bus_area
+
+    def generate_equivalent_graphs(self):
+        # Os atributos das barras e trechos fora da area sao apenas lidos, e por isso nao sao copiados
+        equivalent_graph = self.graph.subgraph(
+            [node for node in self.graph if not self.graph.nodes[node]["area"]]
+        ).copy()
 
         for (n_eq, edge) in enumerate(self.edge_frontier):
             if edge[0] in self.bus_frontier:
@@ -308,7 +456,7 @@ class Feeder(object):
                     **copy(self.graph[edge[0]][edge[1]])
                 )
 
-        equivalents = list(nx.connected_components(nx.to_undirected(copy(equivalent_graph))))
+        equivalents = list(nx.connected_components(equivalent_graph.to_undirected(as_view=True)))
         equivalents = [list(eq) for eq in equivalents]
 
         sorted_equivalents = [[None]] * len(equivalents)
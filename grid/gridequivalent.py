@@ -1,15 +1,11 @@
 from math import sqrt, log10, pi
 
-from copy import deepcopy as copy
-
-from networkx import DiGraph, to_dict_of_lists, incidence_matrix
+import numpy
 
 from numpy import spacing
 
-from scipy.sparse import eye
-from scipy.sparse.linalg import inv
-
 from grid.impedance import Impedance
+from grid.phaseimpedance import PhaseImpedance
 
 
 class GridEquivalent(object):
@@ -17,176 +13,217 @@ class GridEquivalent(object):
 
     def __init__(self, feeder):
         self.feeder = feeder
-        self.equivalent_trees = None
         self.equivalent_values = None
+        self.subtree_index = None
+        self.z_downstream = None
+        self.z_upstream = None
 
     def calc_equivalent_impedances(self):
-        for node in self.feeder.graph.nodes():
-            self.feeder.graph.nodes[node]["z"] = GridEquivalent.calc_lumped_equivalent_bus(
-                bus=self.feeder.graph.nodes[node]
-            )
+        nodes = list(self.feeder.graph.nodes())
+        z_buses = GridEquivalent.calc_lumped_equivalent_buses(
+            buses=[self.feeder.graph.nodes[node] for node in nodes]
+        ).to_dicts()
+        for (node, z_bus) in zip(nodes, z_buses):
+            self.feeder.graph.nodes[node]["z"] = z_bus
+        self.subtree_index = None
 
         for (edge_from, edge_to) in self.feeder.graph.edges():
             self.feeder.graph[edge_from][edge_to]["z"] = GridEquivalent.calc_lumped_equivalent_line(
                 branch=self.feeder.graph[edge_from][edge_to]
             )
 
-    def generate_trees(self):
-        self.equivalent_trees = []
-        for (n_eq, (start_bus, graph)) in enumerate(zip(self.feeder.bus_frontier, self.feeder.equivalent_graphs)):
-            start_bus_eq = "{0} - EQ: {1}".format(start_bus, n_eq)
-            graph_dict = to_dict_of_lists(graph)
-            tree = GridEquivalent.build_tree(bus_code=start_bus_eq, parent_bus_code=start_bus_eq, graph_dict=graph_dict)
-            self.equivalent_trees.append(tree)
-
-    @staticmethod
-    def build_tree(bus_code, parent_bus_code, graph_dict):
-        adj = []
-        for u in graph_dict[bus_code]:
-            if u != parent_bus_code:
-                b = GridEquivalent.build_tree(bus_code=u, parent_bus_code=parent_bus_code, graph_dict=graph_dict)
-                adj.append(b)
-        bus = {"bus": bus_code, "adj": adj}
-        return bus
-
-    def generate_equivalents(self):
-        self.equivalent_values = []
-        for (n, (eq_graph, eq_tree)) in enumerate(zip(self.feeder.equivalent_graphs, self.equivalent_trees)):
-            if self.feeder.main_source_bus not in eq_graph.nodes():
-                z_eq = self.calc_equivalent(bus=eq_tree, eq_graph=eq_graph, start_bus=True)
-                self.equivalent_values.append(z_eq)
-            else:
-                node_list = sorted(eq_graph.nodes())
-                if not node_list[0] == self.feeder.main_source_bus:
-                    source_index = node_list.index(self.feeder.main_source_bus)
-                    node_list[0], node_list[source_index] = node_list[source_index], node_list[0]
-                if not node_list[-1] == eq_tree["bus"]:
-                    bus_index = node_list.index(eq_tree["bus"])
-                    node_list[-1], node_list[bus_index] = node_list[bus_index], node_list[-1]
-
-                edge_list = sorted(list(eq_graph.edges()))
-
-                node_list_phase = []
-                edge_list_phase = []
-                source_phases = ""
-                frontier_phases = ""
-                for edge in edge_list:
-                    phases = copy(eq_graph[edge[0]][edge[1]]["phase"])
-                    if edge[0] == self.feeder.main_source_bus and len(source_phases) < len(phases):
-                        source_phases = phases
-                    if edge[1] == eq_tree["bus"] and len(frontier_phases) < len(phases):
-                        frontier_phases = phases
-                    for phase in phases:
-                        node_name = edge[0] + phase
-                        if node_name not in node_list_phase:
-                            node_list_phase.append(node_name)
-                        node_name = edge[1] + phase
-                        if node_name not in node_list_phase:
-                            node_list_phase.append(node_name)
-                        edge_name = (edge[0] + phase, edge[1] + phase)
-                        edge_list_phase.append(edge_name)
-
-                node_list_phase = sorted(node_list_phase)
-                edge_list_phase = sorted(edge_list_phase)
-
-                phase_eq_graph = DiGraph()
-
-                for node in node_list_phase:
-                    phase_eq_graph.add_node(
-                        node_for_adding=node,
-                        z=eq_graph.nodes[node[:-1]]["z"][node[-1]]
-                    )
-
-                for edge in edge_list_phase:
-                    edge_old_name = (edge[0][:-1], edge[1][:-1])
-                    phase_eq_graph.add_edge(
-                        u_of_edge=edge[0],
-                        v_of_edge=edge[1],
-                        z=eq_graph[edge_old_name[0]][edge_old_name[1]]["z"][edge[0][-1]]
-                    )
-
-                a = incidence_matrix(
-                    G=phase_eq_graph,
-                    nodelist=node_list_phase,
-                    edgelist=edge_list_phase,
-                    oriented=True
-                )
-                a = a[len(source_phases):].transpose().tocsc()
+    def calc_subtree_equivalents(self):
+        """
+        Calcula, uma unica vez, os equivalentes de todos os trechos do alimentador, orientado a partir de
+        main_source_bus, para consulta por generate_equivalents.
+        O equivalente a jusante do trecho que chega a uma barra e a associacao serie do trecho com a reducao da arvore
+        a jusante da barra, calculada das folhas para a raiz. O equivalente a montante e o equivalente de Thevenin visto
+        pela barra atraves desse trecho, com a fonte principal em curto-circuito, calculado da raiz para as folhas
+        (reenraizamento): a impedancia vista pela barra pai, sem a arvore da propria barra, e obtida subtraindo a
+        admitancia dessa arvore da soma das admitancias ligadas a barra pai.
+        """
+        tree = GridEquivalent.build_tree(bus_code=self.feeder.main_source_bus, graph=self.feeder.graph)
+        nodes = tree["nodes"]
+        parent = tree["parent"]
+        depth = tree["depth"]
+        empty = {"A": None, "B": None, "C": None, "N": None}
+
+        z_bus = PhaseImpedance.from_dicts([self.feeder.graph.nodes[bus]["z"] for bus in nodes])
+        z_branch = PhaseImpedance.from_dicts(
+            [empty] + [self.feeder.graph[nodes[parent[n]]][nodes[n]]["z"] for n in range(1, len(nodes))]
+        )
 
-                z = GridEquivalent.generate_primitive_impedance(graph=phase_eq_graph, edge_list=edge_list_phase)
+        # Reducao das arvores a jusante (a impedancia da propria barra faz parte da reducao)
+        z_subtree = PhaseImpedance(z=z_bus.z.copy(), mask=z_bus.mask.copy())
+        GridEquivalent.reduce_levels(
+            z=z_subtree.z, mask=z_subtree.mask, z_branch=z_branch, parent=parent, depth=depth
+        )
+        z_downstream = z_branch.series(z_subtree)
 
-                y = inv(z)
+        # Na rede vista a montante, as fases de uma arvore sem nenhuma impedancia para a terra ficam em aberto
+        z_grounded = PhaseImpedance(z=z_bus.z.copy(), mask=z_bus.mask.copy())
+        GridEquivalent.reduce_levels(
+            z=z_grounded.z, mask=z_grounded.mask, z_branch=z_branch, parent=parent, depth=depth, open_ends=True
+        )
+        z_grounded = PhaseImpedance(z=z_branch.z + z_grounded.z, mask=z_branch.mask & z_grounded.mask)
+
+        # Admitancias ligadas a cada barra, separando as impedancias nulas (curtos-circuitos)
+        (y, shorts, count) = GridEquivalent.admittance_terms(z_bus)
+        (y_down, shorts_down, count_down) = GridEquivalent.admittance_terms(z_grounded)
+        children = numpy.arange(1, len(nodes))
+        numpy.add.at(y, parent[children], y_down[children])
+        numpy.add.at(shorts, parent[children], shorts_down[children])
+        numpy.add.at(count, parent[children], count_down[children])
+        shorts[0] = 1  # A fonte principal e a referencia do equivalente
+        count[0] += 1
+
+        z_upstream = PhaseImpedance.empty(n=len(nodes))
+        order = numpy.argsort(depth, kind="stable")
+        bounds = numpy.searchsorted(depth[order], numpy.arange(int(depth.max()) + 2))
+        for level in range(1, int(depth.max()) + 1):
+            level_nodes = order[bounds[level]:bounds[level + 1]]
+            parents = parent[level_nodes]
+            # Impedancia vista pela barra pai sem a arvore da barra, associada em serie com o trecho
+            level_count = count[parents] - count_down[level_nodes]
+            level_shorts = shorts[parents] - shorts_down[level_nodes]
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                level_y = y[parents] - y_down[level_nodes]
+                z_thevenin = numpy.where((level_shorts > 0) | (level_y == 0), 0.0, 1 / level_y)
+            z_upstream.mask[level_nodes] = z_branch.mask[level_nodes] & (level_count > 0)
+            z_upstream.z[level_nodes] = numpy.where(
+                z_upstream.mask[level_nodes], z_branch.z[level_nodes] + z_thevenin, 0.0
+            )
+            # Equivalente a montante incluido nas admitancias das barras do nivel, para o proximo nivel
+            (y_up, shorts_up, count_up) = GridEquivalent.admittance_terms(z_upstream[level_nodes])
+            y[level_nodes] += y_up
+            shorts[level_nodes] += shorts_up
+            count[level_nodes] += count_up
 
-                y_bus = a.transpose().dot(y.dot(a))
+        self.subtree_index = {bus: n for (n, bus) in enumerate(nodes)}
+        self.z_downstream = z_downstream
+        # A barra de fronteira mantem a sua propria impedancia em paralelo com o equivalente a montante
+        self.z_upstream = z_upstream.parallel(z_bus)
 
-                for (phase, node) in enumerate(node_list_phase[len(source_phases):]):
-                    if phase_eq_graph.nodes[node]["z"] is not None:
-                        y_bus[phase, phase] += (1 / phase_eq_graph.nodes[node]["z"].Z)
+    @staticmethod
+    def admittance_terms(z_phase):
+        """
+        :param z_phase: Impedancias por fase
+        :type z_phase: PhaseImpedance
+        :return: Tupla com as admitancias das impedancias nao nulas, o numero de impedancias nulas e o numero de
+        impedancias presentes, por linha e fase
+        :rtype: tuple
+        """
+        nonzero = z_phase.mask & (z_phase.z != 0)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            y = numpy.where(nonzero, 1 / z_phase.z, 0.0)
+        return (y, (z_phase.mask & ~nonzero).astype(int), z_phase.mask.astype(int))
 
-                z_bus = inv(y_bus.tocsc())
+    @staticmethod
+    def build_tree(bus_code, graph):
+        """
+        Percorre em largura, sem recursao, os ramos que partem da barra bus_code no grafo.
+        :param bus_code: Barra raiz da arvore
+        :type bus_code: basestring
+        :param graph: Grafo orientado a partir da raiz
+        :type graph: networkx.DiGraph
+        :return: Dicionario com a raiz ("bus"), as barras em ordem de visita ("nodes"), o indice da barra pai de cada
+        barra ("parent", -1 para a raiz) e a profundidade de cada barra ("depth")
+        :rtype: dict
+        """
+        nodes = [bus_code]
+        parent = [-1]
+        depth = [0]
+        position = 0
+        while position < len(nodes):
+            for u in graph.successors(nodes[position]):
+                if u != bus_code:
+                    nodes.append(u)
+                    parent.append(position)
+                    depth.append(depth[position] + 1)
+            position += 1
+        return {
+            "bus": bus_code,
+            "nodes": nodes,
+            "parent": numpy.array(parent, dtype=int),
+            "depth": numpy.array(depth, dtype=int)
+        }
 
-                z_eq = {
-                    "A": None,
-                    "B": None,
-                    "C": None,
-                    "N": None
-                }
-                for (n_phase, phase) in enumerate(frontier_phases):
-                    p = len(frontier_phases) - n_phase
-                    z_eq[phase] = Impedance(Z=z_bus[-p, -p])
-                self.equivalent_values.append(z_eq)
+    def generate_equivalents(self):
+        """
+        Consulta os equivalentes calculados por calc_subtree_equivalents para cada trecho de fronteira da area de
+        cobertura: o equivalente a jusante quando a area esta a montante do trecho e o equivalente a montante, nas fases
+        do trecho, quando a area esta a jusante.
+        """
+        if self.subtree_index is None:
+            self.calc_subtree_equivalents()
+        self.equivalent_values = []
+        for (bus_frontier, (edge_from, edge_to)) in zip(self.feeder.bus_frontier, self.feeder.edge_frontier):
+            row = self.subtree_index[edge_to]
+            if bus_frontier == edge_from:
+                z_eq = self.z_downstream[row:row + 1].to_dicts()[0]
+            else:
+                z_eq = self.z_upstream[row:row + 1].to_dicts()[0]
+                phases = self.feeder.graph[edge_from][edge_to]["phase"]
+                z_eq = {phase: (z if phase in phases else None) for (phase, z) in z_eq.items()}
+            self.equivalent_values.append(z_eq)
         self.feeder.equivalent_values = self.equivalent_values
 
     @staticmethod
-    def generate_primitive_impedance(graph, edge_list):
-        z = eye(m=len(edge_list), n=len(edge_list), dtype=complex).tocsc()
-        for (i, edge) in enumerate(edge_list):
-            z[i, i] = graph[edge[0]][edge[1]]["z"].Z
-        return z
-
-    def calc_equivalent(self, bus, eq_graph, start_bus=False):
-        if start_bus:
-            bus["zeq"] = {"A": None, "B": None, "C": None, "N": None}
-        else:
-            bus["zeq"] = copy(eq_graph.nodes[bus["bus"]]["z"])
-        if len(bus["adj"]) != 0:
-            equivalent = []
-
-            for bus_next in bus["adj"]:
-                z_branch = eq_graph[bus["bus"]][bus_next["bus"]]["z"]
-                bus_next["zeq"] = self.calc_equivalent(bus=bus_next, eq_graph=eq_graph)
-                equivalent.append(GridEquivalent.series(z_branch, bus_next["zeq"]))
-
-            equivalent.append(bus["zeq"])
-            bus["zeq"] = equivalent[0]
-            for eq in equivalent[1:]:
-                bus["zeq"] = GridEquivalent.parallel(z1=bus["zeq"], z2=eq)
-
-        return bus["zeq"]
+    def reduce_levels(z, mask, z_branch, parent, depth, open_ends=False):
+        """
+        Reduz uma arvore das folhas para a raiz, alterando z e mask: ao final, cada linha contem a impedancia da barra
+        em paralelo com os ramos a jusante dela. Em cada nivel, os ramos de todas as barras do nivel sao associados em
+        serie com os seus equivalentes e, em seguida, em paralelo com os equivalentes das barras pai, de uma so vez.
+        :param z: Impedancias das barras, na ordem de visita de build_tree
+        :type z: numpy.ndarray
+        :param mask: Mascara das fases presentes em z
+        :type mask: numpy.ndarray
+        :param z_branch: Impedancia do ramo que chega a cada barra
+        :type z_branch: PhaseImpedance
+        :param parent: Indice da barra pai de cada barra
+        :type parent: numpy.ndarray
+        :param depth: Profundidade de cada barra
+        :type depth: numpy.ndarray
+        :param open_ends: Se True, a fase de um ramo cuja barra nao possui impedancia nessa fase, nem a jusante, e
+        desconsiderada (circuito aberto) em vez de associada em serie com o equivalente ausente
+        :type open_ends: bool
+        """
+        # Barras agrupadas por nivel, das folhas para a raiz
+        order = numpy.argsort(depth, kind="stable")
+        bounds = numpy.searchsorted(depth[order], numpy.arange(int(depth.max()) + 2))
+        for level in range(int(depth.max()), 0, -1):
+            children = order[bounds[level]:bounds[level + 1]]
+            parents = parent[children]
+            # As fases ausentes valem zero, de modo que a soma ja e a associacao serie
+            if open_ends:
+                mask_children = z_branch.mask[children] & mask[children]
+                z_children = numpy.where(mask_children, z_branch.z[children] + z[children], 0.0)
+            else:
+                z_children = z_branch.z[children] + z[children]
+                mask_children = z_branch.mask[children] | mask[children]
+            if len(children) == 1 or len(numpy.unique(parents)) == len(parents):  # Um unico ramo por barra pai
+                (z[parents], mask[parents]) = PhaseImpedance.parallel_values(
+                    z1=z_children, mask1=mask_children, z2=z[parents], mask2=mask[parents]
+                )
+            else:
+                (parents, groups) = numpy.unique(parents, return_inverse=True)
+                z_parents = PhaseImpedance(
+                    z=numpy.concatenate([z_children, z[parents]]),
+                    mask=numpy.concatenate([mask_children, mask[parents]])
+                ).parallel_reduce(
+                    groups=numpy.concatenate([groups, numpy.arange(len(parents))]),
+                    n_groups=len(parents)
+                )
+                z[parents] = z_parents.z
+                mask[parents] = z_parents.mask
 
     @staticmethod
     def series(z1, z2):
-        result = {"A": None, "B": None, "C": None, "N": None}
-        for phase in "ABCN":
-            if z1[phase] is None:
-                result[phase] = z2[phase]
-            elif z2[phase] is None:
-                result[phase] = z1[phase]
-            else:
-                result[phase] = z1[phase] + z2[phase]
-        return result
+        return PhaseImpedance.from_dicts([z1]).series(PhaseImpedance.from_dicts([z2])).to_dicts()[0]
 
     @staticmethod
     def parallel(z1, z2):
-        result = {"A": None, "B": None, "C": None, "N": None}
-        for phase in "ABCN":
-            if z1[phase] is None:
-                result[phase] = z2[phase]
-            elif z2[phase] is None:
-                result[phase] = z1[phase]
-            else:
-                result[phase] = z1[phase] // z2[phase]
-        return result
+        return PhaseImpedance.from_dicts([z1]).parallel(PhaseImpedance.from_dicts([z2])).to_dicts()[0]
 
     @staticmethod
     def calc_inductance_line(height_struct, sag, length, rmg, dist_horiz):
@@ -273,54 +310,43 @@ class GridEquivalent(object):
 
     @staticmethod
     def calc_lumped_equivalent_bus(bus):
-        if "load" in bus:
-            load_dict = bus["load"]
-        else:
-            load_dict = {}
-        if "capacitor" in bus:
-            capacitor_dict = bus["capacitor"]
-        else:
-            capacitor_dict = {}
+        return GridEquivalent.calc_lumped_equivalent_buses(buses=[bus]).to_dicts()[0]
 
-        z_eq = {
-            "A": None,
-            "B": None,
-            "C": None,
-            "N": None
-        }
-
-        for (code, load) in load_dict.items():
-            resistance = [
-                load["ra"],
-                load["rb"],
-                load["rc"]
-            ]
-
-            inductance = [
-                load["la"],
-                load["lb"],
-                load["lc"]
-            ]
-
-            for (phase, R, L) in zip("ABC", resistance, inductance):
-                if phase in load["phase"]:
-                    if z_eq[phase] is None:
-                        z_eq[phase] = Impedance(R=R, L=L)
-                    else:
-                        z_eq[phase] = z_eq[phase] // Impedance(R=R, L=L)
-
-        for (code, capacitor) in capacitor_dict.items():
-            capacitance = [
-                capacitor["ca"],
-                capacitor["cb"],
-                capacitor["cc"]
-            ]
-
-            for (phase, C) in zip("ABC", capacitance):
-                if phase in capacitor["phase"]:
-                    if z_eq[phase] is None:
-                        z_eq[phase] = Impedance(R=0.0, C=C)
-                    else:
-                        z_eq[phase] = z_eq[phase] // Impedance(R=0.0, C=C)
+    @staticmethod
+    def calc_lumped_equivalent_buses(buses):
+        """
+        Calcula a impedancia equivalente, por fase, das cargas e capacitores de cada barra, associados em paralelo.
+        :param buses: Lista de atributos das barras do grafo do alimentador
+        :type buses: list
+        :return: Uma linha por barra (fases sem cargas nem capacitores ficam ausentes)
+        :rtype: PhaseImpedance
+        """
+        # Uma linha por carga ou capacitor, com o indice da barra a que pertence
+        load_rows = []
+        capacitor_rows = []
+        for (n_bus, bus) in enumerate(buses):
+            for load in bus.get("load", {}).values():
+                load_rows.append((n_bus, load["phase"], [load["ra"], load["rb"], load["rc"], 0.0],
+                                  [load["la"], load["lb"], load["lc"], 0.0]))
+            for capacitor in bus.get("capacitor", {}).values():
+                capacitor_rows.append(
+                    (n_bus, capacitor["phase"], [capacitor["ca"], capacitor["cb"], capacitor["cc"], 1.0])
+                )
 
-        return z_eq
+        groups = [row[0] for row in load_rows + capacitor_rows]
+        mask = [[phase in row[1] for phase in "ABC"] + [False] for row in load_rows + capacitor_rows]
+        z_loads = PhaseImpedance.from_rl(
+            R=numpy.array([row[2] for row in load_rows], dtype=float).reshape(-1, 4),
+            L=numpy.array([row[3] for row in load_rows], dtype=float).reshape(-1, 4),
+            mask=numpy.array(mask[:len(load_rows)], dtype=bool).reshape(-1, 4)
+        )
+        z_capacitors = PhaseImpedance.from_rc(
+            R=numpy.zeros((len(capacitor_rows), 4)),
+            C=numpy.array([row[2] for row in capacitor_rows], dtype=float).reshape(-1, 4),
+            mask=numpy.array(mask[len(load_rows):], dtype=bool).reshape(-1, 4)
+        )
+        z_elements = PhaseImpedance(
+            z=numpy.concatenate([z_loads.z, z_capacitors.z]),
+            mask=numpy.concatenate([z_loads.mask, z_capacitors.mask])
+        )
+        return z_elements.parallel_reduce(groups=groups, n_groups=len(buses))
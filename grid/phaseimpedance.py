@@ -0,0 +1,153 @@
+from math import pi
+
+import numpy
+
+from grid.impedance import Impedance
+
+
+class PhaseImpedance(object):
+    """
+    Classe responsavel pela representacao vetorizada das impedancias por fase (A, B, C e N) de um conjunto de barras ou
+    ramos, com os valores complexos em um array (n x 4) e uma mascara (n x 4) que indica as fases presentes.
+    As associacoes serie e paralelo sao calculadas para todas as linhas e fases de uma so vez, seguindo as regras de
+    GridEquivalent.series e GridEquivalent.parallel: uma fase ausente em um dos operandos resulta no outro operando e a
+    associacao em paralelo com uma impedancia nula resulta em uma impedancia nula.
+    Exemplo:
+    >> z_bus = PhaseImpedance.from_dicts([{"A": Impedance(R=1, L=1e-3), "B": None, "C": None, "N": None}])
+    >> z_eq = z_line.series(z_bus).parallel(z_load)
+    >> z_eq.to_dicts()
+    """
+    phases = "ABCN"
+
+    def __init__(self, z, mask, f=60):
+        """
+        Metodo Construtor da Classe.
+        :param z: Impedancias complexas em Ohm, com uma coluna por fase
+        :type z: numpy.ndarray
+        :param mask: Mascara das fases presentes, com o mesmo formato de z
+        :type mask: numpy.ndarray
+        :param f: Frequencia em Hz
+        :type f: float
+        """
+        self.mask = numpy.array(mask, dtype=bool)
+        self.z = numpy.where(self.mask, numpy.asarray(z, dtype=complex), 0.0)
+        self.f = f
+
+    @staticmethod
+    def empty(n, f=60):
+        return PhaseImpedance(
+            z=numpy.zeros((n, len(PhaseImpedance.phases)), dtype=complex),
+            mask=numpy.zeros((n, len(PhaseImpedance.phases)), dtype=bool),
+            f=f
+        )
+
+    @staticmethod
+    def from_dicts(z_dicts, f=60):
+        """
+        :param z_dicts: Lista de dicionarios {fase: Impedance ou None}
+        :type z_dicts: list
+        :rtype: PhaseImpedance
+        """
+        result = PhaseImpedance.empty(n=len(z_dicts), f=f)
+        for (row, z_dict) in enumerate(z_dicts):
+            for (column, phase) in enumerate(PhaseImpedance.phases):
+                if z_dict[phase] is not None:
+                    result.z[row, column] = z_dict[phase].Z
+                    result.mask[row, column] = True
+        return result
+
+    @staticmethod
+    def from_rl(R, L, mask, f=60):
+        """
+        :param R: Resistencias em Ohm (n x 4)
+        :param L: Indutancias em H (n x 4)
+        :rtype: PhaseImpedance
+        """
+        return PhaseImpedance(z=numpy.asarray(R) + 1j * (2 * pi * f * numpy.asarray(L, dtype=float)), mask=mask, f=f)
+
+    @staticmethod
+    def from_rc(R, C, mask, f=60):
+        """
+        :param R: Resistencias em Ohm (n x 4)
+        :param C: Capacitancias em F (n x 4)
+        :rtype: PhaseImpedance
+        """
+        with numpy.errstate(divide="ignore"):
+            X = - 1 / (2 * pi * f * numpy.asarray(C, dtype=float))
+        return PhaseImpedance(z=numpy.asarray(R) + 1j * X, mask=mask, f=f)
+
+    def to_dicts(self):
+        """
+        :return: Lista de dicionarios {fase: Impedance ou None}, um para cada linha
+        :rtype: list
+        """
+        return [
+            {
+                phase: Impedance(Z=complex(z), f=self.f) if present else None
+                for (phase, z, present) in zip(PhaseImpedance.phases, z_row, mask_row)
+            }
+            for (z_row, mask_row) in zip(self.z, self.mask)
+        ]
+
+    def __len__(self):
+        return self.z.shape[0]
+
+    def __getitem__(self, rows):
+        return PhaseImpedance(z=self.z[rows], mask=self.mask[rows], f=self.f)
+
+    def series(self, other):
+        """
+        :return: Associacao serie, linha a linha e fase a fase, de self e other
+        :rtype: PhaseImpedance
+        """
+        # As fases ausentes valem zero, de modo que a soma ja e a associacao serie
+        return PhaseImpedance(z=self.z + other.z, mask=self.mask | other.mask, f=self.f)
+
+    def parallel(self, other):
+        """
+        :return: Associacao paralelo, linha a linha e fase a fase, de self e other
+        :rtype: PhaseImpedance
+        """
+        (z, mask) = PhaseImpedance.parallel_values(z1=self.z, mask1=self.mask, z2=other.z, mask2=other.mask)
+        return PhaseImpedance(z=z, mask=mask, f=self.f)
+
+    @staticmethod
+    def parallel_values(z1, mask1, z2, mask2):
+        """
+        Associacao paralelo sobre os arrays de impedancias e mascaras, sem a criacao de objetos intermediarios.
+        :return: Tupla (z, mask)
+        :rtype: tuple
+        """
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            y = 1 / z1 + 1 / z2
+            z_parallel = 1 / y
+        z_parallel[(z1 == 0) | (z2 == 0) | (y == 0)] = 0.0
+        both = mask1 & mask2
+        z = numpy.where(both, z_parallel, z1 + z2)  # Com uma fase ausente (nula), a soma e o outro operando
+        return (z, mask1 | mask2)
+
+    def parallel_reduce(self, groups, n_groups):
+        """
+        Associa em paralelo as linhas de cada grupo, somando as admitancias de uma so vez.
+        :param groups: Indice do grupo de cada linha
+        :type groups: numpy.ndarray
+        :param n_groups: Numero de grupos
+        :type n_groups: int
+        :return: Uma linha por grupo (fases ausentes em todas as linhas do grupo continuam ausentes)
+        :rtype: PhaseImpedance
+        """
+        groups = numpy.asarray(groups, dtype=int)
+        shape = (n_groups, len(PhaseImpedance.phases))
+        y = numpy.zeros(shape, dtype=complex)
+        z_single = numpy.zeros(shape, dtype=complex)
+        count = numpy.zeros(shape, dtype=int)
+        short = numpy.zeros(shape, dtype=bool)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            numpy.add.at(y, groups, numpy.where(self.mask & (self.z != 0), 1 / self.z, 0.0))
+            numpy.add.at(z_single, groups, self.z)
+            numpy.add.at(count, groups, self.mask.astype(int))
+            numpy.logical_or.at(short, groups, self.mask & (self.z == 0))
+            z = 1 / y
+        z = numpy.where(short | (y == 0), 0.0, z)
+        z = numpy.where(count == 1, z_single, z)  # Uma unica impedancia no grupo e mantida sem arredondamentos
+        return PhaseImpedance(z=z, mask=count > 0, f=self.f)
@@ -1,5 +1,4 @@
 import json
-import pickle
 import warnings
 
 from sys import argv
@@ -16,6 +15,10 @@ from input.input_dict import define_input_dict as define_input_dict_json
 from grid.feeder import Feeder
 from atp.casegenerator import CaseGenerator
 from atp.executor import ATPExecutor
+from atp.runner import ATPJob, ATPRunner
+from atp.result.export import ResultExporter
+from atp.cache.lcccache import LCCCache
+from atp.cache.casefingerprint import CaseFingerprint
 from exceptions.exceptions import *
 
 
@@ -156,6 +159,12 @@ def main():
             print(excep.errors)
             exit()
 
+        if args.print and feeder.removed_edges:
+            print("Switches opened to remove cycles: " + ", ".join(
+                "{0} - {1}".format(edge_from, edge_to) for (edge_from, edge_to) in feeder.removed_edges
+            ))
+            print()
+
         fig_base = feeder.electric_diagram.base_figure
 
         if args.out:
@@ -204,6 +213,10 @@ def main():
         else:
             sim_directory = str(output_path)
 
+        if args.incremental and use_temp_directory:
+            # The files of the previous run are needed in the temporary directory to be reused
+            copytree(src=output_path, dst=sim_directory, dirs_exist_ok=True)
+
         if args.print:
             print("Output directory created successfully!")
             print()
@@ -213,7 +226,7 @@ def main():
                 print("Coverage area central bus defined as: " + args.bus)
                 print()
             if args.bus in feeder.graph.nodes():
-                feeder.define_area(center_bus=args.bus, lim=args.cov)
+                feeder.define_area(center_bus=args.bus, lim=args.cov, lim_type=args.covtype)
             else:
                 try:
                     raise BusNotFoundError(
@@ -226,26 +239,99 @@ def main():
                     print(excep.errors)
                     exit()
         else:
-            feeder.define_area(center_bus=feeder.main_source_bus, lim=args.cov)
+            feeder.define_area(center_bus=feeder.main_source_bus, lim=args.cov, lim_type=args.covtype)
         feeder.electric_diagram.generate_area_figure()
         fig_area = feeder.electric_diagram.area_figure
 
-        case = CaseGenerator(feeder=feeder)
+        if args.nocache:
+            lcc_cache = None
+        else:
+            lcc_cache = LCCCache(
+                cache_path=config.parser["cache"]["lcc_cache_path"],
+                max_size=float(config.parser["cache"]["lcc_cache_size"]) * 1024 ** 2
+            )
+
+        if args.incremental:
+            fingerprint = CaseFingerprint(simulation_path=sim_directory)
+            fingerprint.fingerprint_input(
+                feeder_dict=feeder_dict,
+                options={
+                    "bus": args.bus,
+                    "cov": args.cov,
+                    "covtype": args.covtype,
+                    "limit": args.limit,
+                    "line": args.line,
+                    "template": args.template,
+                    "constant": args.constant,
+                    "step": args.step,
+                    "tmax": args.tmax,
+                    "sweep": [args.amp, args.tfront, args.tau] if args.sweep else None
+                },
+                result_options={
+                    "export": args.export,
+                    "compress": args.compress
+                }
+            )
+            if args.print:
+                print("Changed input sections: " + (", ".join(fingerprint.changed_sections()) or "none"))
+                print("Changed options: " + (", ".join(fingerprint.changed_options()) or "none"))
+                print()
+        else:
+            fingerprint = None
+
+        case = CaseGenerator(feeder=feeder, lcc_cache=lcc_cache, fingerprint=fingerprint)
 
         if args.print:
             print("Generating feeder ATP Cases...")
             print()
 
-        case.generate_card(
-            simulation_path=sim_directory,
-            execution_cmd=execution_cmd,
-            deltat=args.step,
-            tmax=args.tmax
-        )
+        try:
+            case.generate_card(
+                simulation_path=sim_directory,
+                execution_cmd=execution_cmd,
+                deltat=args.step,
+                tmax=args.tmax,
+                jobs=args.jobs,
+                per_unit_template=args.template,
+                jmarti=not args.constant,
+                check_template=args.verify,
+                timeout=args.timeout,
+                retries=args.retries
+            )
+        except (ATPExecutionError, LineTemplateError, NodeCapacityError) as excep:
+            print("An error occurred!")
+            print(excep)
+            print(excep.errors)
+            exit()
 
         if args.print:
             print("Feeder ATP Cases generated successfully!")
             print()
+            if lcc_cache is not None:
+                print("Line constants cache: {0} hits, {1} misses".format(lcc_cache.hits, lcc_cache.misses))
+                print()
+
+        if args.sweep:
+            if args.print:
+                print("Generating surge sweep ATP Cases...")
+                print()
+
+            sweep_manifest = case.generate_sweep(
+                simulation_path=sim_directory,
+                amps=args.amp,
+                tfronts=args.tfront,
+                taus=args.tau
+            )
+
+            if args.print:
+                print("{0} surge sweep ATP Cases generated successfully!".format(len(sweep_manifest)))
+                print()
+
+        if fingerprint is not None:
+            fingerprint.save()
+            if args.print:
+                print("Rewritten ATP Cases: " + (", ".join(sorted(fingerprint.changed_cards)) or "none"))
+                print()
 
         dict_bus = {}
         for bus in case.bus:
@@ -259,16 +345,40 @@ def main():
                 print("Executing ATP base feeder file...")
                 print()
 
-            ATPExecutor.execute_atp(
-                folder_path=sim_directory,
-                atp_filename="base_feeder",
-                execution_cmd=execution_cmd
+            result_unchanged = fingerprint is not None and fingerprint.result_unchanged(
+                card_name="base_feeder",
+                result_filename=join(sim_directory, "base_feeder_output" + ResultExporter.extensions[args.export])
             )
 
-            output = ATPExecutor.read_pl4(pl4_file=join(sim_directory, "base_feeder.pl4"))
+            if not result_unchanged:
+                try:
+                    ATPExecutor.execute_atp(
+                        folder_path=sim_directory,
+                        atp_filename="base_feeder",
+                        execution_cmd=execution_cmd,
+                        timeout=args.timeout,
+                        retries=args.retries
+                    )
+                except ATPExecutionError as excep:
+                    print("An error occurred!")
+                    print(excep)
+                    print(excep.errors)
+                    exit()
+
+                output = ATPExecutor.read_pl4(pl4_file=join(sim_directory, "base_feeder.pl4"))
+
+                ResultExporter.export(
+                    output=output,
+                    path=join(sim_directory, "base_feeder_output"),
+                    export_format=args.export,
+                    compress=args.compress
+                )
 
-            with open(join(sim_directory, "base_feeder_output.pckl"), "wb") as output_pckl:
-                pickle.dump(output, output_pckl)
+                # The channels are views on the memory mapped .pl4 file, which stays open while they are referenced
+                del output
+
+                if fingerprint is not None:
+                    fingerprint.record_result(card_name="base_feeder")
 
             if args.print:
                 print("ATP base feeder file executed successfully!")
@@ -276,21 +386,105 @@ def main():
                 print("Executing ATP surge feeder file...")
                 print()
 
-            ATPExecutor.execute_atp(
-                folder_path=sim_directory,
-                atp_filename="surge_feeder",
-                execution_cmd=execution_cmd
+            result_unchanged = fingerprint is not None and fingerprint.result_unchanged(
+                card_name="surge_feeder",
+                result_filename=join(sim_directory, "surge_feeder_output" + ResultExporter.extensions[args.export])
             )
 
-            output = ATPExecutor.read_pl4(pl4_file=join(sim_directory, "surge_feeder.pl4"))
+            if not result_unchanged:
+                try:
+                    ATPExecutor.execute_atp(
+                        folder_path=sim_directory,
+                        atp_filename="surge_feeder",
+                        execution_cmd=execution_cmd,
+                        timeout=args.timeout,
+                        retries=args.retries
+                    )
+                except ATPExecutionError as excep:
+                    print("An error occurred!")
+                    print(excep)
+                    print(excep.errors)
+                    exit()
+
+                output = ATPExecutor.read_pl4(pl4_file=join(sim_directory, "surge_feeder.pl4"))
+
+                ResultExporter.export(
+                    output=output,
+                    path=join(sim_directory, "surge_feeder_output"),
+                    export_format=args.export,
+                    compress=args.compress
+                )
+
+                del output
 
-            with open(join(sim_directory, "surge_feeder_output.pckl"), "wb") as output_pckl:
-                pickle.dump(output, output_pckl)
+                if fingerprint is not None:
+                    fingerprint.record_result(card_name="surge_feeder")
 
             if args.print:
                 print("ATP surge feeder file executed successfully!")
                 print()
 
+            if args.sweep:
+                if args.print:
+                    print("Executing ATP surge sweep files...")
+                    print()
+
+                sweep_jobs = [
+                    ATPExecutor.atp_job(
+                        folder_path=join(sim_directory, "sweep", sweep_case["case"]),
+                        atp_filename="surge_feeder",
+                        name=sweep_case["case"]
+                    )
+                    for sweep_case in sweep_manifest
+                ]
+
+                sweep_run = []
+                for (sweep_case, sweep_job) in zip(sweep_manifest, sweep_jobs):
+                    result_unchanged = fingerprint is not None and fingerprint.result_unchanged(
+                        card_name="sweep/" + sweep_case["case"] + "/surge_feeder",
+                        result_filename=join(sweep_job.cwd, "surge_feeder_output" + ResultExporter.extensions[args.export])
+                    )
+                    if result_unchanged:
+                        sweep_job.status = ATPJob.OK
+                    else:
+                        sweep_run.append(sweep_job)
+
+                ATPExecutor.execute_atp_pool(
+                    job_list=sweep_run,
+                    execution_cmd=execution_cmd,
+                    jobs=args.jobs,
+                    timeout=args.timeout,
+                    retries=args.retries
+                )
+
+                for (sweep_case, sweep_job) in zip(sweep_manifest, sweep_jobs):
+                    sweep_case.update(sweep_job.to_dict())
+                    sweep_case["filename"] = join("sweep", sweep_case["case"], "surge_feeder.atp")
+                    if sweep_job.done and sweep_job.attempts > 0:
+                        output = ATPExecutor.read_pl4(pl4_file=sweep_job.outputs[0])
+                        ResultExporter.export(
+                            output=output,
+                            path=join(sim_directory, "sweep", sweep_case["case"], "surge_feeder_output"),
+                            export_format=args.export,
+                            compress=args.compress
+                        )
+                        del output
+                        if fingerprint is not None:
+                            fingerprint.record_result(card_name="sweep/" + sweep_case["case"] + "/surge_feeder")
+
+                with open(join(sim_directory, "sweep", "manifest.json"), "w") as manifest_file:
+                    json.dump(obj=sweep_manifest, fp=manifest_file, indent=4)
+
+                if args.print:
+                    sweep_status = ATPRunner.summary(job_list=sweep_jobs)
+                    print("ATP surge sweep files executed: " + ", ".join(
+                        "{0} {1}".format(n, status) for (status, n) in sorted(sweep_status.items())
+                    ))
+                    print()
+
+            if fingerprint is not None:
+                fingerprint.save()
+
         if args.graph:
             if args.print:
                 print("Generating feeder figures...")
@@ -0,0 +1,61 @@
+"""
+Substituto do ATP para os testes: recebe o arquivo .dat de uma rotina LINE CONSTANTS e escreve, ao lado dele, um arquivo
+.pch fixo, derivado apenas do conteudo do .dat (mesma entrada, mesma saida).
+Se a variavel de ambiente STUB_ATP_LOG estiver definida, cada execucao acrescenta a esse arquivo uma linha JSON com o
+arquivo de entrada, o diretorio de trabalho e os instantes de inicio e fim da execucao.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+
+def punch(dat_text):
+    linhas = dat_text.splitlines()
+    branch = [linha for linha in linhas if linha.startswith("BRANCH")][0]
+    fases = re.findall(r"IN___(.)OUT__", branch)
+    fim_condutores = linhas.index("BLANK CARD ENDING CONDUCTOR CARDS")
+    dist = float(linhas[fim_condutores + 1][44:52])
+    semente = int(hashlib.sha1("".join(linhas[:fim_condutores + 1]).encode()).hexdigest()[:6], 16) % 1000
+
+    pch = [
+        "C  <++++++>  Cards punched by support routine on  stub-date  <++++++>\n",
+        "C " + linhas[1] + "\n"
+    ]
+    if "JMARTI SETUP" in dat_text:
+        for (n, fase) in enumerate(fases):
+            pch.append("-%dIN___%sOUT__%s   2.  0.00   -2  %d\n" % (n + 1, fase, fase, len(fases)))
+            pch.append("  27\n")
+            pch.append("  %.10E  %.10E\n" % (1.0 + semente / 1e3 + n, dist ** 0.5))
+            pch.append("  %.10E\n" % (dist * 3.3e-6))
+    else:
+        pch.append("$VINTAGE, 1\n")
+        for (n, fase) in enumerate(fases):
+            pch.append("-%dIN___%sOUT__%s            %16.8E%16.8E%16.8E%9.2E 1 0\n" % (
+                n + 1, fase, fase, 0.1 + semente / 1e4 + n, 300.0 + n, 2.9e5, dist
+            ))
+        pch.append("$VINTAGE, 0\n")
+        for _ in fases:
+            pch.append("  0.57735027  0.00000000 -0.70710678  0.00000000\n")
+    return "".join(pch)
+
+
+def main():
+    inicio = time.time()
+    dat_file = sys.argv[-1]
+    with open(dat_file) as arquivo:
+        pch = punch(arquivo.read())
+    time.sleep(float(os.environ.get("STUB_ATP_DELAY", "0")))
+    with open(os.path.splitext(dat_file)[0] + ".pch", "w") as arquivo:
+        arquivo.write(pch)
+
+    if os.environ.get("STUB_ATP_LOG"):
+        registro = {"input": os.path.abspath(dat_file), "cwd": os.getcwd(), "start": inicio, "end": time.time()}
+        with open(os.environ["STUB_ATP_LOG"], "a") as log:
+            log.write(json.dumps(registro) + "\n")
+
+
+if __name__ == "__main__":
+    main()
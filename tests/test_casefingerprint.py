@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from atp.cache.casefingerprint import CaseFingerprint
+
+
+class CaseFingerprintTest(unittest.TestCase):
+    """
+    Verifica o reaproveitamento dos resultados exportados entre duas execucoes incrementais.
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix="atp_fingerprint_")
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+        self.card = join(self.path, "base_feeder.atp")
+        self.result = join(self.path, "base_feeder_output.npz")
+        for filename in (self.card, self.result):
+            with open(filename, "w") as arquivo:
+                arquivo.write("")
+
+    def run_case(self, options, result_options):
+        """
+        Simula uma execucao com o mesmo cartao e retorna se os resultados anteriores puderam ser reaproveitados.
+        """
+        fingerprint = CaseFingerprint(simulation_path=self.path)
+        fingerprint.fingerprint_input(feeder_dict={}, options=options, result_options=result_options)
+        fingerprint.card_unchanged(card_name="base_feeder", cartao="BEGIN NEW DATA CASE", complete_filename=self.card)
+        unchanged = fingerprint.result_unchanged(card_name="base_feeder", result_filename=self.result)
+        if not unchanged:
+            fingerprint.record_result(card_name="base_feeder")
+        fingerprint.save()
+        return unchanged, fingerprint.changed_options()
+
+    def test_same_options_reuse_results(self):
+        self.run_case(options={"step": 1e-8}, result_options={"export": "npz", "compress": False})
+        self.assertEqual(
+            (True, []),
+            self.run_case(options={"step": 1e-8}, result_options={"export": "npz", "compress": False})
+        )
+
+    def test_export_options_invalidate_results(self):
+        self.run_case(options={"step": 1e-8}, result_options={"export": "npz", "compress": False})
+        self.assertEqual(
+            (False, ["compress"]),
+            self.run_case(options={"step": 1e-8}, result_options={"export": "npz", "compress": True})
+        )
+        self.assertEqual(
+            (False, ["export"]),
+            self.run_case(options={"step": 1e-8}, result_options={"export": "pckl", "compress": True})
+        )
+        self.assertEqual(
+            (True, []),
+            self.run_case(options={"step": 1e-8}, result_options={"export": "pckl", "compress": True})
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
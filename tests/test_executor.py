@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from os.path import abspath, dirname, join
+from unittest import mock
+
+from atp.casegenerator import CaseGenerator
+from grid.feeder import Feeder
+from input.input_dict import define_input_dict
+
+ROOT = dirname(dirname(abspath(__file__)))
+STUB_ATP = [sys.executable, join(ROOT, "tests", "stub_atp.py")]
+
+
+class LCCPoolTest(unittest.TestCase):
+    """
+    Executa as rotinas LINE CONSTANTS do exemplo IEEE 34 com o substituto do ATP (tests/stub_atp.py), em serie e com
+    varias execucoes simultaneas.
+    """
+    JOBS = 4
+
+    @classmethod
+    def setUpClass(cls):
+        with open(join(ROOT, "examples", "ieee34", "ieee34.json")) as arquivo:
+            feeder_dict = define_input_dict(arquivo)
+        cls.feeder = Feeder(feeder_dict=feeder_dict)
+        cls.feeder.define_area(center_bus="830", lim=20)
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix="atp_pool_")
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+
+    def generate_line(self, jobs, **kwargs):
+        """
+        Gera as linhas sempre no mesmo diretorio, ja que o caminho dos arquivos .lib faz parte dos cartoes, e retorna os
+        cartoes, os arquivos gerados e o registro das execucoes do ATP.
+        """
+        simulation_path = join(self.path, "case")
+        shutil.rmtree(simulation_path, ignore_errors=True)
+        os.makedirs(simulation_path)
+        log = join(self.path, "stub_atp.log")
+        if os.path.exists(log):
+            os.remove(log)
+        with mock.patch.dict(os.environ, {"STUB_ATP_LOG": log, "STUB_ATP_DELAY": "0.05"}):
+            case = CaseGenerator(feeder=self.feeder)
+            case.generate_bus()
+            case.generate_line(simulation_path=simulation_path, execution_cmd=STUB_ATP, jobs=jobs, **kwargs)
+        with open(log) as arquivo:
+            runs = [json.loads(linha) for linha in arquivo]
+        return [lcc.branch for lcc in case.line], self.read_files(simulation_path), runs
+
+    @staticmethod
+    def read_files(path):
+        files = {}
+        for filename in sorted(os.listdir(path)):
+            with open(join(path, filename), "rb") as arquivo:
+                files[filename] = arquivo.read()
+        return files
+
+    def assertSameOutput(self, **kwargs):
+        (branch_serial, files_serial, runs_serial) = self.generate_line(jobs=1, **kwargs)
+        (branch_pool, files_pool, runs_pool) = self.generate_line(jobs=self.JOBS, **kwargs)
+
+        self.assertGreater(len(runs_serial), 1)
+        self.assertEqual(len(runs_serial), len(runs_pool))
+        self.assertEqual(files_serial, files_pool)
+        self.assertEqual(branch_serial, branch_pool)
+        return runs_pool
+
+    def test_pool_output_matches_serial(self):
+        self.assertSameOutput()
+
+    def test_pool_output_matches_serial_with_templates(self):
+        self.assertSameOutput(per_unit_template=True, jmarti=False)
+
+    def test_pool_uses_one_scratch_directory_per_job(self):
+        runs = self.assertSameOutput()
+        simulation_path = join(self.path, "case")
+
+        scratch = [run["cwd"] for run in runs]
+        self.assertEqual(len(set(scratch)), len(runs))
+        for run in runs:
+            self.assertEqual(dirname(run["input"]), run["cwd"])
+            self.assertEqual(dirname(run["cwd"]), simulation_path)
+        for path in scratch:
+            self.assertFalse(os.path.exists(path))
+
+        # Ao menos duas execucoes devem ter ocorrido simultaneamente
+        overlap = any(
+            a["start"] < b["end"] and b["start"] < a["end"]
+            for (n, a) in enumerate(runs) for b in runs[n + 1:]
+        )
+        self.assertTrue(overlap)
+
+
+if __name__ == "__main__":
+    unittest.main()
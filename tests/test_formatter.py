@@ -0,0 +1,145 @@
+import random
+import unittest
+
+import numpy
+
+from atp.formatter.formatter import Formatter
+
+
+def format_float_reference(number, leng_max, blank=True):
+    """
+    Copia congelada da implementacao original de Formatter.formatFloat, anterior ao cache de computeFloat.
+    Serve de referencia para o teste de equivalencia e nao deve ser alterada.
+    """
+    strdec = ""
+    strexp = ""
+    erro_dec = 0
+    erro_exp = 0
+    if number == 0 and blank:
+        return ""
+    else:
+        number = float(number)
+        force_dec = False
+        force_expo = False
+
+        try:
+            (integ, dec) = str(number).replace("-", "").split(".")
+            strdec = str(round(number, len(dec) - (len(str(integ + "." + dec)) - leng_max)))
+            float_dec = float(strdec)
+            erro_dec = abs(float_dec - number)
+        except:
+            force_expo = True
+
+        try:
+            number_expo = "{:E}".format(number).replace("E+0", "E").replace("E-0", "E-").replace("E+", "E")
+            coef_expo = number_expo.split("E")[0]
+            (integ_expo, dec_expo) = coef_expo.replace("-", "").split(".")
+            strexp = (str(round(float(coef_expo), len(dec_expo) - (len(number_expo) - leng_max))) + number_expo[number_expo.find("E"):]).replace(".0E", ".E")
+            float_exp = float(strexp)
+            erro_exp = abs(float_exp - number)
+        except:
+            force_dec = True
+
+        if force_dec:
+            if len(strdec) <= leng_max:
+                return strdec
+            else:
+                raise ValueError("Number exceeds maximum length")
+
+        if force_expo:
+            if len(strexp) <= leng_max:
+                return strexp
+            else:
+                raise ValueError("Number exceeds maximum length")
+
+        if len(strdec) <= leng_max and len(strexp) <= leng_max:
+            if erro_dec <= erro_exp:
+                return strdec
+            else:
+                return strexp
+        elif len(strdec) <= leng_max:
+            return strdec
+        elif len(strexp) <= leng_max:
+            return strexp
+        else:
+            raise ValueError("Number exceeds maximum length")
+
+
+def resultado(funcao, number, leng_max, blank):
+    try:
+        return funcao(number, leng_max, blank)
+    except ValueError as erro:
+        return ("ValueError", str(erro))
+
+
+class FormatterEquivalenceTest(unittest.TestCase):
+    """
+    Compara formatFloat e formatFloatRow com a implementacao original em uma varredura aleatoria de (valor, comprimento, blank).
+    """
+    AMOSTRAS = 20000
+    ESPECIAIS = [
+        0, 0.0, -0.0, 1, -1, 5, 10, True, 123456789, 1e-5, 1.5e-5, 1e-8, 0.01, 1.2e-6, 5e-5, 10000.0,
+        1e300, -1e-300, float("inf"), float("-inf"), float("nan"), numpy.float64(1.5e-6), numpy.float32(0.1),
+    ]
+
+    @staticmethod
+    def sortear(gerador):
+        sorteio = gerador.random()
+        if sorteio < 0.3:
+            return gerador.uniform(-1, 1) * 10 ** gerador.randint(-12, 12)
+        elif sorteio < 0.5:
+            limite = 10 ** gerador.randint(0, 12)
+            return gerador.randint(-limite, limite)
+        elif sorteio < 0.7:
+            return round(gerador.uniform(-100, 100), gerador.randint(0, 6))
+        else:
+            return gerador.choice(FormatterEquivalenceTest.ESPECIAIS)
+
+    def test_format_float(self):
+        gerador = random.Random(2024)
+        for _ in range(self.AMOSTRAS):
+            number = self.sortear(gerador)
+            leng_max = gerador.randint(1, 20)
+            blank = gerador.random() < 0.5
+            esperado = resultado(format_float_reference, number, leng_max, blank)
+            # Duas chamadas seguidas: a segunda e atendida pelo cache de computeFloat
+            for _ in range(2):
+                obtido = resultado(Formatter.formatFloat, number, leng_max, blank)
+                self.assertEqual(esperado, obtido, (number, leng_max, blank))
+
+    def test_signed_zero(self):
+        for blank in (True, False):
+            for number in (0.0, -0.0, 0.0):
+                for leng_max in (1, 3, 6):
+                    self.assertEqual(
+                        resultado(format_float_reference, number, leng_max, blank),
+                        resultado(Formatter.formatFloat, number, leng_max, blank),
+                    )
+
+    def test_format_float_row(self):
+        gerador = random.Random(7)
+        for _ in range(self.AMOSTRAS // 10):
+            numbers = [self.sortear(gerador) for _ in range(gerador.randint(1, 8))]
+            leng_max = [gerador.randint(6, 20) for _ in numbers]
+            blank = gerador.random() < 0.5
+            esperado = [resultado(format_float_reference, number, leng, blank) for (number, leng) in zip(numbers, leng_max)]
+            if any(isinstance(valor, tuple) for valor in esperado):
+                with self.assertRaises(ValueError):
+                    Formatter.formatFloatRow(numbers=numbers, leng_max=leng_max, blank=blank)
+            else:
+                self.assertEqual(esperado, Formatter.formatFloatRow(numbers=numbers, leng_max=leng_max, blank=blank))
+                if len(set(leng_max)) == 1:
+                    self.assertEqual(esperado, Formatter.formatFloatRow(numbers=numbers, leng_max=leng_max[0], blank=blank))
+
+    def test_insert_float_row(self):
+        numbers = [1e-8, 0.01, 0, 1.5]
+        final_positions = [8, 16, 24, 32]
+        esperado = "".join(
+            Formatter.insertFloat(number, 8, start, final)
+            for (number, start, final) in zip(numbers, [3, 8, 16, 24], final_positions)
+        )
+        self.assertEqual(esperado, Formatter.insertFloatRow(numbers, 8, final_positions, start_position=3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,316 @@
+import cmath
+import unittest
+from os.path import abspath, dirname, join
+from types import SimpleNamespace
+from unittest import mock
+
+import networkx as nx
+import numpy
+
+from grid.feeder import Feeder
+from grid.gridequivalent import GridEquivalent
+from grid.impedance import Impedance
+from grid.phaseimpedance import PhaseImpedance
+from input.input_txt import define_input_dict
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+
+def series_phase(z1, z2):
+    if z1 is None:
+        return z2
+    if z2 is None:
+        return z1
+    return z1 + z2
+
+
+def parallel_phase(z1, z2):
+    if z1 is None:
+        return z2
+    if z2 is None:
+        return z1
+    if z1 == 0 or z2 == 0 or 1 / z1 + 1 / z2 == 0:
+        return 0j
+    return 1 / (1 / z1 + 1 / z2)
+
+
+def reduce_reference(z_bus, z_branch, parent, open_ends=False):
+    """
+    Reducao das folhas para a raiz, barra a barra e fase a fase, com numeros complexos (None para fase ausente).
+    """
+    z = [list(row) for row in z_bus]
+    for child in range(len(parent) - 1, 0, -1):  # Na ordem de build_tree, os filhos vem depois dos pais
+        for phase in range(4):
+            if open_ends:
+                if z_branch[child][phase] is None or z[child][phase] is None:
+                    continue
+                z_child = z_branch[child][phase] + z[child][phase]
+            else:
+                z_child = series_phase(z_branch[child][phase], z[child][phase])
+            z[parent[child]][phase] = parallel_phase(z[parent[child]][phase], z_child)
+    return z
+
+
+def nodal_equivalent(graph, edges, shunt_nodes, grounded, port, phase):
+    """
+    Impedancia vista pela barra port, em uma fase, pela solucao da matriz de admitancias nodal completa.
+    :param edges: Trechos da rede (os trechos sem a fase sao desconsiderados)
+    :param shunt_nodes: Barras cujas impedancias para a terra fazem parte da rede
+    :param grounded: Barras ligadas diretamente a terra (as impedancias nulas tambem sao)
+    :return: Impedancia complexa, ou None se a barra nao possuir caminho para a terra
+    """
+    edges = [(a, b) for (a, b) in edges if graph[a][b]["z"][phase] is not None]
+    network = nx.Graph()
+    network.add_node(port)
+    network.add_edges_from(edges)
+    component = nx.node_connected_component(network, port)
+    shunts = {
+        node: graph.nodes[node]["z"][phase].Z for node in component
+        if node in shunt_nodes and graph.nodes[node]["z"][phase] is not None
+    }
+    grounded = set(grounded) | {node for (node, z) in shunts.items() if z == 0}
+    if port in grounded:
+        return 0j
+    unknown = {node: n for (n, node) in enumerate(sorted(component - grounded))}
+    Y = numpy.zeros((len(unknown), len(unknown)), dtype=complex)
+    for (a, b) in edges:
+        if a not in component:
+            continue
+        y = 1 / graph[a][b]["z"][phase].Z
+        for node in (a, b):
+            if node in unknown:
+                Y[unknown[node], unknown[node]] += y
+        if a in unknown and b in unknown:
+            Y[unknown[a], unknown[b]] -= y
+            Y[unknown[b], unknown[a]] -= y
+    for (node, z) in shunts.items():
+        if node in unknown:
+            Y[unknown[node], unknown[node]] += 1 / z
+    if numpy.linalg.matrix_rank(Y) < len(unknown):
+        return None
+    current = numpy.zeros(len(unknown), dtype=complex)
+    current[unknown[port]] = 1.0
+    return complex(numpy.linalg.solve(Y, current)[unknown[port]])
+
+
+def dense_equivalents(graph, root, edge_from, edge_to):
+    """
+    Equivalentes a jusante e a montante do trecho (edge_from, edge_to), por fase, pela solucao nodal completa.
+    A montante, a fonte principal (root) esta aterrada e a barra edge_to mantem a sua propria impedancia. A jusante,
+    segue-se a convencao de GridEquivalent.series (fase ausente resulta no outro operando): uma barra sem impedancia
+    nem trechos em uma fase, em toda a arvore a jusante dela, termina o ramo que chega a ela como se estivesse aterrada.
+    """
+    subtree = nx.descendants(graph, edge_to) | {edge_to}
+    edges = list(graph.edges())
+    subtree_edges = [(a, b) for (a, b) in edges if a in subtree]
+    upstream_edges = [(a, b) for (a, b) in edges if b not in subtree] + [(edge_from, edge_to)]
+    upstream_nodes = (set(graph.nodes()) - subtree) | {edge_to}
+    downstream = {}
+    upstream = {}
+    for phase in "ABCN":
+        open_ends = set()
+        for node in subtree:
+            below = nx.descendants(graph, node) | {node}
+            if all(graph.nodes[n]["z"][phase] is None for n in below) \
+                    and all(graph[a][b]["z"][phase] is None for (a, b) in graph.edges(below)):
+                open_ends.add(node)
+        downstream[phase] = None
+        if graph[edge_from][edge_to]["z"][phase] is not None:
+            downstream[phase] = nodal_equivalent(
+                graph=graph, edges=[(edge_from, edge_to)] + subtree_edges, shunt_nodes=subtree, grounded=open_ends,
+                port=edge_from, phase=phase
+            )
+        upstream[phase] = None
+        if phase in graph[edge_from][edge_to]["phase"]:
+            upstream[phase] = nodal_equivalent(
+                graph=graph, edges=upstream_edges, shunt_nodes=upstream_nodes, grounded={root}, port=edge_to,
+                phase=phase
+            )
+    return downstream, upstream
+
+
+def to_phase_impedance(rows):
+    return PhaseImpedance(
+        z=[[0j if value is None else value for value in row] for row in rows],
+        mask=[[value is not None for value in row] for row in rows]
+    )
+
+
+class ReduceLevelsTest(unittest.TestCase):
+    """
+    Verifica a reducao iterativa das arvores (build_tree e reduce_levels) em um alimentador profundo e em barras com
+    varios ramos no mesmo nivel.
+    """
+    def assertSameRows(self, esperado, z, mask):
+        for (row, (z_row, mask_row)) in enumerate(zip(z, mask)):
+            for phase in range(4):
+                if esperado[row][phase] is None:
+                    self.assertFalse(mask_row[phase], (row, phase))
+                else:
+                    self.assertTrue(mask_row[phase], (row, phase))
+                    self.assertTrue(
+                        cmath.isclose(esperado[row][phase], z_row[phase], rel_tol=1e-9, abs_tol=1e-15),
+                        (row, phase, esperado[row][phase], z_row[phase])
+                    )
+
+    def reduce(self, z_bus, z_branch, parent, depth, open_ends=False):
+        z_reduced = to_phase_impedance(z_bus)
+        GridEquivalent.reduce_levels(
+            z=z_reduced.z, mask=z_reduced.mask, z_branch=to_phase_impedance(z_branch), parent=numpy.array(parent),
+            depth=numpy.array(depth), open_ends=open_ends
+        )
+        return z_reduced
+
+    def test_build_tree_deep_chain(self):
+        n = 5000  # Muito alem do limite de recursao do Python
+        graph = nx.DiGraph()
+        graph.add_edges_from((str(k), str(k + 1)) for k in range(n - 1))
+        tree = GridEquivalent.build_tree(bus_code="0", graph=graph)
+        self.assertEqual([str(k) for k in range(n)], tree["nodes"])
+        self.assertEqual(list(range(-1, n - 1)), tree["parent"].tolist())
+        self.assertEqual(list(range(n)), tree["depth"].tolist())
+
+    def test_deep_chain_matches_series_sum(self):
+        n = 5000
+        parent = list(range(-1, n - 1))
+        depth = list(range(n))
+        z_branch = [[None] * 4] + [[0.01 * (k % 7 + 1) + 0.02j, None, 0.03 + 0.01j * (k % 3), None] for k in range(1, n)]
+        z_bus = [[None] * 4 for _ in range(n)]
+        z_bus[-1] = [10 + 5j, None, 20 - 3j, None]  # Apenas a ultima barra possui carga
+        z_reduced = self.reduce(z_bus=z_bus, z_branch=z_branch, parent=parent, depth=depth)
+
+        for phase in (0, 2):
+            esperado = z_bus[-1][phase] + sum(row[phase] for row in z_branch[1:])
+            self.assertTrue(cmath.isclose(esperado, z_reduced.z[0, phase], rel_tol=1e-12))
+        self.assertEqual([True, False, True, False], z_reduced.mask[0].tolist())
+
+    def test_deep_chain_with_loads(self):
+        n = 3000
+        parent = list(range(-1, n - 1))
+        depth = list(range(n))
+        z_branch = [[None] * 4] + [[0.05 + 0.1j, 0.05 + 0.1j, None, None] for _ in range(1, n)]
+        z_bus = [[1e3 + 200j * (k % 5), None if k % 2 else 5e2 - 1e2j, None, None] for k in range(n)]
+        z_reduced = self.reduce(z_bus=z_bus, z_branch=z_branch, parent=parent, depth=depth)
+        self.assertSameRows(reduce_reference(z_bus, z_branch, parent), z_reduced.z, z_reduced.mask)
+
+    def test_grouped_parallel_reduce(self):
+        # Barra 0 com tres ramos, barra 1 com dois, barra 2 com um e barra 3 com tres, no mesmo nivel
+        parent = [-1, 0, 0, 0, 1, 1, 2, 3, 3, 3]
+        depth = [0, 1, 1, 1, 2, 2, 2, 2, 2, 2]
+        z_branch = [[None] * 4] + [
+            [0.1 + 0.2j * k, 0.3 + 0.1j, None if k % 3 == 0 else 0.2 + 0.2j, 0.05 * k + 0.01j] for k in range(1, 10)
+        ]
+        z_bus = [
+            [100 + 10j, None, None, None],
+            [None, 50 - 5j, None, None],
+            [None, None, None, None],
+            [200 + 20j, None, 80 + 8j, None],
+            [30 + 3j, 40 + 4j, None, None],
+            [60 + 6j, 0j, None, None],  # Curto-circuito na fase B
+            [None, None, 70 - 7j, None],
+            [10 + 1j, 20 + 2j, 30 + 3j, None],
+            [15 - 1j, None, 25 + 2j, None],
+            [None, 35 + 3j, None, None],
+        ]
+        for open_ends in (False, True):
+            with mock.patch.object(
+                    PhaseImpedance, "parallel_reduce", autospec=True, side_effect=PhaseImpedance.parallel_reduce
+            ) as parallel_reduce:
+                z_reduced = self.reduce(z_bus=z_bus, z_branch=z_branch, parent=parent, depth=depth, open_ends=open_ends)
+            self.assertEqual(2, parallel_reduce.call_count)
+            esperado = reduce_reference(z_bus, z_branch, parent, open_ends=open_ends)
+            self.assertSameRows(esperado, z_reduced.z, z_reduced.mask)
+        self.assertEqual(0, z_reduced.z[5, 1])  # O curto-circuito da barra 5 e mantido
+
+
+class SubtreeEquivalentsTest(unittest.TestCase):
+    """
+    Compara os equivalentes a jusante e a montante de todos os trechos, consultados por generate_equivalents, com a
+    solucao nodal completa de cada equivalente.
+    """
+    @staticmethod
+    def all_equivalents(feeder):
+        """
+        Consulta, por generate_equivalents, os equivalentes de todos os trechos nos dois sentidos.
+        :return: Lista de tuplas (trecho, equivalente a jusante, equivalente a montante)
+        """
+        edges = list(feeder.graph.edges())
+        feeder.bus_frontier = [edge[0] for edge in edges] + [edge[1] for edge in edges]
+        feeder.edge_frontier = edges + edges
+        grid_equivalent = GridEquivalent(feeder=feeder)
+        grid_equivalent.generate_equivalents()
+        values = [
+            {phase: (None if z is None else z.Z) for (phase, z) in z_eq.items()} for z_eq in feeder.equivalent_values
+        ]
+        return list(zip(edges, values[:len(edges)], values[len(edges):]))
+
+    def assertSameEquivalent(self, esperado, obtido, contexto):
+        for phase in "ABCN":
+            if esperado[phase] is None:
+                self.assertIsNone(obtido[phase], (contexto, phase))
+            else:
+                self.assertIsNotNone(obtido[phase], (contexto, phase))
+                self.assertTrue(
+                    cmath.isclose(esperado[phase], obtido[phase], rel_tol=1e-9, abs_tol=1e-12),
+                    (contexto, phase, esperado[phase], obtido[phase])
+                )
+
+    def assertDenseEquivalents(self, feeder):
+        for ((edge_from, edge_to), downstream, upstream) in self.all_equivalents(feeder):
+            (esperado_downstream, esperado_upstream) = dense_equivalents(
+                graph=feeder.graph, root=feeder.main_source_bus, edge_from=edge_from, edge_to=edge_to
+            )
+            self.assertSameEquivalent(esperado_downstream, downstream, ("downstream", edge_from, edge_to))
+            self.assertSameEquivalent(esperado_upstream, upstream, ("upstream", edge_from, edge_to))
+
+    def test_ieee34(self):
+        with open(join(ROOT, "examples", "ieee34", "ieee34.txt")) as arquivo:
+            feeder = Feeder(feeder_dict=define_input_dict(arquivo))
+        self.assertDenseEquivalents(feeder)
+
+        # Equivalente a montante da area de 3 barras em torno da barra 820, visto pela barra 818
+        feeder.define_area(center_bus="820", lim=3)
+        self.assertEqual([("816", "818")], feeder.edge_frontier)
+        z_eq = feeder.equivalent_values[0]
+        self.assertTrue(cmath.isclose(22.664363069670408 + 17.489815432158306j, z_eq["A"].Z, rel_tol=1e-9))
+        self.assertEqual((None, None), (z_eq["B"], z_eq["C"]))
+
+    def test_hand_built_tree(self):
+        def z_dict(**values):
+            return {phase: (Impedance(Z=complex(values[phase])) if phase in values else None) for phase in "ABCN"}
+
+        graph = nx.DiGraph()
+        buses = {
+            "S": z_dict(),
+            "1": z_dict(),
+            "2": z_dict(A=400 + 100j, B=500 + 120j, C=450 - 300j),
+            "3": z_dict(A=900 + 200j),
+            "4": z_dict(A=600 + 150j, B=0, C=700 + 80j),  # Curto-circuito na fase B
+            "5": z_dict(A=300 + 90j, B=350 + 60j, C=320 + 70j),
+            "6": z_dict(C=800 + 50j),
+            "7": z_dict(),  # Ramal sem cargas
+        }
+        for (bus, z) in buses.items():
+            graph.add_node(bus, z=z)
+        branches = [
+            ("S", "1", "ABCN"), ("1", "2", "ABCN"), ("2", "3", "AN"), ("1", "4", "ABCN"), ("4", "5", "ABCN"),
+            ("4", "6", "CN"), ("5", "7", "BN"),
+        ]
+        for (n, (edge_from, edge_to, phases)) in enumerate(branches):
+            z = {phase: 0.5 + 0.1 * n + (0.3 + 0.05 * k) * 1j for (k, phase) in enumerate("ABCN") if phase in phases}
+            graph.add_edge(edge_from, edge_to, phase=phases, z=z_dict(**z))
+
+        feeder = SimpleNamespace(graph=graph, main_source_bus="S", bus_frontier=None, edge_frontier=None,
+                                 equivalent_values=None)
+        self.assertDenseEquivalents(feeder)
+
+        equivalents = {edge: (downstream, upstream) for (edge, downstream, upstream) in self.all_equivalents(feeder)}
+        self.assertEqual(0, equivalents[("1", "4")][1]["B"])  # A barra 4 em curto na fase B
+        # A jusante do curto, resta apenas o trecho 4-5 em paralelo com a carga da barra 5
+        (z_branch, z_bus) = (graph["4"]["5"]["z"]["B"].Z, graph.nodes["5"]["z"]["B"].Z)
+        self.assertTrue(cmath.isclose(z_branch * z_bus / (z_branch + z_bus), equivalents[("4", "5")][1]["B"]))
+        self.assertEqual((None, None), (equivalents[("2", "3")][1]["B"], equivalents[("2", "3")][0]["B"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+
+from atp.node.node import Node
+from atp.node.nodenumbering import NodeNumbering
+from exceptions.exceptions import NodeCapacityError
+
+
+class NodeNumberingTest(unittest.TestCase):
+    """
+    Verifica a troca de prefixo dos nos apos o esgotamento dos 4 digitos hexadecimais, com uma capacidade reduzida.
+    """
+    def test_overflow_names_are_unique(self):
+        numbering = NodeNumbering()
+        with mock.patch.object(NodeNumbering, "capacity", 4):
+            nodes = [Node(name=str(n), type=tipo, numbering=numbering) for n in range(10) for tipo in ("Poste", "Terra")]
+        names = [node.node for node in nodes]
+        self.assertEqual(len(names), len(set(names)))
+        # Cada tipo recebe as letras de overflow na ordem em que esgota as anteriores
+        self.assertEqual(["B0000", "B0003", "D0000", "F0000", "F0001"], [names[n] for n in (0, 6, 8, 16, 18)])
+        self.assertEqual(["G0000", "E0000", "J0000"], [names[n] for n in (1, 9, 17)])
+        self.assertTrue(all(len(node.phaseA) == 6 for node in nodes))
+
+    def test_exhausted_prefixes(self):
+        numbering = NodeNumbering()
+        with mock.patch.object(NodeNumbering, "capacity", 1):
+            for _ in range(len(NodeNumbering.overflow_prefixes) + 1):
+                numbering.allocate_node(type="Poste", prefix="B")
+            with self.assertRaises(NodeCapacityError) as contexto:
+                numbering.allocate_node(type="Poste", prefix="B")
+        self.assertIn("'Poste'", contexto.exception.errors)
+
+    def test_overflow_prefix_is_not_a_node_prefix(self):
+        for prefix in Node.prefixes.values():
+            self.assertNotIn(prefix, NodeNumbering.overflow_prefixes)
+        self.assertNotIn("I", NodeNumbering.overflow_prefixes)  # Identificadores da area MODELS
+        with self.assertRaises(NodeCapacityError):
+            NodeNumbering().allocate_node(type="Outro", prefix=NodeNumbering.overflow_prefixes[0])
+
+    def test_snapshot_restore(self):
+        numbering = NodeNumbering()
+        with mock.patch.object(NodeNumbering, "capacity", 2):
+            for _ in range(3):
+                numbering.allocate_node(type="Poste", prefix="B")
+            state = numbering.snapshot()
+            first = [numbering.allocate_node(type="Poste", prefix="B") for _ in range(3)]
+            numbering.restore(state)
+            self.assertEqual(first, [numbering.allocate_node(type="Poste", prefix="B") for _ in range(3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
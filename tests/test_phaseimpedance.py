@@ -0,0 +1,133 @@
+import cmath
+import unittest
+
+import numpy
+
+from grid.gridequivalent import GridEquivalent
+from grid.impedance import Impedance
+from grid.phaseimpedance import PhaseImpedance
+
+
+def series_reference(z1, z2):
+    """
+    Copia da associacao serie original, por fase, sobre dicionarios de Impedance.
+    """
+    result = {"A": None, "B": None, "C": None, "N": None}
+    for phase in "ABCN":
+        if z1[phase] is None:
+            result[phase] = z2[phase]
+        elif z2[phase] is None:
+            result[phase] = z1[phase]
+        else:
+            result[phase] = z1[phase] + z2[phase]
+    return result
+
+
+def parallel_reference(z1, z2):
+    """
+    Copia da associacao paralelo original, por fase, sobre dicionarios de Impedance.
+    """
+    result = {"A": None, "B": None, "C": None, "N": None}
+    for phase in "ABCN":
+        if z1[phase] is None:
+            result[phase] = z2[phase]
+        elif z2[phase] is None:
+            result[phase] = z1[phase]
+        else:
+            result[phase] = z1[phase] // z2[phase]
+    return result
+
+
+def z_dict(a=None, b=None, c=None, n=None):
+    return {
+        phase: (Impedance(Z=complex(value)) if value is not None else None)
+        for (phase, value) in zip("ABCN", (a, b, c, n))
+    }
+
+
+class PhaseImpedanceTest(unittest.TestCase):
+    """
+    Compara a algebra vetorizada de PhaseImpedance com as associacoes originais sobre dicionarios de Impedance.
+    """
+    # (z1, z2): fases ausentes, impedancias nulas (curtos-circuitos), admitancia total nula e valores quaisquer
+    CASOS = [
+        (z_dict(a=1 + 2j, b=3 + 0.5j, c=0.2 - 7j, n=5), z_dict(a=4 - 1j, b=0.1 + 0.1j, c=2 + 2j, n=5)),
+        (z_dict(a=1 + 2j), z_dict(b=3 + 4j)),
+        (z_dict(a=1 + 2j, n=10), z_dict()),
+        (z_dict(), z_dict()),
+        (z_dict(a=0, b=1 + 1j), z_dict(a=3 + 4j, b=0)),
+        (z_dict(a=0, c=2j), z_dict(a=0, c=None)),
+        (z_dict(a=1 + 1j, b=-2j), z_dict(a=-1 - 1j, b=2j)),
+        (z_dict(a=1e-12 + 1e-9j, b=1e9), z_dict(a=1e6 + 1e6j, b=1e-9j)),
+    ]
+
+    def assertSameDict(self, esperado, obtido):
+        for phase in "ABCN":
+            if esperado[phase] is None:
+                self.assertIsNone(obtido[phase], phase)
+            else:
+                self.assertIsNotNone(obtido[phase], phase)
+                self.assertTrue(
+                    cmath.isclose(esperado[phase].Z, obtido[phase].Z, rel_tol=1e-12, abs_tol=1e-300),
+                    (phase, esperado[phase].Z, obtido[phase].Z)
+                )
+
+    def test_series(self):
+        for (z1, z2) in self.CASOS:
+            for (a, b) in ((z1, z2), (z2, z1)):
+                self.assertSameDict(series_reference(a, b), GridEquivalent.series(a, b))
+
+    def test_parallel(self):
+        for (z1, z2) in self.CASOS:
+            for (a, b) in ((z1, z2), (z2, z1)):
+                self.assertSameDict(parallel_reference(a, b), GridEquivalent.parallel(a, b))
+
+    def test_rows(self):
+        # Todas as linhas de uma vez devem dar o mesmo resultado que as associacoes linha a linha
+        z1 = PhaseImpedance.from_dicts([caso[0] for caso in self.CASOS])
+        z2 = PhaseImpedance.from_dicts([caso[1] for caso in self.CASOS])
+        for (row, (a, b)) in enumerate(self.CASOS):
+            self.assertSameDict(series_reference(a, b), z1.series(z2).to_dicts()[row])
+            self.assertSameDict(parallel_reference(a, b), z1.parallel(z2).to_dicts()[row])
+
+    def test_absent_phase_yields_other_operand(self):
+        z1 = z_dict(a=0.1 + 0.3j, b=None)
+        z2 = z_dict(a=None, b=7 - 2j)
+        for combinacao in (GridEquivalent.series, GridEquivalent.parallel):
+            resultado = combinacao(z1, z2)
+            self.assertEqual(z1["A"].Z, resultado["A"].Z)
+            self.assertEqual(z2["B"].Z, resultado["B"].Z)
+            self.assertIsNone(resultado["C"])
+
+    def test_parallel_with_zero_is_zero(self):
+        resultado = GridEquivalent.parallel(z_dict(a=0, b=5 + 5j), z_dict(a=3 + 4j, b=0))
+        self.assertEqual(0, resultado["A"].Z)
+        self.assertEqual(0, resultado["B"].Z)
+
+    def test_parallel_reduce(self):
+        # Grupos: 0 com tres linhas, 1 com uma unica linha, 2 com um curto-circuito e 3 sem nenhuma fase presente
+        rows = [
+            z_dict(a=1 + 2j, b=3 + 1j), z_dict(a=2 - 1j, c=4j), z_dict(a=5 + 5j, b=1e-3),
+            z_dict(a=0.1 + 0.7j, b=1 / 3 + 1j / 7),
+            z_dict(a=0, b=2 + 2j), z_dict(a=1 + 1j, b=3 + 3j),
+            z_dict(),
+        ]
+        groups = [0, 0, 0, 1, 2, 2, 3]
+        reduced = PhaseImpedance.from_dicts(rows).parallel_reduce(groups=numpy.array(groups), n_groups=4).to_dicts()
+
+        for group in range(4):
+            esperado = z_dict()
+            for (row, row_group) in zip(rows, groups):
+                if row_group == group:
+                    esperado = parallel_reference(esperado, row)
+            self.assertSameDict(esperado, reduced[group])
+
+        # Um grupo com uma unica linha mantem os valores exatamente
+        for phase in "AB":
+            self.assertEqual(rows[3][phase].Z, reduced[1][phase].Z)
+        self.assertEqual(0, reduced[2]["A"].Z)
+        self.assertEqual({"A": None, "B": None, "C": None, "N": None}, reduced[3])
+
+
+if __name__ == "__main__":
+    unittest.main()